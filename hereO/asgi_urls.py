@@ -0,0 +1,17 @@
+"""
+ASGI URL configuration for hereO project.
+
+Requests served by the ASGI application (uvicorn) are routed here by
+``server.middleware.asgi_urlconf_middleware``. The async views in
+``server.async_urls`` take precedence; every other path falls through to the
+regular ``hereO.urls`` patterns.
+"""
+from django.urls import include, path
+
+from . import urls
+
+
+urlpatterns = [
+    path('server/', include('server.async_urls')),
+    *urls.urlpatterns,
+]
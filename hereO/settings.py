@@ -33,6 +33,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'server.User'
 
 MIDDLEWARE = [
+    'server.middleware.asgi_urlconf_middleware',
+    'server.middleware.query_stats_middleware',
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -41,9 +43,11 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    'server.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = "hereO.urls"
+ASGI_URLCONF = "hereO.asgi_urls"  # ASGI 서버(uvicorn)로 들어온 요청의 URLconf (비동기 뷰)
 
 TEMPLATES = [
     {
@@ -95,11 +99,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'server.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON 응답은 orjson으로 변환 (결과는 DRF JSONRenderer와 같음, orjson이 없으면 JSONRenderer와 똑같이 동작)
+    'DEFAULT_RENDERER_CLASSES': (
+        'server.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
@@ -111,4 +120,103 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:3000',  # 로컬 주소 (필요한 경우)
     'http://ec2-43-203-221-193.ap-northeast-2.compute.amazonaws.com',  # 배포된 서버 주소
     'https://hereo.netlify.app',
-]
\ No newline at end of file
+]
+
+# 감정 분석 모델 서버 설정
+EMOTION_MODEL_URL = os.environ.get('EMOTION_MODEL_URL', 'https://newthangcolab.ngrok.app/predict')
+EMOTION_MODEL_CONNECT_TIMEOUT = float(os.environ.get('EMOTION_MODEL_CONNECT_TIMEOUT', 3))  # seconds
+EMOTION_MODEL_TIMEOUT = float(os.environ.get('EMOTION_MODEL_TIMEOUT', 10))  # read timeout, seconds
+EMOTION_MODEL_MAX_RETRIES = 1  # 연결 실패, timeout, 502/503/504 응답 시 재시도 횟수
+EMOTION_MODEL_POOL_SIZE = 10  # 워커 프로세스당 keep-alive 연결 수
+EMOTION_MODEL_ASYNC_POOL_SIZE = 100  # ASGI 워커(이벤트 루프)당 동시 연결 수
+# 연속 실패가 threshold회 이상이면 reset 시간 동안 모델 서버 호출을 바로 실패 처리
+EMOTION_BREAKER_FAILURE_THRESHOLD = 5
+EMOTION_BREAKER_RESET_SECONDS = 30
+EMOTION_MODEL_VERSION = os.environ.get('EMOTION_MODEL_VERSION', 'v1')  # 모델을 바꾸면 변경 (캐시 key에 포함)
+# 감정 분석 결과 캐시 (메모리 LRU + EmotionCacheEntry 테이블)
+EMOTION_CACHE_ENABLED = True
+EMOTION_CACHE_MAX_SIZE = 10000
+EMOTION_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# 동시에 들어온 문장을 묶어서 보내는 micro-batching (모델 서버가 {'texts': [...]} 요청을 지원해야 함)
+EMOTION_BATCH_ENABLED = os.environ.get('EMOTION_BATCH_ENABLED', 'false').lower() == 'true'
+EMOTION_BATCH_WINDOW_MS = int(os.environ.get('EMOTION_BATCH_WINDOW_MS', 10))
+EMOTION_BATCH_MAX_SIZE = int(os.environ.get('EMOTION_BATCH_MAX_SIZE', 32))
+# emotion-analyze-large 기본 동작: 'sync'(요청 안에서 분석) 또는 'job'(비동기 작업으로 분석 후 202 응답)
+EMOTION_ANALYZE_DEFAULT_MODE = os.environ.get('EMOTION_ANALYZE_DEFAULT_MODE', 'sync')
+# 비동기 감정 분석 작업 워커 설정 (python manage.py run_emotion_worker)
+EMOTION_WORKER_CONCURRENCY = int(os.environ.get('EMOTION_WORKER_CONCURRENCY', 4))
+EMOTION_JOB_MAX_ATTEMPTS = 5
+EMOTION_JOB_BACKOFF_SECONDS = 2  # 재시도 간격: 2, 4, 8, ... 초
+EMOTION_JOB_STALE_SECONDS = 300  # 이 시간 이상 running 상태인 작업은 다시 가져감
+
+# 레벨별 필요 포인트 (LEVEL_THRESHOLDS[i]: i+1레벨 -> i+2레벨, 마지막 값은 이후 레벨에 반복 적용)
+LEVEL_THRESHOLDS = [100]
+
+# 토큰 인증 캐시 (server.authentication.CachedTokenAuthentication)
+TOKEN_AUTH_CACHE_TTL = 60  # 워커 메모리 캐시 유지 시간(초)
+TOKEN_AUTH_CACHE_MAX_SIZE = 10000
+# 여러 워커가 함께 쓸 Django 캐시 별칭 (ex. memcached/redis 별칭), 설정하면 워커 메모리 캐시 대신 사용
+# (로그아웃/탈퇴가 모든 워커에 바로 반영), None이면 워커 메모리 캐시만 사용
+TOKEN_AUTH_SHARED_CACHE = None
+
+# 캐시 설정 (외부 서비스 없이 한 서버에서 동작)
+# responses: 읽기 API 응답 캐시 (server.response_cache.cached_response)
+#   locmem: 워커 프로세스마다 따로 저장, file: 같은 서버의 워커들이 함께 사용
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': 'server.response_cache.LocMemResponseCache',
+    'file': 'server.response_cache.FileResponseCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RESPONSE_CACHE_ALIAS: {
+        'BACKEND': RESPONSE_CACHE_BACKENDS[os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'hereo-responses'),  # file이면 디렉터리 경로
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 10000))},
+    },
+}
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+RESPONSE_CACHE_LOCK_SECONDS = 10  # 캐시를 채우는 요청이 잡는 lock 유지 시간
+RESPONSE_CACHE_WAIT_SECONDS = 2  # 다른 요청이 채우는 중일 때 기다리는 최대 시간
+
+# 요청별 SQL 통계 (server.middleware.query_stats_middleware, server.sql_stats)
+# 로그: server.sql_stats 로거에 요청마다 JSON 1줄 (INFO, 쿼리 예산 초과나 느린 쿼리가 있으면 WARNING)
+SQL_STATS_ENABLED = os.environ.get('SQL_STATS_ENABLED', 'true').lower() == 'true'
+SQL_STATS_HEADERS = DEBUG  # 응답 헤더 X-SQL-Queries, X-SQL-Time-ms, X-SQL-Slowest-ms, X-SQL-Duplicates, X-SQL-Budget
+SQL_STATS_SLOW_MS = 100  # 이 시간 이상 걸린 쿼리가 있으면 WARNING 로그
+# 뷰의 쿼리 예산(@query_budget)을 넘었을 때: 'log'(WARNING 로그) 또는 'raise'(QueryBudgetExceeded, 테스트에서 사용)
+SQL_QUERY_BUDGET_ACTION = os.environ.get('SQL_QUERY_BUDGET_ACTION', 'log')
+TEST_RUNNER = 'server.test_runner.QueryBudgetTestRunner'  # 테스트에서는 쿼리 예산 초과를 실패로 처리
+
+# 리더보드 (server.leaderboard)
+LEADERBOARD_PAGE_MAX_SIZE = 100  # 상위 N명 조회 한 페이지 최대 인원
+LEADERBOARD_NEIGHBOURS_MAX = 20  # 내 순위 조회에서 위/아래로 보여줄 최대 인원
+LEADERBOARD_PUSH_MAX_USERS = 20  # 한 번에 이보다 많은 사용자의 포인트가 바뀌면 순위 스냅샷을 다시 만듦
+
+# 산책/SRI 기록 목록 (server.history)
+HISTORY_PAGE_MAX_SIZE = 100  # 한 페이지 최대 기록 수
+
+# 요청 프로파일 (server.middleware.ProfilingMiddleware, server.profiling)
+# 관리자 계정으로 X-Profile: 1 헤더를 보내면 그 요청의 뷰를 cProfile로 기록 (응답 헤더 X-Profile-Id)
+# 결과 보기: python manage.py profile_report --view walk_monthly_report, 또는 GET /server/profiles/ (관리자 전용)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # 헤더 없이 프로파일할 요청 비율 (0~1)
+PROFILE_MAX_FILES = 500  # 오래된 프로파일부터 삭제
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'server.sql_stats': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_STATS_LOG_LEVEL', 'WARNING'),  # INFO면 모든 요청을 기록
+            'propagate': False,
+        },
+    },
+}
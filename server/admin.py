@@ -1,39 +1,99 @@
 from django.contrib import admin
-from .models import SRI, User, WalkHistory, Calendar
+from django.core.paginator import Paginator
+from django.db import connections
 from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import SRI, User, WalkHistory, Calendar, MonthlyWalkRollup, EmotionJob, UserStats
+from .user_stats import sri_needed_expression
+
+
+class EstimatedCountPaginator(Paginator):
+    # 필터 없는 큰 테이블은 COUNT(*) 대신 DB 통계의 예상 행 수 사용
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.db, self.object_list.model._meta.db_table)
+            if estimate is not None and estimate > self.exact_count_threshold:
+                return estimate
+        return super().count
+
+
+def estimated_row_count(using, table):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    # 행이 많은 테이블용 목록 설정: 예상 행 수로 페이지 계산, 전체 개수 COUNT(*) 생략
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
   list_display = ['username', 'nickname']
 
 @admin.register(Calendar)
-class CalendarAdmin(admin.ModelAdmin):
+class CalendarAdmin(LargeTableAdmin):
   list_display = ['pk', 'user', 'year', 'month', 'day', 'walkfinished']
+  list_select_related = ['user']
+  # date_hierarchy는 연/월 목록을 만들려고 테이블 전체를 읽으므로, 인덱스 범위로 거르는 날짜 필터 사용
+  list_filter = ['date']
 
 # WalkHistory 모델 등록을 위한 Admin 클래스
 @admin.register(WalkHistory)
-class WalkHistoryAdmin(admin.ModelAdmin):
+class WalkHistoryAdmin(LargeTableAdmin):
     list_display = ['pk', 'calendar', 'start_time', 'end_time']  # 원하는 필드들 추가
+    list_select_related = ['calendar__user']  # calendar 표시에 user 이름이 필요
+    list_filter = ['start_time']  # 인덱스 범위로 거르는 날짜 필터 (date_hierarchy 대신)
+
+# 월간 산책 집계 (rebuild_walk_rollups 명령으로 재생성 가능)
+@admin.register(MonthlyWalkRollup)
+class MonthlyWalkRollupAdmin(LargeTableAdmin):
+    list_display = ['user', 'year', 'month', 'walk_count', 'walked_day_count', 'total_distance', 'total_walk_seconds']
+    list_select_related = ['user']
+
+# 비동기 감정 분석 작업
+@admin.register(EmotionJob)
+class EmotionJobAdmin(LargeTableAdmin):
+    list_display = ['pk', 'user', 'status', 'attempts', 'emotion_large', 'next_attempt_at']
+    list_select_related = ['user']
+    list_filter = ['status']
+
+# 사용자별 산책 횟수, 마지막 SRI 검사 시각 (reconcile_user_stats 명령으로 재계산 가능)
+@admin.register(UserStats)
+class UserStatsAdmin(LargeTableAdmin):
+    list_display = ['user', 'walk_count', 'finished_walk_count', 'last_sri_date']
+    list_select_related = ['user']
 
 # SRIAdmin 클래스 정의
 @admin.register(SRI)
-class SRIAdmin(admin.ModelAdmin):
+class SRIAdmin(LargeTableAdmin):
     list_display = ['user', 'sri_score', 'sri_date', 'sri_needed_status']  # sri_needed_status 필드 추가
+    list_select_related = ['user']
+    list_filter = ['sri_date']  # 인덱스 범위로 거르는 날짜 필터 (date_hierarchy 대신)
 
-    def sri_needed_status(self, obj):
-        # 지금까지의 산책 횟수 계산
-        walk_count = WalkHistory.objects.filter(calendar__user=obj.user).count()
-
-        # SRI 검사를 해야 할지 여부 판단
-        sri_needed = (walk_count == 0) or (walk_count % 5 == 0)
-
-        # 오늘 SRI 검사를 했는지 여부 확인
+    def get_queryset(self, request):
+        # SRI 검사 필요 여부를 목록 조회 쿼리에서 함께 계산 (행마다 추가 쿼리 없음)
         today = timezone.now().date()
-        today_sri_done = SRI.objects.filter(user=obj.user, sri_date__date=today).exists()
-
-        if today_sri_done:
-            sri_needed = False
+        return super().get_queryset(request).annotate(sri_needed=sri_needed_expression(today, 'user__stats__'))
 
-        return sri_needed  # True 또는 False 반환
-
-    sri_needed_status.short_description = 'SRI Needed'  # admin에서 보이는 필드 이름 설정
\ No newline at end of file
+    @admin.display(boolean=True, ordering='sri_needed', description='SRI Needed')  # admin에서 보이는 필드 이름 설정
+    def sri_needed_status(self, obj):
+        # API(sri_list_create)와 같은 기준으로 SRI 검사 필요 여부 판단
+        # 통계 행이 아직 없는 사용자는 목록 조회(GET) 중에 만들지 않고 알 수 없음(None)으로 표시
+        return obj.sri_needed
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ServerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "server"
+
+    def ready(self):
+        # 토큰 인증 캐시 무효화, 산책 삭제 시 통계 갱신, 보고서 버전 갱신, 리더보드 순위 갱신 signal 등록
+        from . import authentication, leaderboard, user_stats, versions  # noqa: F401
@@ -0,0 +1,114 @@
+import asyncio
+import random
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .inference_client import CircuitOpenError, InferenceClient, get_inference_client
+
+
+class AsyncInferenceClient:
+    # InferenceClient의 비동기 버전 (ASGI 뷰용, 응답을 기다리는 동안 이벤트 루프가 다른 요청을 처리)
+    # 재시도/circuit breaker 규칙은 같고, 뷰에서 같은 방식으로 처리하도록 httpx 예외를 requests 예외로 바꿔서 발생
+    RETRY_STATUS = InferenceClient.RETRY_STATUS
+
+    def __init__(self, url, connect_timeout=3, read_timeout=10, max_retries=1, backoff=0.2, pool_size=100,
+                 breaker=None):
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or get_inference_client().breaker
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.fast_failures = 0
+
+    async def post(self, payload):
+        # JSON 요청을 보내고 응답 JSON(dict)을 반환
+        if not self.breaker.allow_request():
+            with self._lock:
+                self.fast_failures += 1
+            raise CircuitOpenError('Emotion model server is unavailable (circuit open)')
+
+        try:
+            data = await self._send(payload)
+        except Exception:
+            # 재시도 후에도 실패, 응답 형식 오류, 예상하지 못한 httpx 오류 모두 실패로 기록
+            self.breaker.record_failure()
+            with self._lock:
+                self.failures += 1
+            raise
+        else:
+            self.breaker.record_success()
+            return data
+        finally:
+            # 요청이 취소(CancelledError)되어 결과를 기록하지 못해도 시험 요청 자리는 반납
+            self.breaker.release_trial()
+
+    async def _send(self, payload):
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.requests += 1
+            try:
+                response = await self.client.post(self.url, json=payload)
+                if response.status_code in self.RETRY_STATUS:
+                    raise requests.exceptions.HTTPError(f'{response.status_code} from model server')
+                return response.json()
+            except (httpx.TransportError, requests.exceptions.HTTPError) as e:
+                error = self._translate(e)
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            except ValueError as e:
+                raise requests.exceptions.InvalidJSONError(f'Invalid response from model server: {e}')
+        raise error
+
+    @staticmethod
+    def _translate(error):
+        if isinstance(error, httpx.TimeoutException):
+            return requests.exceptions.Timeout(str(error) or 'Model server timed out')
+        if isinstance(error, httpx.TransportError):
+            return requests.exceptions.ConnectionError(str(error) or 'Could not connect to model server')
+        return error
+
+    def metrics(self):
+        with self._lock:
+            stats = {'requests': self.requests, 'failures': self.failures, 'fast_failures': self.fast_failures}
+        stats['breaker'] = self.breaker.stats()
+        return stats
+
+
+_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 -> 클라이언트
+_clients_lock = threading.Lock()
+
+
+def get_async_inference_client():
+    # httpx 연결은 만든 이벤트 루프에서만 쓸 수 있으므로 루프마다 하나의 클라이언트(연결 풀) 사용
+    # circuit breaker는 같은 프로세스의 동기 클라이언트와 공유
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = AsyncInferenceClient(
+                settings.EMOTION_MODEL_URL,
+                connect_timeout=settings.EMOTION_MODEL_CONNECT_TIMEOUT,
+                read_timeout=settings.EMOTION_MODEL_TIMEOUT,
+                max_retries=settings.EMOTION_MODEL_MAX_RETRIES,
+                pool_size=settings.EMOTION_MODEL_ASYNC_POOL_SIZE,
+            )
+    return client
+
+
+@receiver(setting_changed)
+def reset_async_inference_clients(setting, **kwargs):
+    if setting.startswith(('EMOTION_MODEL_', 'EMOTION_BREAKER_')):
+        with _clients_lock:
+            _clients.clear()
@@ -0,0 +1,15 @@
+from django.urls import path
+from . import async_views
+
+
+# ASGI 서버에서 비동기 뷰로 처리하는 경로 (주소와 이름은 server.urls와 같음)
+urlpatterns = [
+    path('emotion-analyze-large/', async_views.emotion_analyze_large, name='emotion-analyze-large'),
+    path('emotion-list-create/', async_views.emotion_list_create, name='emotion-list-create'),
+    path('emotion-list-range/', async_views.emotion_list_range, name='emotion-list-range'),
+    path('walk-simple-report/<int:pk>/', async_views.walk_simple_report, name='walk-simple-report'),
+    path('walk-once-report/<int:pk>/', async_views.walk_once_report, name='walk-once-report'),
+    path('walk-monthly-report/<int:year>/<int:month>/', async_views.walk_monthly_report, name='walk-monthly-report'),
+    path('walk-range-report/<int:start_year>/<int:start_month>/<int:end_year>/<int:end_month>/',
+         async_views.walk_range_report, name='walk-range-report'),
+]
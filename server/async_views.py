@@ -0,0 +1,134 @@
+import json
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import views
+from .authentication import CachedTokenAuthentication
+from .emotion import apredict_emotion, save_emotion_large
+from .emotion_jobs import enqueue_emotion_job
+from .inference_client import CircuitOpenError
+from .models import Calendar
+from .profiling import profile_view
+from .renderers import FastJSONRenderer
+from .response_cache import cache_stats, get_response_cache, response_cache_key
+from .versions import aload_versions, set_version_headers, version_validators
+
+# ASGI 서버(uvicorn)에서만 쓰는 비동기 뷰 (server.async_urls, settings.ASGI_URLCONF)
+# 모델 서버 응답이나 캐시를 기다리는 동안 이벤트 루프가 다른 요청을 처리
+# 인증 실패, 형식이 다른 요청처럼 여기서 처리하지 않는 경우는 기존 DRF 뷰에 넘겨서 응답을 똑같이 유지
+
+
+def _json_response(data, status_code):
+    return HttpResponse(FastJSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+async def _delegate(view, request, **kwargs):
+    # 기존 DRF 뷰를 스레드에서 실행 (응답 render는 Django ASGI handler가 처리)
+    if getattr(request, '_profile', False):
+        # ProfilingMiddleware가 고른 요청
+        return await sync_to_async(profile_view)(request, view, (), kwargs)
+    return await sync_to_async(view)(request, **kwargs)
+
+
+async def _authenticate(request):
+    # DRF 기본 인증(CachedTokenAuthentication)과 같은 규칙으로 토큰 확인, 실패하거나 토큰이 없으면 None
+    try:
+        result = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def emotion_analyze_large(request):
+    # views.emotion_analyze_large와 같은 동작, 모델 서버 호출만 비동기
+    user = await _authenticate(request) if request.method == 'POST' else None
+    if user is None or request.content_type != 'application/json':
+        return await _delegate(views.emotion_analyze_large, request)
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return await _delegate(views.emotion_analyze_large, request)
+    if not isinstance(data, dict):
+        return await _delegate(views.emotion_analyze_large, request)
+
+    sentence = data.get('sentence')
+    if not sentence:
+        return _json_response({"message": "Sentence is required."}, status.HTTP_400_BAD_REQUEST)
+
+    # 오늘 날짜의 Calendar ID 조회
+    today = timezone.now().date()
+    try:
+        calendar = await Calendar.objects.aget(user=user, date=today)
+    except Calendar.DoesNotExist:
+        return _json_response({"message": "Calendar entry does not exist for today."}, status.HTTP_404_NOT_FOUND)
+
+    mode = data.get('mode', settings.EMOTION_ANALYZE_DEFAULT_MODE)
+    if mode == 'job':
+        job = await sync_to_async(enqueue_emotion_job)(calendar, sentence)
+        return _json_response({'message': 'accepted', 'job_id': job.id, 'status': job.status},
+                              status.HTTP_202_ACCEPTED)
+
+    try:
+        emotion_large = await apredict_emotion(sentence)
+    except CircuitOpenError:
+        job = await sync_to_async(enqueue_emotion_job)(calendar, sentence)
+        return _json_response({'message': 'accepted', 'job_id': job.id, 'status': job.status, 'degraded': True},
+                              status.HTTP_202_ACCEPTED)
+    except requests.exceptions.RequestException as e:
+        return _json_response({"message": f"Error contacting Colab server: {str(e)}"},
+                              status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    await sync_to_async(save_emotion_large)(calendar, emotion_large, sentence)
+    return _json_response({'message': 'successfully', "emotion_large": emotion_large}, status.HTTP_200_OK)
+
+
+# 바깥 URLconf의 csrf 검사 제외 (DRF 뷰와 같음, Django 4.2의 csrf_exempt는 async 함수를 감싸지 못하므로 직접 표시)
+emotion_analyze_large.csrf_exempt = True
+
+
+def report(view, *resources, owner=None):
+    # 보고서 GET: 304(클라이언트 캐시 최신)와 응답 캐시 적중은 이벤트 루프에서 바로 응답
+    # 캐시에 없으면 기존 DRF 뷰(conditional_report, cached_response 포함)를 스레드에서 실행
+    # view: views의 보고서 뷰, resources/owner: 그 뷰의 conditional_report와 같은 값
+    async def async_view(request, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await _delegate(view, request, **kwargs)
+        user = await _authenticate(request)
+        if user is None:
+            return await _delegate(view, request, **kwargs)
+        row = await aload_versions(request, user, resources, owner, kwargs)
+        if row is None:
+            return await _delegate(view, request, **kwargs)
+
+        etag, last_modified = version_validators(row, resources)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None and request.method == 'GET' and settings.RESPONSE_CACHE_ENABLED:
+            # @api_view로 감싼 뷰의 cls가 원래 함수의 이름/모듈을 가지므로 cached_response와 같은 key가 됨
+            key = response_cache_key(view.cls, row, kwargs, request.GET)
+            cached = await get_response_cache().aget(key)
+            if cached is not None:
+                cache_stats.incr('hits')
+                response = _json_response(cached[1], cached[0])
+        if response is None:
+            # 같은 요청 객체에 버전 조회 결과가 남아 있어서 DRF 뷰에서 다시 조회하지 않음
+            return await _delegate(view, request, **kwargs)
+        return set_version_headers(response, etag, last_modified)
+
+    async_view.__name__ = async_view.__qualname__ = view.cls.__name__
+    async_view.query_budget = getattr(view, 'query_budget', None)  # 같은 쿼리 예산 사용
+    return async_view
+
+
+walk_monthly_report = report(views.walk_monthly_report, 'walk', 'calendar', 'sri', 'profile')
+walk_range_report = report(views.walk_range_report, 'walk', 'calendar', 'sri', 'profile')
+walk_once_report = report(views.walk_once_report, 'walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
+walk_simple_report = report(views.walk_simple_report, 'walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
+emotion_list_create = report(views.emotion_list_create, 'calendar')
+emotion_list_range = report(views.emotion_list_range, 'calendar', 'walk')
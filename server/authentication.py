@@ -0,0 +1,170 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+from .signals import points_granted
+
+
+class TokenUserCache:
+    # token key -> (user, token) 캐시
+    # settings.TOKEN_AUTH_SHARED_CACHE 별칭이 있으면 모든 워커가 그 Django 캐시만 사용
+    #   (로그아웃/탈퇴/포인트 지급 때 지운 항목이 모든 워커에 바로 반영됨)
+    # 없으면 워커 프로세스 메모리 (max_size, ttl)
+    #   다른 워커의 메모리 캐시는 로그아웃/탈퇴 후에도 최대 ttl 동안 남을 수 있으므로 ttl은 짧게 유지
+
+    def __init__(self, max_size=10000, ttl_seconds=60, shared_alias=None, shared_ttl_seconds=300):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.shared_alias = shared_alias
+        self.shared_ttl = shared_ttl_seconds
+        self._entries = OrderedDict()  # key -> (user, token, expires_at)
+        self._keys_by_user = {}  # user_id -> token key
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def get(self, key):
+        if self.shared:
+            cached = self.shared.get(f'auth-token:{key}')
+            with self._lock:
+                if cached:
+                    self.shared_hits += 1
+                else:
+                    self.misses += 1
+            return self._copy(*cached) if cached else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[0], entry[1])
+            if entry:
+                self._forget(key)
+            self.misses += 1
+        return None
+
+    def set(self, key, user, token):
+        user, token = self._copy(user, token)
+        if self.shared:
+            self.shared.set_many({f'auth-token:{key}': (user, token), f'auth-token-user:{user.pk}': key},
+                                 self.shared_ttl)
+        else:
+            self._remember(key, user, token)
+
+    def invalidate_token(self, key):
+        with self._lock:
+            self._forget(key)
+        if self.shared:
+            self.shared.delete(f'auth-token:{key}')
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            key = self._keys_by_user.get(user_id)
+            if key:
+                self._forget(key)
+        if self.shared:
+            shared_key = self.shared.get(f'auth-token-user:{user_id}')
+            if shared_key:
+                self.shared.delete_many([f'auth-token:{shared_key}', f'auth-token-user:{user_id}'])
+
+    def refresh_user(self, user):
+        # 저장된 사용자 정보로 캐시 항목 갱신
+        with self._lock:
+            key = self._keys_by_user.get(user.pk)
+            entry = self._entries.get(key) if key else None
+        if entry:
+            self.set(key, user, entry[1])
+        elif self.shared:
+            shared_key = self.shared.get(f'auth-token-user:{user.pk}')
+            cached = self.shared.get(f'auth-token:{shared_key}') if shared_key else None
+            if cached:
+                self.set(shared_key, user, cached[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'shared_hits': self.shared_hits,
+                    'misses': self.misses}
+
+    def _remember(self, key, user, token):
+        with self._lock:
+            self._entries[key] = (user, token, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_user[user.pk] = key
+            while len(self._entries) > self.max_size:
+                self._forget(next(iter(self._entries)))
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry and self._keys_by_user.get(entry[0].pk) == key:
+            del self._keys_by_user[entry[0].pk]
+
+    @staticmethod
+    def _copy(user, token):
+        # 요청마다 별도 인스턴스를 넘겨서 뷰에서 값을 바꿔도 캐시에 영향이 없게 함
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+
+token_user_cache = TokenUserCache(
+    max_size=settings.TOKEN_AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_AUTH_CACHE_TTL,
+    shared_alias=settings.TOKEN_AUTH_SHARED_CACHE,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    # TokenAuthentication과 같지만 token -> user 조회 결과를 캐시해서 요청마다 DB 조회를 하지 않음
+
+    def authenticate_credentials(self, key):
+        cached = token_user_cache.get(key)
+        if cached:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_user_cache.set(key, user, token)
+        return user, token
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_user(sender, instance, **kwargs):
+    if instance.get_deferred_fields():
+        token_user_cache.invalidate_user(instance.pk)
+    else:
+        token_user_cache.refresh_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    token_user_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_user_cache.invalidate_token(instance.key)
+
+
+@receiver(points_granted)
+def forget_users_with_new_points(sender, user_ids, **kwargs):
+    for user_id in user_ids:
+        token_user_cache.invalidate_user(user_id)
@@ -0,0 +1,180 @@
+import numpy as np
+
+from .models import WalkCourse
+
+# 좌표는 1e-5도(약 1.1m) 단위 정수, 시각은 초 단위 정수로 저장
+# 형식: [버전 1바이트][플래그 1바이트][점 개수 varint][위도 델타들][경도 델타들][(시각 델타들)]
+# 각 델타는 zigzag 변환 후 varint(7비트씩, 상위 비트는 다음 바이트 유무) -> 걸음 간격 이동은 대부분 1~2바이트
+FORMAT_VERSION = 1
+FLAG_HAS_TIME = 0x01
+COORD_SCALE = 100000
+MAX_POINTS = 200000
+MAX_DURATION_SECONDS = 24 * 3600  # 경로 첫 시각 ~ 마지막 시각 최대 간격
+MAX_TIME = 10 ** 12  # 시각(초) 절댓값 최대 (int64 delta 인코딩이 넘치지 않는 범위)
+EARTH_RADIUS = 6371008.8  # meter
+
+
+def _zigzag(values):
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values):
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def _encode_varints(values):
+    # uint64 배열 -> varint 바이트 (반복문 없이 값마다 필요한 바이트 수만큼 잘라냄)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        nbytes += (values >> np.uint64(shift)) > 0
+    positions = np.arange(nbytes.max(initial=1))
+    groups = ((values[:, None] >> (np.uint64(7) * positions.astype(np.uint64))) & np.uint64(0x7f)).astype(np.uint8)
+    groups[positions < nbytes[:, None] - 1] |= 0x80
+    return groups[positions < nbytes[:, None]].tobytes()
+
+
+def _decode_varints(data, count):
+    # varint 바이트 -> uint64 배열, 개수가 맞지 않거나 남는 바이트가 있으면 ValueError
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) != count or (count and ends[-1] != len(raw) - 1) or (not count and len(raw)):
+        raise ValueError('Course data is truncated or has trailing bytes.')
+    if not count:
+        return np.zeros(0, dtype=np.uint64)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    max_length = lengths.max()
+    if max_length > 10:
+        raise ValueError('Course data contains an invalid varint.')
+    # 대부분 1~2바이트이므로 바이트 자리별로 한 번씩만 배열 연산
+    padded = np.concatenate((raw & 0x7f, np.zeros(max_length, dtype=np.uint8)))
+    values = padded[starts].astype(np.uint64)
+    for position in range(1, max_length):
+        part = np.where(lengths > position, padded[starts + position], 0).astype(np.uint64)
+        values |= part << np.uint64(7 * position)
+    return values
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while offset < len(data):
+        byte = data[offset]
+        value |= (byte & 0x7f) << shift
+        offset += 1
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+    raise ValueError('Course data is truncated.')
+
+
+def quantize(lat, lng, times=None):
+    # 저장 단위(정수)로 반올림 -> 저장 후 디코딩한 값과 서버 계산에 쓴 값이 같게 함
+    columns = [np.rint(np.asarray(lat, dtype=np.float64) * COORD_SCALE).astype(np.int64),
+               np.rint(np.asarray(lng, dtype=np.float64) * COORD_SCALE).astype(np.int64)]
+    if times is not None:
+        columns.append(np.rint(np.asarray(times, dtype=np.float64)).astype(np.int64))
+    return columns
+
+
+def encode_course(lat, lng, times=None):
+    columns = quantize(lat, lng, times)
+    deltas = np.concatenate([np.diff(column, prepend=0) for column in columns])
+    header = bytes([FORMAT_VERSION, FLAG_HAS_TIME if times is not None else 0])
+    count = _encode_varints(np.array([len(columns[0])], dtype=np.uint64))
+    return header + count + _encode_varints(_zigzag(deltas))
+
+
+def decode_course(data):
+    # 반환값: (위도 배열, 경도 배열, 시각 배열 또는 None)
+    data = bytes(data)
+    if len(data) < 3 or data[0] != FORMAT_VERSION:
+        raise ValueError('Unsupported course format.')
+    has_time = bool(data[1] & FLAG_HAS_TIME)
+    count, offset = _read_varint(data, 2)
+    if not 0 < count <= MAX_POINTS:
+        raise ValueError(f'Course must have between 1 and {MAX_POINTS} points.')
+    columns = 3 if has_time else 2
+    deltas = _unzigzag(_decode_varints(data[offset:], count * columns)).reshape(columns, count)
+    values = np.cumsum(deltas, axis=1)
+    lat = values[0] / COORD_SCALE
+    lng = values[1] / COORD_SCALE
+    return lat, lng, values[2] if has_time else None
+
+
+def parse_points(points):
+    # [[위도, 경도], ...] 또는 [[위도, 경도, 시각(초)], ...] -> (위도, 경도, 시각 또는 None)
+    try:
+        array = np.asarray(points, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError('points must be a list of [lat, lng] or [lat, lng, seconds].')
+    if array.ndim != 2 or array.shape[1] not in (2, 3) or not 0 < len(array) <= MAX_POINTS:
+        raise ValueError(f'points must be a list of 1 to {MAX_POINTS} [lat, lng] or [lat, lng, seconds] items.')
+    return validate_points(array[:, 0], array[:, 1], array[:, 2] if array.shape[1] == 3 else None)
+
+
+def parse_course(data):
+    # 업로드된 이진 경로(application/octet-stream) -> (위도, 경도, 시각 또는 None), JSON 경로와 같은 검사
+    return validate_points(*decode_course(data))
+
+
+def validate_points(lat, lng, times=None):
+    # 저장 전 공통 검사: 유한한 값, |위도| <= 90, |경도| <= 180,
+    # 시각은 계속 증가하고 전체 간격은 MAX_DURATION_SECONDS 이하 (delta 인코딩과 duration_seconds가 넘치지 않게)
+    columns = [lat, lng] if times is None else [lat, lng, times]
+    if not all(np.isfinite(column).all() for column in columns):
+        raise ValueError('points contain NaN or infinite values.')
+    if np.abs(lat).max() > 90 or np.abs(lng).max() > 180:
+        raise ValueError('points contain out-of-range coordinates.')
+    if times is not None:
+        if np.abs(times).max() > MAX_TIME:
+            raise ValueError('point times are out of range.')
+        if (np.diff(times) <= 0).any():
+            raise ValueError('point times must increase.')
+        if times[-1] - times[0] > MAX_DURATION_SECONDS:
+            raise ValueError(f'A course can span at most {MAX_DURATION_SECONDS} seconds.')
+    return lat, lng, times
+
+
+def segment_distances(lat, lng):
+    # 연속한 두 점 사이 거리(m) 배열 (haversine, 전체 배열을 한 번에 계산)
+    lat = np.radians(lat)
+    lng = np.radians(lng)
+    half_dlat = np.sin(np.diff(lat) / 2)
+    half_dlng = np.sin(np.diff(lng) / 2)
+    cos_lat = np.cos(lat)
+    a = half_dlat * half_dlat + cos_lat[:-1] * cos_lat[1:] * half_dlng * half_dlng
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def course_metrics(lat, lng, times=None):
+    distance = float(segment_distances(lat, lng).sum())
+    duration = int(times[-1] - times[0]) if times is not None else None
+    return {
+        'distance': distance,
+        'duration_seconds': duration,
+        'pace': duration / distance * 1000 if duration and distance >= 1 else None,
+        'min_lat': float(lat.min()),
+        'min_lng': float(lng.min()),
+        'max_lat': float(lat.max()),
+        'max_lng': float(lng.max()),
+    }
+
+
+def save_course(walk, lat, lng, times=None):
+    # 경로를 압축 저장하고 거리/페이스/범위 계산 (같은 산책에 다시 올리면 덮어씀)
+    encoded = encode_course(lat, lng, times)
+    lat, lng, times = decode_course(encoded)
+    course, _ = WalkCourse.objects.update_or_create(
+        walk=walk, defaults={'point_count': len(lat), 'encoded': encoded, **course_metrics(lat, lng, times)})
+    return course
+
+
+def summarize_course(course):
+    return {
+        'point_count': course.point_count,
+        'distance': round(course.distance, 1),
+        'duration_seconds': course.duration_seconds,
+        'pace': round(course.pace, 1) if course.pace is not None else None,
+        'bbox': [course.min_lat, course.min_lng, course.max_lat, course.max_lng],
+        'encoded_bytes': len(course.encoded),
+    }
@@ -0,0 +1,65 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .async_inference import get_async_inference_client
+from .emotion_batch import get_batcher
+from .emotion_cache import get_emotion_cache
+from .inference_client import get_inference_client
+from .rollups import apply_emotion_change
+
+
+def predict_emotion(sentence):
+    # 같은 문장(공백 차이 무시)을 같은 모델 버전으로 분석한 결과가 있으면 캐시에서 반환
+    cache = get_emotion_cache() if settings.EMOTION_CACHE_ENABLED else None
+    if cache:
+        emotion_large = cache.get(sentence)
+        if emotion_large is not None:
+            return emotion_large
+
+    emotion_large = _predict_remote(sentence)
+    if cache and emotion_large != 'Unknown':
+        cache.set(sentence, emotion_large)
+    return emotion_large
+
+
+async def apredict_emotion(sentence):
+    # predict_emotion의 비동기 버전 (ASGI 뷰용, 모델 서버 응답을 기다리는 동안 이벤트 루프를 막지 않음)
+    # micro-batching은 스레드 기반이라 사용하지 않음 (요청마다 비동기 연결 풀로 바로 보냄)
+    cache = get_emotion_cache() if settings.EMOTION_CACHE_ENABLED else None
+    if cache:
+        emotion_large = await sync_to_async(cache.get)(sentence)
+        if emotion_large is not None:
+            return emotion_large
+
+    response_data = await get_async_inference_client().post({'text': sentence})
+    emotion_large = _normalize(response_data.get('emotion', 'Unknown'))
+    if cache and emotion_large != 'Unknown':
+        await sync_to_async(cache.set)(sentence, emotion_large)
+    return emotion_large
+
+
+def _normalize(emotion_large):
+    # 감정이 neutral일 경우 joy로 치환
+    return 'joy' if emotion_large == 'neutral' else emotion_large
+
+
+def _predict_remote(sentence):
+    # Colab 모델 서버에 감정 분석 요청 (timeout/재시도 후에도 실패하거나 circuit이 열려 있으면 requests 예외 발생)
+    if settings.EMOTION_BATCH_ENABLED:
+        # 동시에 들어온 문장들과 묶어서 한 번에 요청
+        emotion_large = get_batcher().predict(sentence)
+    else:
+        response_data = get_inference_client().post({'text': sentence})
+        emotion_large = response_data.get('emotion', 'Unknown')
+    return _normalize(emotion_large)
+
+
+def save_emotion_large(calendar, emotion_large, sentence):
+    # 대분류 감정과 문장을 Calendar에 저장하고 월간 집계의 감정 분포 갱신
+    old_emotion = calendar.emotion_large
+    calendar.emotion_large = emotion_large
+    calendar.sentence = sentence
+    with transaction.atomic():
+        calendar.save()
+        apply_emotion_change(calendar, old_emotion)
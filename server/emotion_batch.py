@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+
+from .inference_client import InferenceClient, get_inference_client
+
+
+class EmotionBatcher:
+    # 여러 요청의 문장을 짧은 시간(window_ms) 또는 max_size개까지 모아 한 번의 batch predict 요청으로 보냄
+    # 모델 서버 batch 형식: 요청 {'texts': [...]} -> 응답 {'emotions': [...]} (순서 동일)
+
+    def __init__(self, client, window_ms=10, max_size=32, max_inflight=4):
+        # client: InferenceClient 또는 모델 서버 주소
+        if isinstance(client, str):
+            client = InferenceClient(client)
+        self.client = client
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        # 클라이언트가 재시도까지 포함해 응답을 기다리는 최대 시간
+        self.timeout = sum(client.timeout) * (client.max_retries + 1) + 1
+        self._queue = queue.Queue()
+        self._sender = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix='emotion-batch')
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, sentence):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((sentence, future))
+        return future
+
+    def predict(self, sentence):
+        # batch 대기 시간 + 모델 응답 시간 안에 결과가 없으면 Timeout
+        try:
+            return self.submit(sentence).result(timeout=self.window + self.timeout)
+        except TimeoutError:
+            raise requests.exceptions.Timeout('Timed out waiting for batched emotion prediction')
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._collect_loop, name='emotion-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._sender.submit(self._send, batch)
+
+    def _send(self, batch):
+        sentences = [sentence for sentence, _ in batch]
+        try:
+            emotions = self.client.post({'texts': sentences})['emotions']
+            if len(emotions) != len(batch):
+                raise ValueError(f'Expected {len(batch)} emotions, got {len(emotions)}')
+        except requests.exceptions.RequestException as e:
+            error = e
+        except (ValueError, KeyError, TypeError) as e:
+            # 잘못된 응답도 호출한 쪽에서는 모델 서버 오류로 처리
+            error = requests.exceptions.RequestException(f'Invalid batch response: {e}')
+        else:
+            for (_, future), emotion in zip(batch, emotions):
+                future.set_result(emotion)
+            return
+        for _, future in batch:
+            future.set_exception(error)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    # 프로세스(uWSGI 워커)마다 하나의 batcher 사용
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmotionBatcher(
+                    get_inference_client(),
+                    window_ms=settings.EMOTION_BATCH_WINDOW_MS,
+                    max_size=settings.EMOTION_BATCH_MAX_SIZE,
+                )
+    return _batcher
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import EmotionCacheEntry
+
+
+def normalize_sentence(sentence):
+    # 공백만 다르거나 유니코드 조합 방식만 다른 문장은 같은 문장으로 취급
+    return ' '.join(unicodedata.normalize('NFC', sentence).split())
+
+
+def cache_key(sentence, model_version):
+    return hashlib.sha256(f'{model_version}\0{normalize_sentence(sentence)}'.encode()).hexdigest()
+
+
+class EmotionResultCache:
+    # 감정 분석 결과 캐시
+    # 1단계: 프로세스 메모리 LRU (max_size, ttl), 2단계: EmotionCacheEntry 테이블 (워커 재시작 후에도 유지)
+
+    def __init__(self, model_version, max_size=10000, ttl_seconds=7 * 24 * 3600, persistent=True):
+        self.model_version = model_version
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.persistent = persistent
+        self._entries = OrderedDict()  # key -> (emotion_large, expires_at)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sentence):
+        key = cache_key(sentence, self.model_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+        emotion_large = self._get_persistent(key)
+        with self._lock:
+            if emotion_large is None:
+                self.misses += 1
+                return None
+            self.db_hits += 1
+        self._remember(key, emotion_large)
+        return emotion_large
+
+    def set(self, sentence, emotion_large):
+        key = cache_key(sentence, self.model_version)
+        self._remember(key, emotion_large)
+        if self.persistent:
+            try:
+                EmotionCacheEntry.objects.update_or_create(
+                    key=key,
+                    defaults={'model_version': self.model_version, 'emotion_large': emotion_large,
+                              'created_at': timezone.now()},
+                )
+            except DatabaseError:
+                # 캐시 저장 실패는 요청 실패로 이어지지 않게 함
+                pass
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.memory_hits + self.db_hits) / lookups if lookups else None,
+            }
+
+    def _remember(self, key, emotion_large):
+        with self._lock:
+            self._entries[key] = (emotion_large, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_persistent(self, key):
+        if not self.persistent:
+            return None
+        expired_before = timezone.now() - timedelta(seconds=self.ttl)
+        return EmotionCacheEntry.objects.filter(key=key, created_at__gt=expired_before).values_list(
+            'emotion_large', flat=True).first()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_emotion_cache():
+    # 프로세스(uWSGI 워커)마다 하나의 캐시 사용
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmotionResultCache(
+                    settings.EMOTION_MODEL_VERSION,
+                    max_size=settings.EMOTION_CACHE_MAX_SIZE,
+                    ttl_seconds=settings.EMOTION_CACHE_TTL_SECONDS,
+                )
+    return _cache
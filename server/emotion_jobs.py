@@ -0,0 +1,105 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .emotion import predict_emotion, save_emotion_large
+from .models import Calendar, EmotionJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_emotion_job(calendar, sentence):
+    # 문장을 먼저 저장해 두고 감정 분석 작업을 등록
+    with transaction.atomic():
+        calendar.sentence = sentence
+        calendar.save(update_fields=['sentence'])
+        return EmotionJob.objects.create(user_id=calendar.user_id, calendar=calendar, sentence=sentence,
+                                         next_attempt_at=timezone.now())
+
+
+def retry_delay(attempts):
+    # 지수 백오프 + jitter (2, 4, 8, ... 초)
+    delay = settings.EMOTION_JOB_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return delay + random.uniform(0, delay / 2)
+
+
+def claim_next_job():
+    # 처리할 작업 하나를 조건부 UPDATE로 선점 (여러 워커가 동시에 실행되어도 한 작업은 한 워커만 가져감)
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.EMOTION_JOB_STALE_SECONDS)
+    ready = (
+        Q(status=EmotionJob.PENDING, next_attempt_at__lte=now)
+        | Q(status=EmotionJob.RUNNING, updated_at__lt=stale_before)
+    )
+    candidate_ids = EmotionJob.objects.filter(ready).order_by('next_attempt_at').values_list('id', flat=True)[:10]
+    for job_id in candidate_ids:
+        claimed = EmotionJob.objects.filter(ready, pk=job_id).update(status=EmotionJob.RUNNING, updated_at=now)
+        if claimed:
+            return EmotionJob.objects.get(pk=job_id)
+    return None
+
+
+def process_job(job):
+    try:
+        emotion_large = predict_emotion(job.sentence)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        job.attempts += 1
+        job.error = str(e)
+        if job.attempts < settings.EMOTION_JOB_MAX_ATTEMPTS:
+            job.status = EmotionJob.PENDING
+            job.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = EmotionJob.FAILED
+        job.save()
+        logger.warning('emotion job %s failed (attempt %s): %s', job.pk, job.attempts, e)
+        return job
+
+    with transaction.atomic():
+        calendar = Calendar.objects.select_for_update().get(pk=job.calendar_id)
+        save_emotion_large(calendar, emotion_large, job.sentence)
+        job.attempts += 1
+        job.status = EmotionJob.DONE
+        job.emotion_large = emotion_large
+        job.error = None
+        job.save()
+    return job
+
+
+def run_pending_jobs():
+    # 지금 처리 가능한 작업을 모두 처리하고 처리한 개수를 반환
+    processed = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return processed
+        process_job(job)
+        processed += 1
+
+
+def _worker_loop(poll_interval, stop_when_idle):
+    try:
+        while True:
+            close_old_connections()
+            if run_pending_jobs() == 0:
+                if stop_when_idle:
+                    return
+                time.sleep(poll_interval)
+    finally:
+        close_old_connections()
+
+
+def run_worker(concurrency=None, poll_interval=1.0, stop_when_idle=False):
+    # concurrency개의 스레드가 작업 테이블을 polling 하며 감정 분석 작업 처리
+    concurrency = concurrency or settings.EMOTION_WORKER_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(_worker_loop, poll_interval, stop_when_idle) for _ in range(concurrency)]
+        for future in futures:
+            future.result()
@@ -0,0 +1,51 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMOTIONS = ['joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust', 'neutral']
+
+
+def make_handler(latency_ms, per_item_ms, max_concurrency, jitter_ms=0):
+    # latency_ms: 요청당 고정 지연, per_item_ms: batch 안의 문장 1개당 추가 지연
+    # jitter_ms: 요청마다 0~jitter_ms 사이의 추가 지연 (ex. latency 1000 + jitter 1000 -> 1~2초)
+    # max_concurrency: 동시에 추론할 수 있는 요청 수 (GPU 1장 같은 제한을 흉내냄)
+    slots = threading.BoundedSemaphore(max_concurrency)
+
+    class FakeEmotionHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # 헤더와 본문을 따로 보내므로 Nagle 알고리즘을 끄지 않으면 keep-alive 요청마다 수십 ms가 더해짐
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            texts = body['texts'] if 'texts' in body else [body.get('text', '')]
+            with slots:
+                time.sleep((latency_ms + random.uniform(0, jitter_ms) + per_item_ms * len(texts)) / 1000)
+            emotions = [EMOTIONS[hash(text) % len(EMOTIONS)] for text in texts]
+            payload = {'emotions': emotions} if 'texts' in body else {'emotion': emotions[0]}
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeEmotionHandler
+
+
+def start_fake_server(port=0, latency_ms=200, per_item_ms=2, max_concurrency=1, jitter_ms=0):
+    # 로컬 테스트용 감정 분석 모델 서버를 백그라운드 스레드로 실행하고 (server, url) 반환
+    server = ThreadingHTTPServer(('127.0.0.1', port),
+                                 make_handler(latency_ms, per_item_ms, max_concurrency, jitter_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/predict'
+
+
+def random_sentence():
+    return ' '.join(random.choice(['오늘', '산책', '기분', '좋은', '하루', '피곤한', '날씨']) for _ in range(5))
@@ -0,0 +1,53 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+
+from .models import SRI, WalkHistory
+
+# 사용자의 전체 산책/SRI 기록 목록 (최근 기록부터, keyset 페이지)
+# 커서는 이전 페이지 마지막 기록의 "<시각 ISO 형식>:<id>"
+# OFFSET은 건너뛸 행을 모두 읽으므로 페이지가 깊을수록 느려지지만,
+# keyset은 (user, 시각, id) 인덱스에서 커서 위치부터 limit개만 읽어 페이지 깊이와 무관
+WALK_HISTORY_FIELDS = ('id', 'calendar_id', 'start_time', 'end_time', 'distance', 'walk_score', 'stable_score')
+SRI_HISTORY_FIELDS = ('id', 'sri_score', 'sri_date')
+
+
+def parse_cursor(cursor):
+    # "<시각>:<id>" -> (datetime, id), 형식이 맞지 않으면 ValueError
+    value, pk = cursor.rsplit(':', 1)
+    return datetime.fromisoformat(value), int(pk)
+
+
+def format_cursor(moment, pk):
+    return f'{moment.isoformat()}:{pk}'
+
+
+def history_page(queryset, field, fields, limit, after=None, start=None, end=None):
+    # field(시각) 내림차순, 같으면 id 내림차순으로 limit개와 다음 페이지 커서
+    # start, end: 날짜(date) 범위 (양 끝 포함)
+    rows = queryset.filter(**{f'{field}__isnull': False})
+    if start is not None:
+        rows = rows.filter(**{f'{field}__gte': datetime.combine(start, time.min)})
+    if end is not None:
+        rows = rows.filter(**{f'{field}__lt': datetime.combine(end + timedelta(days=1), time.min)})
+    if after is not None:
+        moment, pk = after
+        # OR 조건만 있으면 인덱스 범위를 정하지 못하므로 시각 범위를 함께 걺
+        rows = rows.filter(Q(**{f'{field}__lt': moment}) | Q(**{field: moment, 'id__lt': pk}),
+                           **{f'{field}__lte': moment})
+    # 1개 더 읽어 다음 페이지가 있는지 확인
+    rows = list(rows.order_by(f'-{field}', '-id').values(*fields)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, format_cursor(rows[-1][field], rows[-1]['id'])
+
+
+def walk_history_page(user, limit, after=None, start=None, end=None):
+    # 시작 시각(start_time) 기준, 시작 시각이 없는 기록은 제외
+    return history_page(WalkHistory.objects.filter(user=user), 'start_time', WALK_HISTORY_FIELDS,
+                        limit, after, start, end)
+
+
+def sri_history_page(user, limit, after=None, start=None, end=None):
+    return history_page(SRI.objects.filter(user=user), 'sri_date', SRI_HISTORY_FIELDS, limit, after, start, end)
@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    # 모델 서버 장애로 circuit이 열려 있어 요청을 보내지 않고 바로 실패
+    pass
+
+
+class CircuitBreaker:
+    # closed: 정상, open: 연속 실패 후 reset_timeout 동안 요청 차단, half_open: 시험 요청 1개만 허용
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None  # 마지막으로 open 된 시각 (시험 요청 실패 시 다시 시작)
+        self.outage_started = None  # 처음 open 된 시각 (close 될 때까지 유지, open_seconds 계산용)
+        self.open_count = 0
+        self.open_seconds = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.open_seconds += time.monotonic() - self.outage_started
+                self.opened_at = None
+                self.outage_started = None
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # 시험 요청 실패: 지금부터 다시 reset_timeout 동안 차단 (장애 시작 시각은 유지)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.outage_started = time.monotonic()
+                self.open_count += 1
+            self._trial_running = False
+
+    def release_trial(self):
+        # 성공/실패를 기록하지 않고 끝난 시험 요청의 자리 반납 (다음 요청이 다시 시험할 수 있게)
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            current_open = time.monotonic() - self.outage_started if self.outage_started else 0.0
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'open_count': self.open_count,
+                'open_seconds_total': round(self.open_seconds + current_open, 3),
+                'open_seconds_current': round(current_open, 3),
+            }
+
+
+class InferenceClient:
+    # 모델 서버 전용 HTTP 클라이언트
+    # keep-alive 연결 풀, connect/read timeout, jitter가 있는 재시도, circuit breaker 적용
+    RETRY_STATUS = {502, 503, 504}
+
+    def __init__(self, url, connect_timeout=3, read_timeout=10, max_retries=1, backoff=0.2, pool_size=10,
+                 breaker=None):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._adapter = adapter
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.fast_failures = 0
+
+    def post(self, payload):
+        # JSON 요청을 보내고 응답 JSON(dict)을 반환
+        if not self.breaker.allow_request():
+            with self._lock:
+                self.fast_failures += 1
+            raise CircuitOpenError('Emotion model server is unavailable (circuit open)')
+
+        try:
+            data = self._send(payload)
+        except Exception:
+            # 재시도 후에도 실패, 응답 형식 오류, 예상하지 못한 오류 모두 실패로 기록
+            self.breaker.record_failure()
+            with self._lock:
+                self.failures += 1
+            raise
+        else:
+            self.breaker.record_success()
+            return data
+        finally:
+            # 결과를 기록하지 못하고 빠져나가도(KeyboardInterrupt 등) 시험 요청 자리는 반납
+            self.breaker.release_trial()
+
+    def _send(self, payload):
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.requests += 1
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code in self.RETRY_STATUS:
+                    raise requests.exceptions.HTTPError(f'{response.status_code} from model server',
+                                                       response=response)
+                return response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as e:
+                error = e
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            except ValueError as e:
+                # 응답 형식 오류는 재시도해도 같으므로 바로 실패 처리
+                raise requests.exceptions.InvalidJSONError(f'Invalid response from model server: {e}')
+        raise error
+
+    def metrics(self):
+        # new_connections: 새로 맺은 TCP/TLS 연결 수, reuse_rate: keep-alive로 재사용한 요청 비율
+        new_connections = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += pool.num_connections
+        with self._lock:
+            requests_sent = self.requests
+            stats = {
+                'requests': requests_sent,
+                'failures': self.failures,
+                'fast_failures': self.fast_failures,
+            }
+        stats['new_connections'] = new_connections
+        stats['connection_reuse_rate'] = (
+            max(requests_sent - new_connections, 0) / requests_sent if requests_sent else None
+        )
+        stats['breaker'] = self.breaker.stats()
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_inference_client():
+    # 프로세스(uWSGI 워커)마다 하나의 클라이언트(연결 풀) 사용
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient(
+                    settings.EMOTION_MODEL_URL,
+                    connect_timeout=settings.EMOTION_MODEL_CONNECT_TIMEOUT,
+                    read_timeout=settings.EMOTION_MODEL_TIMEOUT,
+                    max_retries=settings.EMOTION_MODEL_MAX_RETRIES,
+                    pool_size=settings.EMOTION_MODEL_POOL_SIZE,
+                    breaker=CircuitBreaker(
+                        failure_threshold=settings.EMOTION_BREAKER_FAILURE_THRESHOLD,
+                        reset_timeout=settings.EMOTION_BREAKER_RESET_SECONDS,
+                    ),
+                )
+    return _client
+
+
+@receiver(setting_changed)
+def reset_inference_client(setting, **kwargs):
+    # override_settings로 모델 서버 설정을 바꾸면(테스트, 벤치마크) 다음 호출에서 새 설정으로 클라이언트를 만듦
+    global _client
+    if setting.startswith(('EMOTION_MODEL_', 'EMOTION_BREAKER_')):
+        with _client_lock:
+            _client = None
@@ -0,0 +1,122 @@
+import math
+import sys
+from array import array
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import KinectChunk, KinectStream
+
+# 안정도 값 범위 [0, 100]을 0.1 단위 구간으로 나눠 백분위수 계산
+HISTOGRAM_BINS = 1000
+HISTOGRAM_MAX = 100.0
+PERCENTILES = [50, 90, 95, 99]
+MAX_SEQ = 2 ** 31 - 1  # KinectChunk.seq(IntegerField) 최대값
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def decode_samples(data):
+    # float32 little-endian 바이트 -> array('f'), 형식이 잘못되면 ValueError
+    if not data or len(data) % 4:
+        raise ValueError('Sample block must be a non-empty sequence of float32 values.')
+    samples = _little_endian(array('f', data))
+    if not all(math.isfinite(value) for value in samples):
+        raise ValueError('Sample block contains NaN or infinite values.')
+    return samples
+
+
+def encode_samples(values):
+    return _little_endian(array('f', values)).tobytes()
+
+
+def load_histogram(stream):
+    if not stream.histogram:
+        return array('I', bytes(4 * HISTOGRAM_BINS))
+    return _little_endian(array('I', bytes(stream.histogram)))
+
+
+def merge_samples(stream, samples):
+    # 청크 통계를 누적 통계에 합침 (평균/분산은 Chan의 병렬 알고리즘, 백분위수는 히스토그램)
+    n_b = len(samples)
+    mean_b = math.fsum(samples) / n_b
+    m2_b = math.fsum((value - mean_b) ** 2 for value in samples)
+
+    n_a = stream.sample_count
+    n = n_a + n_b
+    delta = mean_b - stream.mean
+    stream.mean += delta * n_b / n
+    stream.m2 += m2_b + delta * delta * n_a * n_b / n
+    stream.sample_count = n
+    stream.min_value = min(samples) if stream.min_value is None else min(stream.min_value, min(samples))
+    stream.max_value = max(samples) if stream.max_value is None else max(stream.max_value, max(samples))
+
+    histogram = load_histogram(stream)
+    scale = HISTOGRAM_BINS / HISTOGRAM_MAX
+    for value in samples:
+        histogram[min(max(int(value * scale), 0), HISTOGRAM_BINS - 1)] += 1
+    stream.histogram = _little_endian(histogram).tobytes()
+
+
+def percentile(stream, q):
+    # 히스토그램 구간 중앙값으로 근사 (오차 0.05 이하)
+    if not stream.sample_count:
+        return None
+    histogram = load_histogram(stream)
+    target = max(math.ceil(q / 100 * stream.sample_count), 1)
+    cumulative = 0
+    width = HISTOGRAM_MAX / HISTOGRAM_BINS
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= target:
+            value = (index + 0.5) * width
+            return round(min(max(value, stream.min_value), stream.max_value), 2)
+    return stream.max_value
+
+
+def summarize(stream):
+    variance = stream.m2 / stream.sample_count if stream.sample_count else None
+    summary = {
+        'chunk_count': stream.chunk_count,
+        'sample_count': stream.sample_count,
+        'mean': round(stream.mean, 2) if stream.sample_count else None,
+        'variance': round(variance, 4) if variance is not None else None,
+        'std': round(math.sqrt(variance), 4) if variance is not None else None,
+        'min': stream.min_value,
+        'max': stream.max_value,
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}'] = percentile(stream, q)
+    return summary
+
+
+def append_chunk(walk, data, seq=None):
+    # 샘플 블록을 저장하고 누적 통계 갱신, (stream, 새로 반영했는지 여부) 반환
+    # 같은 seq를 다시 보내면(재전송) 통계에 중복 반영하지 않음
+    samples = decode_samples(data)
+    with transaction.atomic():
+        KinectStream.objects.get_or_create(walk=walk)
+        stream = KinectStream.objects.select_for_update().get(walk=walk)
+        if seq is None:
+            # 마지막 청크 다음 번호 (seq를 건너뛰고 보낸 클라이언트도 있으므로 개수가 아닌 최대 번호 기준)
+            seq = (KinectChunk.objects.filter(walk=walk).aggregate(last=Max('seq'))['last'] or 0) + 1
+        try:
+            with transaction.atomic():
+                KinectChunk.objects.create(walk=walk, seq=seq, sample_count=len(samples),
+                                           samples=encode_samples(samples))
+        except IntegrityError:
+            return stream, False
+        merge_samples(stream, samples)
+        stream.chunk_count += 1
+        stream.save()
+    return stream, True
+
+
+def iter_samples(walk):
+    # 저장된 전체 샘플을 청크 순서대로 읽음 (재계산, 분석용)
+    for chunk in KinectChunk.objects.filter(walk=walk).order_by('seq').iterator():
+        yield from decode_samples(bytes(chunk.samples))
@@ -0,0 +1,183 @@
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import LeaderboardBucket, User
+from .signals import points_granted
+
+# 누적 포인트 리더보드
+# 순서: 누적 포인트 높은 순, 같으면 먼저 가입한 순 (User 인덱스 user_leaderboard_idx 순서)
+# 순위: 1 + 나보다 누적 포인트가 높은 사용자 수 (같은 점수는 같은 순위)
+#   사용자마다 COUNT 하면 하위권일수록 많은 행을 세야 하므로 LeaderboardBucket(점수별 사용자 수 스냅샷)을 기본 키로 조회
+LEADERBOARD_FIELDS = ('id', 'nickname', 'level', 'points', 'total_points')
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_leaderboard():
+    # 순위 스냅샷을 User 테이블로 다시 만듦 (점수별 그룹 집계 1번, 인덱스만 읽음)
+    buckets = []
+    above = 0
+    for row in User.objects.values('total_points').annotate(user_count=Count('id')).order_by('-total_points'):
+        buckets.append(LeaderboardBucket(total_points=row['total_points'], user_count=row['user_count'],
+                                         users_above=above))
+        above += row['user_count']
+    with transaction.atomic():
+        LeaderboardBucket.objects.all().delete()
+        LeaderboardBucket.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
+
+
+def rank_for(total_points):
+    # 누적 포인트 total_points의 순위 (스냅샷 기본 키 범위에서 첫 행 1개 조회)
+    bucket = LeaderboardBucket.objects.filter(total_points__gte=total_points).order_by('total_points').first()
+    if bucket is None:
+        return 1
+    if bucket.total_points == total_points:
+        return bucket.users_above + 1
+    return bucket.users_above + bucket.user_count + 1
+
+
+def ranks_for(scores):
+    # {누적 포인트: 순위} 목록에 나온 점수들을 쿼리 1~2개로
+    # 가장 낮은 점수~가장 높은 점수 사이 칸만 읽음 (사용자가 있는 칸은 목록 길이를 넘지 않음)
+    # 스냅샷에 아직 없는 점수(commit 전 등)는 바로 위 칸으로 계산
+    scores = sorted(set(scores), reverse=True)
+    if not scores:
+        return {}
+    buckets = list(LeaderboardBucket.objects.filter(total_points__gte=scores[-1], total_points__lte=scores[0])
+                   .order_by('-total_points'))
+    if not buckets or buckets[0].total_points != scores[0]:
+        higher = LeaderboardBucket.objects.filter(total_points__gt=scores[0]).order_by('total_points').first()
+        if higher is not None:
+            buckets.insert(0, higher)
+    ranks = {}
+    higher = None
+    index = 0
+    for score in scores:
+        while index < len(buckets) and buckets[index].total_points > score:
+            higher = buckets[index]
+            index += 1
+        if index < len(buckets) and buckets[index].total_points == score:
+            ranks[score] = buckets[index].users_above + 1
+        else:
+            ranks[score] = higher.users_above + higher.user_count + 1 if higher else 1
+    return ranks
+
+
+def _move(old, new):
+    # 사용자 1명의 누적 포인트가 old -> new로 바뀐 만큼 스냅샷 갱신 (None: 가입 전/탈퇴 후)
+    # old <= 점수 < new 인 칸은 그 사용자가 위로 올라갔으므로 users_above + 1 (내려간 경우 반대)
+    if old == new:
+        return
+    if old is not None:
+        LeaderboardBucket.objects.filter(pk=old).update(user_count=F('user_count') - 1)
+    if old is None:
+        LeaderboardBucket.objects.filter(total_points__lt=new).update(users_above=F('users_above') + 1)
+    elif new is None:
+        LeaderboardBucket.objects.filter(total_points__lt=old).update(users_above=F('users_above') - 1)
+    elif new > old:
+        LeaderboardBucket.objects.filter(total_points__gte=old, total_points__lt=new).update(
+            users_above=F('users_above') + 1)
+    else:
+        LeaderboardBucket.objects.filter(total_points__gte=new, total_points__lt=old).update(
+            users_above=F('users_above') - 1)
+    if new is None or LeaderboardBucket.objects.filter(pk=new).update(user_count=F('user_count') + 1):
+        return
+    # 처음 나온 점수: 바로 위 칸에서 더 높은 사용자 수 계산
+    above = LeaderboardBucket.objects.filter(total_points__gt=new).order_by('total_points').first()
+    try:
+        with transaction.atomic():
+            LeaderboardBucket.objects.create(total_points=new, user_count=1,
+                                             users_above=above.users_above + above.user_count if above else 0)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 만든 경우
+        LeaderboardBucket.objects.filter(pk=new).update(user_count=F('user_count') + 1)
+
+
+def move_scores(changes):
+    # [(old, new)] 누적 포인트 변경을 스냅샷에 반영
+    # 동시 요청 사이의 작은 오차는 주기적인 rebuild_leaderboard가 바로잡음
+    with transaction.atomic():
+        for old, new in changes:
+            _move(old, new)
+
+
+def leaderboard_rows(queryset):
+    return list(queryset.values(*LEADERBOARD_FIELDS))
+
+
+def with_ranks(rows):
+    ranks = ranks_for(row['total_points'] for row in rows)
+    return [{'rank': ranks[row['total_points']], **row} for row in rows]
+
+
+def top_page(limit, after=None):
+    # 상위 limit명, after=(누적 포인트, id)이면 그 사용자 다음부터 (keyset, 페이지 깊이와 무관하게 인덱스 범위 조회)
+    users = User.objects.order_by('-total_points', 'id')
+    if after is not None:
+        total_points, user_id = after
+        users = users.filter(Q(total_points__lt=total_points) | Q(total_points=total_points, id__gt=user_id),
+                             total_points__lte=total_points)
+    return with_ranks(leaderboard_rows(users[:limit]))
+
+
+def neighbours(user_id, total_points, count):
+    # 리더보드에서 누적 포인트가 total_points인 사용자 user_id 바로 위 count명과 바로 아래 count명
+    # OR 조건만 있으면 인덱스 범위를 정하지 못해 끝에서부터 훑으므로 total_points 범위를 함께 걺
+    before = Q(total_points__gt=total_points) | Q(total_points=total_points, id__lt=user_id)
+    after = Q(total_points__lt=total_points) | Q(total_points=total_points, id__gt=user_id)
+    above = leaderboard_rows(User.objects.filter(before, total_points__gte=total_points)
+                             .order_by('total_points', '-id')[:count])[::-1]
+    below = leaderboard_rows(User.objects.filter(after, total_points__lte=total_points)
+                             .order_by('-total_points', 'id')[:count])
+    return above, below
+
+
+def _after_commit(update):
+    # 스냅샷 갱신은 포인트 지급/가입/탈퇴 트랜잭션이 commit된 뒤 실행 (rollback되면 반영하지 않고, 사용자 행 lock을 오래 잡지 않음)
+    # 갱신이 실패해도(lock 대기 초과, deadlock 등) 이미 commit된 요청은 성공으로 응답하고 로그만 남김
+    # 틀어진 스냅샷은 주기적인 rebuild_leaderboard가 바로잡음
+    def run():
+        try:
+            update()
+        except Exception:
+            logger.exception('Leaderboard snapshot update failed; rebuild_leaderboard will repair it.')
+
+    transaction.on_commit(run, robust=True)
+
+
+@receiver(points_granted)
+def push_rank_changes(sender, user_ids, points=None, **kwargs):
+    # 포인트 지급(walk_end, sync 등) 뒤 스냅샷 갱신, 한 번에 많은 사용자가 바뀌면 다시 만듦
+    if not points:
+        return
+    if len(user_ids) > settings.LEADERBOARD_PUSH_MAX_USERS:
+        _after_commit(rebuild_leaderboard)
+        return
+
+    def push():
+        totals = User.objects.filter(pk__in=user_ids).values_list('pk', 'total_points')
+        move_scores([(total - points[pk], total) for pk, total in totals if points.get(pk)])
+
+    _after_commit(push)
+
+
+@receiver(post_save, sender=User)
+def user_joined(sender, instance, created, **kwargs):
+    if created:
+        total_points = instance.total_points
+        _after_commit(lambda: move_scores([(None, total_points)]))
+
+
+@receiver(pre_delete, sender=User)
+def user_left(sender, instance, **kwargs):
+    # 메모리의 instance는 포인트 지급 전 값일 수 있으므로 저장된 값을 읽음
+    total_points = User.objects.filter(pk=instance.pk).values_list('total_points', flat=True).first()
+    if total_points is None:
+        return
+    _after_commit(lambda: move_scores([(total_points, None)]))
@@ -0,0 +1,84 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+from django.conf import settings
+from django.db.models import Case, ExpressionWrapper, IntegerField, Value, When
+from django.db.models.functions import Floor
+from django.db.models.lookups import GreaterThanOrEqual
+
+# settings.LEVEL_THRESHOLDS[i]: (i+1)레벨에서 다음 레벨로 올라가는 데 필요한 포인트
+# 마지막 값은 이후 모든 레벨에 반복 적용
+# ex) [100] -> 레벨마다 100점, [100, 150, 200] -> 1→2: 100점, 2→3: 150점, 3레벨부터 200점씩
+
+
+def level_table(thresholds=None):
+    # (각 레벨의 시작 누적 포인트 목록, 마지막 구간의 레벨당 포인트)
+    thresholds = thresholds or settings.LEVEL_THRESHOLDS
+    starts = [0, *accumulate(thresholds[:-1])]
+    return starts, thresholds[-1]
+
+
+def level_for_total(total_points, thresholds=None):
+    # 누적 포인트로 (레벨, 현재 레벨에서의 포인트) 계산 (표 구간은 이분 탐색, 마지막 구간은 나눗셈)
+    starts, step = level_table(thresholds)
+    if total_points >= starts[-1]:
+        levels_up, points = divmod(total_points - starts[-1], step)
+        return len(starts) + levels_up, points
+    level = bisect_right(starts, total_points)
+    return level, total_points - starts[level - 1]
+
+
+def total_for_level(level, points, thresholds=None):
+    # (레벨, 포인트)를 누적 포인트로 변환
+    starts, step = level_table(thresholds)
+    if level >= len(starts):
+        return starts[-1] + (level - len(starts)) * step + points
+    return starts[level - 1] + points
+
+
+def level_expressions(total, thresholds=None):
+    # 누적 포인트 식(total)으로 레벨과 포인트를 계산하는 DB 식 (UPDATE 한 번에 사용)
+    starts, step = level_table(thresholds)
+    last_level = len(starts)
+    levels_up = ExpressionWrapper(Floor((total - Value(starts[-1])) / Value(step)), output_field=IntegerField())
+
+    level_whens = [When(GreaterThanOrEqual(total, starts[-1]), then=Value(last_level) + levels_up)]
+    points_whens = [When(GreaterThanOrEqual(total, starts[-1]),
+                         then=total - Value(starts[-1]) - levels_up * Value(step))]
+    for level in range(last_level - 1, 0, -1):
+        start = starts[level - 1]
+        level_whens.append(When(GreaterThanOrEqual(total, start), then=Value(level)))
+        points_whens.append(When(GreaterThanOrEqual(total, start), then=total - Value(start)))
+
+    level_expr = Case(*level_whens, default=Value(1), output_field=IntegerField())
+    points_expr = Case(*points_whens, default=total, output_field=IntegerField())
+    return level_expr, points_expr
+
+
+def grant_update_kwargs(total):
+    # QuerySet.update()에 넘길 값
+    # MySQL은 SET 절을 왼쪽부터 적용하므로 total_points를 마지막에 둬서 level/points가 갱신 전 값을 보게 함
+    level_expr, points_expr = level_expressions(total)
+    return {'level': level_expr, 'points': points_expr, 'total_points': total}
+
+
+def walk_end_points(stable_score, distance):
+    # 산책 종료 시 지급할 포인트
+    points = 7  # 산책 종료시 기본 점수
+
+    # stable_score에 따라 추가 점수 계산 (안정도가 80이상일시 3점추가, 90이상일시 5점 추가)
+    if stable_score is not None:
+        if stable_score >= 90:
+            points += 5
+        elif stable_score >= 80:
+            points += 3
+
+    # distance에 따라 추가 점수 계산
+    if distance is not None:
+        if distance >= 1500:
+            points += 13  # 1500미터 이상일 시 13점 추가 (기본점수 포함하면 15점)
+        elif distance >= 1000:
+            points += 8  # 1000미터 이상일 시 8점 추가
+        elif distance >= 500:
+            points += 3  # 500미터 이상일 시 3점 추가
+    return points
@@ -0,0 +1,141 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from .fake_inference import random_sentence
+from .leaderboard import rebuild_leaderboard
+from .leveling import walk_end_points
+from .models import SRI, Calendar, User, UserVersion, WalkHistory
+from .rollups import rebuild_monthly_rollups
+from .user_stats import reconcile_user_stats
+
+# 부하 테스트용 가짜 데이터 (python manage.py generate_load_data)
+# 사용자마다 활동 성향(앱 사용 빈도, 산책 비율, 주 산책 시간대, 걷는 속도)을 정하고 하루 단위로 기록을 만듦
+EMOTION_LARGE_WEIGHTS = {'joy': 40, 'sadness': 20, 'anger': 10, 'fear': 10, 'surprise': 12, 'disgust': 8}
+EMOTION_SMALL = ['편안함', '뿌듯함', '설렘', '상쾌함', '지침', '불안', '외로움', '짜증']
+PLAYTIME_WEIGHTS = {5: 5, 10: 15, 15: 20, 20: 25, 25: 15, 30: 20}
+SRI_EVERY_WALKS = 5  # 앱은 산책 5회마다 SRI 검사를 요청
+USERNAME_DIGITS = 5
+
+
+def generated_username(prefix, index):
+    return f'{prefix}{index:0{USERNAME_DIGITS}d}'
+
+
+def generated_users(prefix):
+    return User.objects.filter(username__regex=rf'^{prefix}[0-9]{{{USERNAME_DIGITS}}}$')
+
+
+def create_users(prefix, count, password, start_index=0):
+    # bulk_create는 post_save signal이 없으므로 버전 행과 토큰을 직접 생성 (비밀번호 해시는 한 번만 계산)
+    hashed = make_password(password)
+    names = [generated_username(prefix, start_index + index) for index in range(count)]
+    User.objects.bulk_create([User(username=name, nickname=name, password=hashed) for name in names],
+                             batch_size=1000)
+    users = list(User.objects.filter(username__in=names).order_by('pk'))
+    UserVersion.objects.bulk_create([UserVersion(user=user) for user in users], batch_size=1000)
+    Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users], batch_size=1000)
+    return users
+
+
+class ActivityProfile:
+    # 사용자 한 명의 활동 성향
+    def __init__(self, rng):
+        self.rng = rng
+        self.open_rate = rng.betavariate(2, 3)  # 앱을 여는 날의 비율 (평균 0.4, 사용자마다 편차가 큼)
+        self.walk_rate = rng.uniform(0.4, 0.9)  # 앱을 연 날 중 산책한 비율
+        self.diary_rate = rng.uniform(0.3, 0.9)  # 감정 기록(문장)을 남긴 비율
+        self.walk_hour = rng.choice([7.5, 12.5, 19.0])  # 주로 산책하는 시각
+        self.pace = min(max(rng.gauss(75, 10), 45), 110)  # meter/minute
+        self.stability = rng.gauss(70, 8)  # 키넥트 안정도 평균
+        self.sri = rng.gauss(45, 8)  # 처음 SRI 점수, 산책을 할수록 조금씩 낮아짐
+        self.finished_walks = 0
+
+    def opens_app(self, day):
+        weekend = 1.2 if day.weekday() >= 5 else 1.0
+        return self.rng.random() < min(self.open_rate * weekend, 1.0)
+
+    def walk_count(self):
+        if self.rng.random() >= self.walk_rate:
+            return 0
+        return 2 if self.rng.random() < 0.1 else 1
+
+    def walk(self, day, index):
+        rng = self.rng
+        hour = min(max(rng.gauss(self.walk_hour + index * 3, 1.0), 5), 22.5)
+        start_time = datetime.combine(day, time()) + timedelta(hours=hour)
+        playtime = rng.choices(list(PLAYTIME_WEIGHTS), weights=PLAYTIME_WEIGHTS.values())[0]
+        minutes = max(playtime * rng.lognormvariate(0, 0.25), 1)
+        walk = WalkHistory(start_time=start_time)
+        if rng.random() < 0.03:
+            # 앱 종료 등으로 끝나지 않은 산책
+            return walk
+        walk.end_time = start_time + timedelta(minutes=minutes)
+        walk.distance = int(minutes * self.pace * rng.gauss(1, 0.1))
+        walk.stable_score = round(min(max(rng.gauss(self.stability, 10), 0), 100), 2)
+        walk.walk_score = float(rng.randint(1, 5)) if rng.random() < 0.6 else None
+        return walk
+
+    def sri_score(self):
+        self.sri = max(self.sri - self.rng.uniform(0, 0.5), 5)
+        return int(min(max(self.rng.gauss(self.sri, 5), 0), 80))
+
+    def calendar(self, user, day):
+        rng = self.rng
+        calendar = Calendar(user=user, date=day, year=day.year, month=day.month, day=day.day)
+        if rng.random() < self.diary_rate:
+            calendar.sentence = random_sentence()
+            calendar.emotion_large = rng.choices(list(EMOTION_LARGE_WEIGHTS),
+                                                 weights=EMOTION_LARGE_WEIGHTS.values())[0]
+            if rng.random() < 0.5:
+                calendar.emotion_small = rng.choice(EMOTION_SMALL)
+        return calendar
+
+
+def generate_history(users, first_day, last_day, rng):
+    # 사용자들의 first_day~last_day 기록 생성 (Calendar, WalkHistory, SRI, 월간 집계, 통계, 포인트)
+    # 반환값: {'calendars': n, 'walks': n, 'sris': n}
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    calendars = []
+    walks = []  # (calendar, walk)
+    sris = []
+    points = {}
+    for user in users:
+        profile = ActivityProfile(rng)
+        for day in days:
+            if not profile.opens_app(day):
+                continue
+            calendar = profile.calendar(user, day)
+            calendars.append(calendar)
+            for index in range(profile.walk_count()):
+                walk = profile.walk(day, index)
+                walks.append((calendar, walk))
+                if not walk.end_time:
+                    continue
+                calendar.walkfinished = True
+                points[user.pk] = points.get(user.pk, 0) + walk_end_points(walk.stable_score, walk.distance)
+                profile.finished_walks += 1
+                if profile.finished_walks % SRI_EVERY_WALKS == 0:
+                    sris.append(SRI(user=user, sri_score=profile.sri_score(),
+                                    sri_date=walk.end_time + timedelta(minutes=5)))
+
+    with transaction.atomic():
+        Calendar.objects.bulk_create(calendars, batch_size=1000)
+        # MySQL은 bulk_create 후 pk를 돌려주지 않으므로 다시 조회
+        calendar_ids = {(user_id, day): pk for pk, user_id, day in Calendar.objects.filter(
+            user__in=users, date__range=(first_day, last_day)).values_list('pk', 'user_id', 'date')}
+        for calendar, walk in walks:
+            walk.calendar_id = calendar_ids[(calendar.user_id, calendar.date)]
+            walk.user_id = calendar.user_id
+        WalkHistory.objects.bulk_create([walk for _, walk in walks], batch_size=1000)
+        SRI.objects.bulk_create(sris, batch_size=1000)
+
+        user_ids = [user.pk for user in users]
+        rebuild_monthly_rollups(user_ids)
+        reconcile_user_stats(user_ids)
+        User.objects.grant_points_bulk(points)
+        # bulk_create로 만든 사용자는 가입 signal이 없으므로 순위 스냅샷을 다시 만듦
+        rebuild_leaderboard()
+    return {'calendars': len(calendars), 'walks': len(walks), 'sris': len(sris)}
@@ -0,0 +1,136 @@
+import asyncio
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+import httpx
+import uvicorn
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from server.fake_inference import random_sentence, start_fake_server
+from server.models import Calendar, User
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    # uWSGI 워커처럼 동시에 처리하는 요청 수를 threads개로 제한 (.config/uwsgi/mysite.ini: 워커 1개, 스레드 1개)
+    request_queue_size = 1024
+
+    def __init__(self, address, threads):
+        super().__init__(address, QuietRequestHandler)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def start_wsgi(threads):
+    server = PooledWSGIServer(('127.0.0.1', 0), threads)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def start_asgi():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(get_asgi_application(), lifespan='off', log_level='warning',
+                                           backlog=1024))
+    threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+
+    return stop, f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+class Command(BaseCommand):
+    help = ('모델 서버 지연이 1~2초일 때 emotion-analyze-large를 현재 uWSGI 구성(WSGI, 워커 스레드 수 제한)과 '
+            'ASGI(uvicorn, 비동기 뷰)로 처리한 처리량과 지연 시간을 비교합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=60, help='서버별로 보낼 요청 수')
+        parser.add_argument('--concurrency', type=int, default=20, help='동시에 요청하는 사용자 수')
+        parser.add_argument('--latency-ms', type=float, default=1000, help='가짜 모델 서버의 최소 지연(ms)')
+        parser.add_argument('--jitter-ms', type=float, default=1000, help='최소 지연에 더하는 0~jitter 지연(ms)')
+        parser.add_argument('--wsgi-threads', type=int, default=1, help='WSGI 서버가 동시에 처리하는 요청 수')
+
+    def handle(self, *args, **options):
+        model_server, model_url = start_fake_server(latency_ms=options['latency_ms'], jitter_ms=options['jitter_ms'],
+                                                    per_item_ms=0, max_concurrency=options['concurrency'])
+        user = User.objects.create_user(f'bench-{uuid.uuid4().hex[:8]}', 'bench', 'password')
+        Calendar.objects.create(user=user, date=timezone.now().date())
+        token = Token.objects.create(user=user).key
+        overrides = override_settings(EMOTION_MODEL_URL=model_url, EMOTION_MODEL_TIMEOUT=60,
+                                      EMOTION_BATCH_ENABLED=False, EMOTION_ANALYZE_DEFAULT_MODE='sync',
+                                      EMOTION_MODEL_POOL_SIZE=options['concurrency'])
+        self.stdout.write(
+            f"model latency {options['latency_ms']:.0f}~{options['latency_ms'] + options['jitter_ms']:.0f}ms, "
+            f"{options['requests']} requests, concurrency {options['concurrency']}, "
+            f"wsgi threads {options['wsgi_threads']}"
+        )
+        try:
+            with overrides:
+                for name, start in [('wsgi', lambda: start_wsgi(options['wsgi_threads'])), ('asgi', start_asgi)]:
+                    stop, base_url = start()
+                    try:
+                        self.report(name, asyncio.run(self.load(base_url, token, options['requests'],
+                                                                options['concurrency'])))
+                    finally:
+                        stop()
+        finally:
+            user.delete()
+            model_server.shutdown()
+
+    async def load(self, base_url, token, total, concurrency):
+        # 문장마다 다른 값을 붙여서 감정 분석 캐시에 걸리지 않게 함 (모든 요청이 모델 서버를 기다림)
+        url = f'{base_url}/server/emotion-analyze-large/'
+        headers = {'Authorization': f'Token {token}'}
+        slots = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency)
+
+        async with httpx.AsyncClient(timeout=600, limits=limits) as client:
+            async def send():
+                async with slots:
+                    started = time.perf_counter()
+                    sentence = f'{random_sentence()} {uuid.uuid4().hex[:8]}'
+                    response = await client.post(url, json={'sentence': sentence}, headers=headers)
+                    return (time.perf_counter() - started) * 1000, response.status_code
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(send() for _ in range(total)))
+            return results, time.perf_counter() - started
+
+    def report(self, name, measured):
+        results, elapsed = measured
+        latencies = [latency for latency, _ in results]
+        errors = sum(status_code != 200 for _, status_code in results)
+        percentiles = quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{name:>6}: {len(results) / elapsed:8.1f} req/s  '
+            f'p50={percentiles[49]:8.1f}ms  p95={percentiles[94]:8.1f}ms  p99={percentiles[98]:8.1f}ms  '
+            f'errors={errors}'
+        )
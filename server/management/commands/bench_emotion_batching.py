@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+
+import requests
+from django.core.management.base import BaseCommand
+
+from server.emotion_batch import EmotionBatcher
+from server.inference_client import InferenceClient
+from server.fake_inference import random_sentence, start_fake_server
+
+
+class Command(BaseCommand):
+    help = '감정 분석 요청을 batch 없이 보낼 때와 micro-batching으로 보낼 때의 처리량과 지연 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='모델 서버 주소 (없으면 로컬 가짜 서버를 띄움)')
+        parser.add_argument('--requests', type=int, default=200, help='보낼 문장 수')
+        parser.add_argument('--concurrency', type=int, default=50, help='동시에 요청하는 사용자 수')
+        parser.add_argument('--latency-ms', type=float, default=200, help='가짜 서버의 요청당 지연(ms)')
+        parser.add_argument('--window-ms', type=int, default=10)
+        parser.add_argument('--max-size', type=int, default=32)
+
+    def handle(self, *args, **options):
+        url = options['url']
+        if not url:
+            _, url = start_fake_server(latency_ms=options['latency_ms'])
+        sentences = [random_sentence() for _ in range(options['requests'])]
+
+        def single(sentence):
+            return requests.post(url, json={'text': sentence}, timeout=60).json()['emotion']
+
+        client = InferenceClient(url, read_timeout=60, pool_size=options['concurrency'])
+        batcher = EmotionBatcher(client, window_ms=options['window_ms'], max_size=options['max_size'])
+        for name, predict in [('unbatched', single), ('batched', batcher.predict)]:
+            self.report(name, predict, sentences, options['concurrency'])
+
+    def report(self, name, predict, sentences, concurrency):
+        def timed(sentence):
+            started = time.perf_counter()
+            predict(sentence)
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed, sentences))
+        elapsed = time.perf_counter() - started
+
+        percentiles = quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{name:>10}: {len(sentences) / elapsed:8.1f} req/s  '
+            f'p50={percentiles[49]:7.1f}ms  p95={percentiles[94]:7.1f}ms  p99={percentiles[98]:7.1f}ms'
+        )
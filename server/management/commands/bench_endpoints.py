@@ -0,0 +1,451 @@
+import json
+import subprocess
+import time
+import uuid
+from statistics import median, quantiles
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Min
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from server import urls as server_urls
+from server.course import save_course
+from server.emotion_jobs import enqueue_emotion_job
+from server.fake_inference import random_sentence, start_fake_server
+from server.history import format_cursor
+from server.kinect import encode_samples
+from server.loadgen import generated_users
+from server.models import Calendar, User, WalkHistory, month_bounds
+
+# 엔드포인트별 요청 (label, URL 이름, 요청을 만드는 함수)
+# 요청을 만드는 함수는 측정 전에 실행되며(준비용 데이터 생성 포함) bench_request(...)를 반환
+# server/urls.py에 경로를 추가하면 여기에도 추가해야 함 (빠진 경로는 실행할 때 경고)
+ENDPOINTS = []
+
+
+def bench_request(method, path, data=None, token=None, content_type=None):
+    # content_type이 없으면 data를 JSON으로 보냄
+    return {'method': method, 'path': path, 'data': data, 'token': token, 'content_type': content_type}
+
+
+def endpoint(label, url_name):
+    def decorator(build):
+        ENDPOINTS.append((label, url_name, build))
+        return build
+
+    return decorator
+
+
+class BenchContext:
+    # 벤치마크 대상 사용자(generate_load_data로 만든 사용자)와 요청에 쓸 기존 기록
+    def __init__(self, users, password):
+        self.users = users
+        self.password = password
+        self.tokens = dict(Token.objects.filter(user__in=users).values_list('user_id', 'key'))
+        for user in users:
+            if user.pk not in self.tokens:
+                self.tokens[user.pk] = Token.objects.create(user=user).key
+        walks = WalkHistory.objects.filter(calendar__user__in=users).values_list('calendar__user_id', 'id')
+        self.walk_ids = {}
+        for user_id, walk_id in walks:
+            self.walk_ids.setdefault(user_id, []).append(walk_id)
+        self.months = {}
+        for user_id, year, month in Calendar.objects.filter(user__in=users).values_list(
+                'user_id', 'year', 'month').distinct():
+            self.months.setdefault(user_id, []).append((year, month))
+        self.dates = dict(Calendar.objects.filter(user__in=users).values('user_id').annotate(
+            first=Min('date')).values_list('user_id', 'first'))
+        self.hashed_password = make_password(password)
+        self.admin = self.throwaway_user(is_staff=True, is_superuser=True)
+
+    def user(self, i):
+        return self.users[i % len(self.users)]
+
+    def token(self, user):
+        return self.tokens[user.pk]
+
+    def pick(self, values, i):
+        return values[(i * 7919) % len(values)]
+
+    def throwaway_user(self, **fields):
+        # 로그아웃/탈퇴처럼 사용자를 바꾸는 요청용 (비밀번호 해시는 한 번만 계산)
+        name = f'bt{uuid.uuid4().hex[:8]}'
+        user = User.objects.create(username=name, nickname=name, password=self.hashed_password, **fields)
+        self.tokens[user.pk] = Token.objects.create(user=user).key
+        return user
+
+    def today_calendar(self, user):
+        return Calendar.objects.get_or_create_for_date(user, timezone.now().date())[0]
+
+    def open_walk(self, user):
+        return WalkHistory.objects.create(calendar=self.today_calendar(user), start_time=timezone.now())
+
+
+@endpoint('user-signup', 'user-signup')
+def _signup(ctx, i):
+    name = f'bs{uuid.uuid4().hex[:8]}'
+    return bench_request('POST', '/server/user-signup/', {'username': name, 'nickname': name, 'password': ctx.password})
+
+
+@endpoint('user-login', 'user-login')
+def _login(ctx, i):
+    user = ctx.user(i)
+    return bench_request('POST', '/server/user-login/', {'username': user.username, 'password': ctx.password})
+
+
+@endpoint('user-logout', 'user-logout')
+def _logout(ctx, i):
+    return bench_request('POST', '/server/user-logout/', None, ctx.token(ctx.throwaway_user()))
+
+
+@endpoint('user-delete', 'user-delete')
+def _delete(ctx, i):
+    return bench_request('DELETE', '/server/user-delete/', None, ctx.token(ctx.throwaway_user()))
+
+
+@endpoint('get-calendar', 'get-calendar')
+def _get_calendar(ctx, i):
+    return bench_request('POST', '/server/get-calendar/', None, ctx.token(ctx.user(i)))
+
+
+@endpoint('sri-list', 'sri-list-create')
+def _sri_list(ctx, i):
+    return bench_request('GET', '/server/sri/', None, ctx.token(ctx.user(i)))
+
+
+@endpoint('sri-create', 'sri-list-create')
+def _sri_create(ctx, i):
+    return bench_request('POST', '/server/sri/', {'sri_score': 30 + i % 20}, ctx.token(ctx.user(i)))
+
+
+@endpoint('emotion-analyze-large', 'emotion-analyze-large')
+def _analyze(ctx, i):
+    user = ctx.user(i)
+    ctx.today_calendar(user)
+    # 문장마다 다른 값을 붙여서 감정 분석 캐시에 걸리지 않게 함
+    sentence = f'{random_sentence()} {uuid.uuid4().hex[:8]}'
+    return bench_request('POST', '/server/emotion-analyze-large/', {'sentence': sentence, 'mode': 'sync'},
+                         ctx.token(user))
+
+
+@endpoint('emotion-job', 'emotion-job-status')
+def _job_status(ctx, i):
+    user = ctx.user(i)
+    job = enqueue_emotion_job(ctx.today_calendar(user), random_sentence())
+    return bench_request('GET', f'/server/emotion-job/{job.id}/', None, ctx.token(user))
+
+
+@endpoint('emotion-cache-stats', 'emotion-cache-stats')
+def _emotion_cache_stats(ctx, i):
+    return bench_request('GET', '/server/emotion-cache-stats/', None, ctx.token(ctx.admin))
+
+
+@endpoint('response-cache-stats', 'response-cache-stats')
+def _response_cache_stats(ctx, i):
+    return bench_request('GET', '/server/response-cache-stats/', None, ctx.token(ctx.admin))
+
+
+@endpoint('emotion-client-stats', 'emotion-client-stats')
+def _emotion_client_stats(ctx, i):
+    return bench_request('GET', '/server/emotion-client-stats/', None, ctx.token(ctx.admin))
+
+
+@endpoint('profile-list', 'profile-list')
+def _profile_list(ctx, i):
+    return bench_request('GET', '/server/profiles/', None, ctx.token(ctx.admin))
+
+
+@endpoint('emotion-save-small', 'emotion-save-small')
+def _save_small(ctx, i):
+    user = ctx.user(i)
+    ctx.today_calendar(user)
+    return bench_request('POST', '/server/emotion-save-small/', {'emotion_small': '편안함'}, ctx.token(user))
+
+
+@endpoint('emotion-list-create', 'emotion-list-create')
+def _emotion_list(ctx, i):
+    user = ctx.user(i)
+    day = ctx.dates.get(user.pk, timezone.now().date())
+    return bench_request('GET', f'/server/emotion-list-create/?todayDate={day}', None, ctx.token(user))
+
+
+@endpoint('emotion-list-range', 'emotion-list-range')
+def _emotion_range(ctx, i):
+    # 달력 화면 한 달
+    user = ctx.user(i)
+    year, month = ctx.pick(ctx.months[user.pk], i)
+    first_day, last_day = month_bounds(year, month)
+    return bench_request('GET', f'/server/emotion-list-range/?start={first_day}&end={last_day}', None,
+                         ctx.token(user))
+
+
+@endpoint('walk-start', 'walk-start')
+def _walk_start(ctx, i):
+    return bench_request('POST', '/server/walk-start/', {'playtime': 20}, ctx.token(ctx.user(i)))
+
+
+@endpoint('walk-kinect', 'walk-kinect-upload')
+def _kinect(ctx, i):
+    user = ctx.user(i)
+    walk = ctx.open_walk(user)
+    samples = encode_samples([60 + (n % 30) for n in range(256)])
+    return bench_request('POST', f'/server/walk-kinect/{walk.id}/', samples, ctx.token(user),
+                         'application/octet-stream')
+
+
+@endpoint('walk-course-upload', 'walk-course')
+def _course_upload(ctx, i):
+    user = ctx.user(i)
+    walk = ctx.open_walk(user)
+    points = [[37.5665 + n * 1e-5, 126.9780 + n * 1e-5, n] for n in range(1800)]
+    return bench_request('POST', f'/server/walk-course/{walk.id}/', {'points': points}, ctx.token(user))
+
+
+@endpoint('walk-course', 'walk-course')
+def _course_get(ctx, i):
+    user = ctx.user(i)
+    walk = ctx.open_walk(user)
+    lat = [37.5665 + n * 1e-5 for n in range(1800)]
+    lng = [126.9780 + n * 1e-5 for n in range(1800)]
+    save_course(walk, lat, lng, list(range(1800)))
+    return bench_request('GET', f'/server/walk-course/{walk.id}/', None, ctx.token(user))
+
+
+@endpoint('walk-end', 'walk-end')
+def _walk_end(ctx, i):
+    user = ctx.user(i)
+    walk = ctx.open_walk(user)
+    return bench_request('POST', f'/server/walk-end/{walk.id}/', {'kinect_data': 72.5, 'distance': 1500},
+                         ctx.token(user))
+
+
+@endpoint('walk-simple-report', 'walk-simple-report')
+def _simple_report(ctx, i):
+    user = ctx.user(i)
+    walk_id = ctx.pick(ctx.walk_ids[user.pk], i)
+    return bench_request('GET', f'/server/walk-simple-report/{walk_id}/', None, ctx.token(user))
+
+
+@endpoint('walk-satisfy-update', 'walk-satisfy-update')
+def _satisfy(ctx, i):
+    user = ctx.user(i)
+    walk_id = ctx.pick(ctx.walk_ids[user.pk], i)
+    return bench_request('PUT', f'/server/walk-satisfy-update/{walk_id}/', {'walk_score': 1 + i % 5}, ctx.token(user))
+
+
+@endpoint('sync', 'sync')
+def _sync(ctx, i):
+    user = ctx.user(i)
+    now = timezone.now()
+    key = uuid.uuid4().hex[:12]
+    records = [
+        {'type': 'walk_start', 'client_id': f'w-{key}', 'timestamp': now.isoformat(), 'playtime': 20},
+        {'type': 'walk_end', 'client_id': f'e-{key}', 'walk': f'w-{key}', 'timestamp': now.isoformat(),
+         'kinect_data': 70.0, 'distance': 1200},
+        {'type': 'sri', 'client_id': f's-{key}', 'timestamp': now.isoformat(), 'sri_score': 35},
+        {'type': 'emotion_small', 'client_id': f'm-{key}', 'timestamp': now.isoformat(), 'emotion_small': '설렘'},
+    ]
+    return bench_request('POST', '/server/sync/', {'records': records}, ctx.token(user))
+
+
+@endpoint('walk-once-report', 'walk-once-report')
+def _once_report(ctx, i):
+    user = ctx.user(i)
+    walk_id = ctx.pick(ctx.walk_ids[user.pk], i)
+    return bench_request('GET', f'/server/walk-once-report/{walk_id}/', None, ctx.token(user))
+
+
+@endpoint('walk-monthly-report', 'walk-monthly-report')
+def _monthly_report(ctx, i):
+    user = ctx.user(i)
+    year, month = ctx.pick(ctx.months[user.pk], i)
+    return bench_request('GET', f'/server/walk-monthly-report/{year}/{month}/', None, ctx.token(user))
+
+
+@endpoint('walk-range-report', 'walk-range-report')
+def _range_report(ctx, i):
+    # 연간 추이 화면: 고른 달까지 12개월
+    user = ctx.user(i)
+    year, month = ctx.pick(ctx.months[user.pk], i)
+    start_year, start_month = (year, 1) if month == 12 else (year - 1, month + 1)
+    return bench_request('GET', f'/server/walk-range-report/{start_year}/{start_month}/{year}/{month}/', None,
+                         ctx.token(user))
+
+
+@endpoint('leaderboard-top', 'leaderboard-top')
+def _leaderboard_top(ctx, i):
+    return bench_request('GET', '/server/leaderboard/?limit=50', None, ctx.token(ctx.user(i)))
+
+
+@endpoint('leaderboard-me', 'leaderboard-me')
+def _leaderboard_me(ctx, i):
+    return bench_request('GET', '/server/leaderboard/me/?neighbours=5', None, ctx.token(ctx.user(i)))
+
+
+@endpoint('walk-history', 'walk-history')
+def _walk_history(ctx, i):
+    # 기록 중간쯤을 넘겨 보는 요청 (고른 산책 다음 페이지)
+    user = ctx.user(i)
+    walk = WalkHistory.objects.values('start_time', 'id').get(pk=ctx.pick(ctx.walk_ids[user.pk], i))
+    cursor = format_cursor(walk['start_time'], walk['id'])
+    return bench_request('GET', f'/server/walk-history/?limit=20&cursor={cursor}', None, ctx.token(user))
+
+
+@endpoint('sri-history', 'sri-history')
+def _sri_history(ctx, i):
+    user = ctx.user(i)
+    first_day = ctx.dates[user.pk]
+    return bench_request('GET', f'/server/sri-history/?limit=20&start={first_day}', None, ctx.token(user))
+
+
+def summarize(latencies, queries, statuses):
+    # 요청이 1개면 모든 백분위수가 그 값
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    codes = {}
+    for code in statuses:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    return {
+        'requests': len(latencies),
+        'errors': sum(code >= 400 for code in statuses),
+        'status_codes': codes,
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        # 요청을 하나씩 보냈을 때의 처리량 (동시 요청 처리량은 bench_asgi_views 참고)
+        'throughput_rps': round(len(latencies) / (sum(latencies) / 1000), 2),
+        'queries_median': median(queries),
+        'queries_max': max(queries),
+    }
+
+
+def find_regressions(results, baseline, threshold, min_delta_ms):
+    # p95가 기준보다 threshold 비율 이상(그리고 min_delta_ms 이상) 느려졌거나 쿼리 수가 늘어난 엔드포인트
+    regressions = []
+    for label, current in results.items():
+        before = baseline.get(label)
+        if before is None:
+            continue
+        if current['p95_ms'] > before['p95_ms'] * (1 + threshold) and \
+                current['p95_ms'] - before['p95_ms'] >= min_delta_ms:
+            regressions.append(f'{label}: p95 {before["p95_ms"]}ms -> {current["p95_ms"]}ms')
+        # 첫 요청에만 생기는 쿼리(통계 행 생성 등)에 흔들리지 않도록 중앙값으로 비교
+        if current['queries_median'] > before['queries_median']:
+            regressions.append(f'{label}: queries {before["queries_median"]:g} -> {current["queries_median"]:g}')
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('server/urls.py의 모든 엔드포인트를 test client로 호출해서 지연 시간(p50/p95/p99), 처리량, SQL 쿼리 수를 '
+            '측정하고 JSON 파일로 저장합니다. generate_load_data로 만든 사용자를 사용하며 '
+            '모든 요청은 한 트랜잭션 안에서 실행한 뒤 되돌립니다 (--commit으로 변경).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load', help='generate_load_data의 사용자 이름 앞부분')
+        parser.add_argument('--password', default='password', help='generate_load_data의 비밀번호')
+        parser.add_argument('--users', type=int, default=20, help='요청을 나눠 보낼 사용자 수')
+        parser.add_argument('--iterations', type=int, default=30, help='엔드포인트별 측정 요청 수')
+        parser.add_argument('--warmup', type=int, default=2, help='엔드포인트별 측정 전 요청 수')
+        parser.add_argument('--only', action='append', help='이 label의 엔드포인트만 측정 (여러 번 지정 가능)')
+        parser.add_argument('--model-latency-ms', type=float, default=0, help='가짜 감정 분석 모델 서버의 지연(ms)')
+        parser.add_argument('--no-response-cache', action='store_true', help='읽기 API 응답 캐시를 끄고 측정')
+        parser.add_argument('--output', default='bench-results.json', help='결과 JSON 파일')
+        parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+        parser.add_argument('--threshold', type=float, default=0.2, help='p95가 이 비율 이상 늘면 회귀로 판단')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0, help='이보다 작은 p95 차이는 무시')
+        parser.add_argument('--fail-on-regression', action='store_true', help='회귀가 있으면 실패 종료')
+        parser.add_argument('--commit', action='store_true', help='요청으로 바뀐 데이터를 되돌리지 않음')
+
+    def handle(self, *args, **options):
+        users = list(generated_users(options['prefix']).order_by('pk')[:options['users']])
+        if not users:
+            raise CommandError(f'No {options["prefix"]}* users found. Run generate_load_data first.')
+        missing = {pattern.name for pattern in server_urls.urlpatterns} - {url_name for _, url_name, _ in ENDPOINTS}
+        for name in sorted(missing):
+            self.stderr.write(f'warning: no benchmark request for route {name!r}')
+        endpoints = [spec for spec in ENDPOINTS if not options['only'] or spec[0] in options['only']]
+
+        model_server, model_url = start_fake_server(latency_ms=options['model_latency_ms'], per_item_ms=0,
+                                                    max_concurrency=4)
+        # test client의 Host('testserver')는 테스트 실행기 밖에서는 허용 목록에 없으므로 추가
+        overrides = override_settings(EMOTION_MODEL_URL=model_url, EMOTION_BATCH_ENABLED=False,
+                                      RESPONSE_CACHE_ENABLED=not options['no_response_cache'],
+                                      ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+        results = {}
+        try:
+            with overrides, transaction.atomic():
+                ctx = BenchContext(users, options['password'])
+                for label, url_name, build in endpoints:
+                    results[label] = {'url_name': url_name, **self.measure(ctx, build, options)}
+                    self.print_row(label, results[label])
+                transaction.set_rollback(not options['commit'])
+        finally:
+            model_server.shutdown()
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'git_commit': git_commit(),
+            'database': connection.vendor,
+            'users': len(users),
+            'iterations': options['iterations'],
+            'response_cache': not options['no_response_cache'],
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        self.stdout.write(f'results written to {options["output"]}')
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['endpoints']
+            regressions = find_regressions(results, baseline, options['threshold'], options['min_delta_ms'])
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(f'REGRESSION {line}'))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f'no regressions against {options["baseline"]}'))
+            elif options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+
+    def measure(self, ctx, build, options):
+        client = APIClient()
+        latencies, queries, statuses = [], [], []
+        for i in range(options['warmup'] + options['iterations']):
+            request = build(ctx, i)
+            client.credentials(**({'HTTP_AUTHORIZATION': f'Token {request["token"]}'} if request['token'] else {}))
+            send = getattr(client, request['method'].lower())
+            if request['content_type']:
+                kwargs = {'data': request['data'], 'content_type': request['content_type']}
+            elif request['method'] != 'GET':
+                kwargs = {'data': request['data'], 'format': 'json'}
+            else:
+                kwargs = {}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = send(request['path'], **kwargs)
+                elapsed = (time.perf_counter() - started) * 1000
+            if i >= options['warmup']:
+                latencies.append(elapsed)
+                queries.append(len(captured))
+                statuses.append(response.status_code)
+        return summarize(latencies, queries, statuses)
+
+    def print_row(self, label, result):
+        self.stdout.write(
+            f'{label:>22}: p50={result["p50_ms"]:8.2f}ms  p95={result["p95_ms"]:8.2f}ms  '
+            f'p99={result["p99_ms"]:8.2f}ms  {result["throughput_rps"]:8.1f} req/s  '
+            f'queries={result["queries_median"]:g}/{result["queries_max"]}  errors={result["errors"]}'
+        )
@@ -0,0 +1,60 @@
+import time
+from datetime import date, datetime, timedelta
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from server.history import WALK_HISTORY_FIELDS, walk_history_page
+from server.models import Calendar, User, WalkHistory
+
+
+class Command(BaseCommand):
+    help = ('산책 기록이 많은 사용자 1명(기본 2만 개)의 산책 기록 목록을 페이지 깊이별로 '
+            'OFFSET 페이지와 keyset 페이지(walk-history)로 읽는 시간을 비교합니다. 만든 데이터는 끝나면 rollback 합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--walks', type=int, default=20000)
+        parser.add_argument('--limit', type=int, default=20, help='한 페이지 기록 수')
+        parser.add_argument('--repeat', type=int, default=20, help='깊이마다 반복 횟수')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options['walks'], options['limit'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def run(self, count, limit, repeat):
+        started = time.perf_counter()
+        user = User.objects.create_user('bhistory', 'bhistory', 'password')
+        # 하루 2번 산책
+        days = [date(2000, 1, 1) + timedelta(days=offset) for offset in range((count + 1) // 2)]
+        Calendar.objects.bulk_create(Calendar(user=user, date=day, year=day.year, month=day.month, day=day.day)
+                                     for day in days)
+        calendar_ids = dict(Calendar.objects.filter(user=user).values_list('date', 'pk'))
+        walks = []
+        for index in range(count):
+            day = days[index // 2]
+            start_time = datetime(day.year, day.month, day.day, 8 + index % 2 * 10)
+            walks.append(WalkHistory(calendar_id=calendar_ids[day], user=user, start_time=start_time,
+                                     end_time=start_time + timedelta(minutes=30), distance=2000, stable_score=80))
+        WalkHistory.objects.bulk_create(walks, batch_size=5000)
+        self.stdout.write(f'{count} walks created in {time.perf_counter() - started:.1f}s')
+
+        ordered = WalkHistory.objects.filter(user=user).order_by('-start_time', '-id')
+        for depth in sorted({0, count // 20, count // 4, count // 2, count - limit}):
+            # OFFSET 페이지
+            offset_ms = self.measure(repeat, lambda: list(ordered.values(*WALK_HISTORY_FIELDS)[depth:depth + limit]))
+            # keyset 페이지: 바로 앞 기록을 커서로
+            previous = ordered.values('start_time', 'id')[depth - 1] if depth else None
+            after = (previous['start_time'], previous['id']) if previous else None
+            keyset_ms = self.measure(repeat, lambda: walk_history_page(user, limit, after))
+            self.stdout.write(f'depth {depth:>7}: OFFSET {offset_ms:8.2f}ms  keyset {keyset_ms:8.2f}ms')
+
+    def measure(self, repeat, function):
+        # 반복 측정의 중앙값(ms)
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            latencies.append((time.perf_counter() - started) * 1000)
+        return median(latencies)
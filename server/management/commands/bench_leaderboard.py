@@ -0,0 +1,80 @@
+import random
+import time
+from statistics import quantiles
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from server.leaderboard import move_scores, neighbours, rank_for, rebuild_leaderboard, top_page
+from server.models import User
+
+
+def timed(function, arguments):
+    # [(ms, 결과)] 인자마다 1번씩 실행
+    results = []
+    for argument in arguments:
+        started = time.perf_counter()
+        value = function(argument)
+        results.append(((time.perf_counter() - started) * 1000, value))
+    return results
+
+
+class Command(BaseCommand):
+    help = ('사용자 수가 많을 때(기본 100만 명) 순위 조회를 COUNT 쿼리로 할 때와 순위 스냅샷(LeaderboardBucket)으로 할 때, '
+            '상위 N명 keyset 페이지, 포인트 지급 후 스냅샷 갱신 시간을 측정합니다. 만든 데이터는 끝나면 rollback 합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000000)
+        parser.add_argument('--lookups', type=int, default=200, help='순위 조회 횟수')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self.run(rng, options['users'], options['lookups'])
+            transaction.set_rollback(True)
+
+    def run(self, rng, count, lookups):
+        started = time.perf_counter()
+        # 대부분은 포인트가 적고 소수만 많은 분포 (산책 1회 7~25점)
+        first_id = (User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+        User.objects.bulk_create(
+            (User(id=first_id + index, username=f'lb{index:07d}', nickname='bench', password='!',
+                  total_points=int(rng.paretovariate(1.2) * 20) - 20) for index in range(count)),
+            batch_size=5000,
+        )
+        self.stdout.write(f'{count} users created in {time.perf_counter() - started:.1f}s')
+
+        started = time.perf_counter()
+        buckets = rebuild_leaderboard()
+        self.stdout.write(f'rebuild_leaderboard: {buckets} buckets in {(time.perf_counter() - started) * 1000:.0f}ms')
+
+        scores = [rng.choice([0, 20, 100, 500, 2000]) + rng.randint(0, 19) for _ in range(lookups)]
+        naive = timed(lambda score: User.objects.filter(total_points__gt=score).count() + 1, scores)
+        snapshot = timed(rank_for, scores)
+        mismatches = sum(a[1] != b[1] for a, b in zip(naive, snapshot))
+        self.report('rank COUNT(*)', [ms for ms, _ in naive])
+        self.report('rank snapshot', [ms for ms, _ in snapshot])
+        self.stdout.write(f'rank mismatches: {mismatches}')
+
+        # 상위 N명: 첫 페이지와 깊은 페이지(keyset)
+        pages = []
+        cursor = None
+        for _ in range(lookups):
+            started = time.perf_counter()
+            page = top_page(50, cursor)
+            pages.append((time.perf_counter() - started) * 1000)
+            cursor = (page[-1]['total_points'], page[-1]['id'])
+        self.report(f'top page x{lookups}', pages)
+
+        users = list(User.objects.filter(pk__gte=first_id).order_by('?')[:lookups])
+        self.report('neighbours', [ms for ms, _ in timed(lambda user: neighbours(user.pk, user.total_points, 5), users)])
+
+        # walk_end의 포인트 지급 후 스냅샷 갱신 (산책 1회 7~25점)
+        self.report('push update', [ms for ms, _ in timed(
+            lambda user: move_scores([(user.total_points, user.total_points + rng.randint(7, 25))]), users)])
+
+    def report(self, name, latencies):
+        percentiles = quantiles(latencies, n=100)
+        self.stdout.write(f'{name:>16}: p50={percentiles[49]:8.2f}ms  p95={percentiles[94]:8.2f}ms  '
+                          f'max={max(latencies):8.2f}ms')
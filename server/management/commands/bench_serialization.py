@@ -0,0 +1,90 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from server.fake_inference import random_sentence
+from server.loadgen import EMOTION_LARGE_WEIGHTS, EMOTION_SMALL
+from server.models import Calendar, WalkHistory
+from server.renderers import FastJSONRenderer, orjson
+from server.serializers import EmotionSerializer, WalkReportSerializer, emotion_row, walk_report_row
+
+
+def emotion_rows(count, rng):
+    # emotion_list_range 응답처럼 날짜별 감정 기록 (DB 없이 values() 행 형태로 만듦)
+    first_day = date(2024, 1, 1)
+    return [{
+        'id': index + 1,
+        'date': first_day + timedelta(days=index),
+        'question': '오늘 산책은 어땠나요?',
+        'sentence': random_sentence(),
+        'emotion_large': rng.choice(list(EMOTION_LARGE_WEIGHTS)),
+        'emotion_small': rng.choice(EMOTION_SMALL),
+    } for index in range(count)]
+
+
+def walk_rows(count, rng):
+    started = datetime(2024, 1, 1, 8)
+    rows = []
+    for index in range(count):
+        start_time = started + timedelta(hours=index * 7)
+        rows.append({
+            'id': index + 1,
+            'start_time': start_time,
+            'end_time': start_time + timedelta(minutes=rng.randint(5, 60)),
+            'distance': rng.randint(300, 5000),
+            'walk_score': float(rng.randint(1, 5)),
+            'stable_score': round(rng.uniform(40, 100), 2),
+        })
+    return rows
+
+
+def cpu_ms(function, iterations):
+    # 1회 평균 CPU 시간(ms)
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - started) * 1000 / iterations
+
+
+class Command(BaseCommand):
+    help = ('큰 목록 응답에서 DRF JSONRenderer와 FastJSONRenderer(orjson), '
+            'ModelSerializer와 values() 행 직렬화의 응답 1개당 CPU 시간을 비교합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=1000, help='응답 1개에 들어가는 기록 수')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count, iterations = options['records'], options['iterations']
+        emotions = emotion_rows(count, rng)
+        walks = walk_rows(count, rng)
+        calendars = [Calendar(**row) for row in emotions]
+        walk_objects = [WalkHistory(**row) for row in walks]
+        self.stdout.write(f'{count} records per response, {iterations} iterations, '
+                          f'orjson {"available" if orjson else "not installed (FastJSONRenderer falls back)"}')
+
+        payload = {'message': 'successfully',
+                   'emotions': [{**emotion_row(row), 'walkhistory_id': [row['id']]} for row in emotions],
+                   'walks': [walk_report_row(row) for row in walks]}
+        self.compare('render', iterations,
+                     ('JSONRenderer', lambda: JSONRenderer().render(payload)),
+                     ('FastJSONRenderer', lambda: FastJSONRenderer().render(payload)))
+        self.compare('emotions', iterations,
+                     ('EmotionSerializer', lambda: EmotionSerializer(calendars, many=True).data),
+                     ('emotion_row', lambda: [emotion_row(row) for row in emotions]))
+        self.compare('walks', iterations,
+                     ('WalkReportSerializer', lambda: WalkReportSerializer(walk_objects, many=True).data),
+                     ('walk_report_row', lambda: [walk_report_row(row) for row in walks]))
+
+    def compare(self, name, iterations, baseline, fast):
+        baseline_ms = cpu_ms(baseline[1], iterations)
+        fast_ms = cpu_ms(fast[1], iterations)
+        self.stdout.write(
+            f'{name:>8}: {baseline[0]:>20} {baseline_ms:8.2f}ms  {fast[0]:>16} {fast_ms:8.2f}ms  '
+            f'saved {baseline_ms - fast_ms:7.2f}ms ({baseline_ms / fast_ms:4.1f}x)'
+        )
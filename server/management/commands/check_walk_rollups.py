@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from server.rollups import find_rollup_mismatches, rebuild_monthly_rollups
+
+
+class Command(BaseCommand):
+    help = '월간 산책 집계(MonthlyWalkRollup)가 원본 테이블과 일치하는지 검사합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='특정 사용자 ID만 검사 (여러 번 지정 가능)')
+        parser.add_argument('--fix', action='store_true', help='불일치가 있는 사용자의 집계를 다시 만듦')
+
+    def handle(self, *args, **options):
+        mismatches = find_rollup_mismatches(options['user_ids'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('All monthly rollups are consistent'))
+            return
+
+        for user_id, year, month, field, stored, expected in mismatches:
+            self.stdout.write(f'user={user_id} {year}-{month:02d} {field}: stored={stored} expected={expected}')
+
+        user_ids = sorted({mismatch[0] for mismatch in mismatches})
+        if options['fix']:
+            rebuild_monthly_rollups(user_ids)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt monthly rollups for {len(user_ids)} users'))
+            return
+        raise CommandError(f'{len(mismatches)} mismatches found for {len(user_ids)} users')
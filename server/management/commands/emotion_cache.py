@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from server.models import EmotionCacheEntry
+
+
+class Command(BaseCommand):
+    help = '감정 분석 결과 캐시 테이블(EmotionCacheEntry) 상태를 보여주고 만료된 항목을 정리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purge', action='store_true', help='TTL이 지났거나 다른 모델 버전의 항목 삭제')
+
+    def handle(self, *args, **options):
+        expired_before = timezone.now() - timedelta(seconds=settings.EMOTION_CACHE_TTL_SECONDS)
+        stale = EmotionCacheEntry.objects.exclude(
+            model_version=settings.EMOTION_MODEL_VERSION, created_at__gt=expired_before
+        )
+        if options['purge']:
+            deleted, _ = stale.delete()
+            self.stdout.write(self.style.SUCCESS(f'{deleted} cache entries purged'))
+        self.stdout.write(f'{EmotionCacheEntry.objects.count()} cache entries '
+                          f'(model version {settings.EMOTION_MODEL_VERSION})')
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from server.fake_inference import start_fake_server
+
+
+class Command(BaseCommand):
+    help = '지연 시간을 설정할 수 있는 로컬 감정 분석 모델 서버(Colab /predict 대체)를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=200, help='요청당 고정 지연(ms)')
+        parser.add_argument('--per-item-ms', type=float, default=2, help='batch 안의 문장 1개당 추가 지연(ms)')
+        parser.add_argument('--max-concurrency', type=int, default=1, help='동시에 처리할 수 있는 요청 수')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='요청마다 0~jitter 사이의 추가 지연(ms)')
+
+    def handle(self, *args, **options):
+        server, url = start_fake_server(options['port'], options['latency_ms'], options['per_item_ms'],
+                                        options['max_concurrency'], options['jitter_ms'])
+        self.stdout.write(f'Fake emotion server listening on {url} (EMOTION_MODEL_URL={url})')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
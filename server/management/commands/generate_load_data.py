@@ -0,0 +1,55 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from server.loadgen import USERNAME_DIGITS, create_users, generate_history, generated_users
+
+
+class Command(BaseCommand):
+    help = ('부하 테스트용 사용자와 수년치 Calendar, WalkHistory, SRI 기록을 만듭니다. '
+            '사용자 이름은 <prefix>00000 형식이고 비밀번호는 모두 같습니다 (bench_endpoints가 이 사용자들을 사용).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='만들 사용자 수')
+        parser.add_argument('--years', type=float, default=2, help='오늘부터 거슬러 올라가 만들 기록 기간(년)')
+        parser.add_argument('--prefix', default='load', help=f'사용자 이름 앞부분 (최대 {10 - USERNAME_DIGITS}자)')
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--seed', type=int, default=0, help='같은 seed면 같은 분포의 데이터를 만듦')
+        parser.add_argument('--batch-size', type=int, default=50, help='한 트랜잭션에서 처리할 사용자 수')
+        parser.add_argument('--clear', action='store_true', help='같은 prefix로 만든 사용자와 기록을 먼저 삭제')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not prefix or len(prefix) > 10 - USERNAME_DIGITS:
+            raise CommandError(f'--prefix must be 1 to {10 - USERNAME_DIGITS} characters.')
+        existing = generated_users(prefix)
+        if options['clear']:
+            deleted = existing.count()
+            existing.delete()
+            self.stdout.write(f'{deleted} existing {prefix} users deleted')
+        # 이미 만든 사용자가 있으면 이어서 번호를 붙임
+        names = existing.values_list('username', flat=True)
+        start_index = max((int(name[len(prefix):]) for name in names), default=-1) + 1
+        if start_index + options['users'] > 10 ** USERNAME_DIGITS:
+            raise CommandError(f'At most {10 ** USERNAME_DIGITS} users can share the prefix {prefix!r}.')
+
+        rng = random.Random(options['seed'])
+        last_day = timezone.now().date() - timedelta(days=1)  # 오늘 기록은 부하 테스트 요청이 만듦
+        first_day = last_day - timedelta(days=int(options['years'] * 365))
+        totals = {'calendars': 0, 'walks': 0, 'sris': 0}
+        remaining = options['users']
+        while remaining > 0:
+            count = min(options['batch_size'], remaining)
+            users = create_users(prefix, count, options['password'], start_index=start_index)
+            for name, value in generate_history(users, first_day, last_day, rng).items():
+                totals[name] += value
+            start_index += count
+            remaining -= count
+            self.stdout.write(f'{options["users"] - remaining}/{options["users"]} users generated')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["users"]} users, {totals["calendars"]} calendars, {totals["walks"]} walks, '
+            f'{totals["sris"]} SRI results ({first_day} ~ {last_day})'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from server.profiling import SORT_KEYS, hot_functions, list_profiles, render_hot_functions
+
+
+class Command(BaseCommand):
+    help = '저장된 요청 프로파일(settings.PROFILE_DIR)을 합쳐서 시간이 많이 걸린 함수를 보여줍니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help='뷰 이름 ex) walk_monthly_report')
+        parser.add_argument('--user', type=int, dest='user_id', help='특정 사용자 ID의 요청만')
+        parser.add_argument('--last', type=int, help='최근 N개 프로파일만 합침')
+        parser.add_argument('--sort', choices=list(SORT_KEYS), default='tottime')
+        parser.add_argument('--limit', type=int, default=20, help='보여줄 함수 수')
+        parser.add_argument('--list', action='store_true', help='합치기 전에 프로파일 목록도 출력')
+
+    def handle(self, *args, **options):
+        profiles = list_profiles(options['view'], options['user_id'])[:options['last']]
+        if not profiles:
+            self.stdout.write('No profiles found')
+            return
+
+        if options['list']:
+            for meta in profiles:
+                self.stdout.write(f'{meta["name"]}  {meta["method"]} {meta["path"]}  user={meta["user_id"]} '
+                                  f'status={meta["status"]}  {meta["elapsed_ms"]:.1f}ms')
+        elapsed = sorted(meta['elapsed_ms'] for meta in profiles)
+        self.stdout.write(f'{len(profiles)} profiles, median {elapsed[len(elapsed) // 2]:.1f}ms, '
+                          f'max {elapsed[-1]:.1f}ms')
+        self.stdout.write(render_hot_functions(hot_functions(profiles, options['limit'], options['sort'])))
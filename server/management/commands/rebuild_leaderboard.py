@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from server.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = ('User 테이블로부터 리더보드 순위 스냅샷(LeaderboardBucket)을 다시 만듭니다. '
+            '포인트 지급 시 바로 갱신되지만 동시 요청으로 생긴 오차를 바로잡기 위해 주기적으로 실행합니다.')
+
+    def handle(self, *args, **options):
+        count = rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f'{count} leaderboard buckets rebuilt'))
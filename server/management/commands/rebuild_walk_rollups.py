@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from server.rollups import rebuild_monthly_rollups
+
+
+class Command(BaseCommand):
+    help = 'WalkHistory, Calendar 원본 테이블로부터 월간 산책 집계(MonthlyWalkRollup)를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='특정 사용자 ID만 다시 집계 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        count = rebuild_monthly_rollups(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'{count} monthly rollups rebuilt'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from server.models import User
+from server.user_stats import reconcile_user_stats
+
+
+class Command(BaseCommand):
+    help = '사용자 통계(UserStats: 산책 횟수, 마지막 SRI 검사 시각)를 원본 테이블 기준으로 다시 맞춥니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='특정 사용자 ID만 다시 계산 (여러 번 지정 가능)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids'] or list(User.objects.order_by('pk').values_list('pk', flat=True))
+        batch_size = options['batch_size']
+        fixed = 0
+        for start in range(0, len(user_ids), batch_size):
+            fixed += reconcile_user_stats(user_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'{fixed} of {len(user_ids)} user stats rows created or fixed'))
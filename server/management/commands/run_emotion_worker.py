@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from server.emotion_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = '비동기 감정 분석 작업(EmotionJob)을 처리하는 워커를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.EMOTION_WORKER_CONCURRENCY,
+                            help='동시에 모델 서버를 호출할 워커 스레드 수')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='대기 작업이 없을 때 polling 간격(초)')
+        parser.add_argument('--once', action='store_true', help='대기 중인 작업을 모두 처리한 뒤 종료')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting emotion worker with {options['concurrency']} threads")
+        run_worker(options['concurrency'], options['poll_interval'], stop_when_idle=options['once'])
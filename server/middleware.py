@@ -0,0 +1,69 @@
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.deprecation import MiddlewareMixin
+
+from .profiling import profile_requested, profile_view
+from .sql_stats import record_request, track_queries
+
+
+def _route(request):
+    if settings.ASGI_URLCONF and isinstance(request, ASGIRequest):
+        request.urlconf = settings.ASGI_URLCONF
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    # ASGI 서버(uvicorn)로 들어온 요청은 비동기 뷰가 등록된 URLconf(settings.ASGI_URLCONF)로 처리
+    # uWSGI로 들어온 요청은 기존 URLconf(ROOT_URLCONF)를 그대로 사용
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            _route(request)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            _route(request)
+            return get_response(request)
+    return middleware
+
+
+@sync_and_async_middleware
+def query_stats_middleware(get_response):
+    # 요청마다 SQL 쿼리 수, 전체 시간, 가장 느린 쿼리, 반복된 문장을 기록 (server.sql_stats)
+    if not settings.SQL_STATS_ENABLED:
+        raise MiddlewareNotUsed
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            # DB 연결은 스레드마다 따로 있으므로 요청의 쿼리가 실행되는 스레드(sync_to_async)에서 등록/해제
+            stack = ExitStack()
+            stats = await sync_to_async(stack.enter_context)(track_queries())
+            try:
+                response = await get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+            record_request(request, response, stats)
+            return response
+    else:
+        def middleware(request):
+            with track_queries() as stats:
+                response = get_response(request)
+            record_request(request, response, stats)
+            return response
+    return middleware
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    # 관리자의 X-Profile: 1 요청이나 settings.PROFILE_SAMPLE_RATE로 고른 요청의 뷰를 cProfile로 실행 (server.profiling)
+    # 다른 middleware의 process_view가 모두 실행된 뒤 뷰를 대신 호출하므로 MIDDLEWARE 마지막에 둠
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not profile_requested(request):
+            return None
+        if iscoroutinefunction(view_func):
+            # 비동기 뷰(server.async_views)는 기존 DRF 뷰에 넘기는 구간만 프로파일
+            request._profile = True
+            return None
+        return profile_view(request, view_func, view_args, view_kwargs)
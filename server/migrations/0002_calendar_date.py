@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calendar',
+            name='date',
+            field=models.DateField(null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import CharField, Count, DateField, Min, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+
+def _padded(field, length):
+    return LPad(Cast(field, CharField()), length, Value('0'))
+
+
+def backfill_calendar_date(apps, schema_editor):
+    Calendar = apps.get_model('server', 'Calendar')
+    WalkHistory = apps.get_model('server', 'WalkHistory')
+
+    # year/month/day 값으로 date 컬럼 채우기 ('YYYY-MM-DD' 문자열을 DB에서 date로 변환, UPDATE 한 번)
+    Calendar.objects.filter(date__isnull=True).update(date=Cast(
+        Concat(_padded('year', 4), Value('-'), _padded('month', 2), Value('-'), _padded('day', 2)),
+        DateField(),
+    ))
+
+    # get_or_create 경쟁으로 생긴 (user, date) 중복 행을 가장 오래된 행으로 합침
+    # 중복이 있는 (user, date)만 조회 (그룹 집계 한 번)
+    duplicates = (
+        Calendar.objects.values('user_id', 'date')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(user_id__isnull=False, rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        others = Calendar.objects.filter(user_id=row['user_id'], date=row['date']).exclude(id=row['keep_id'])
+        keep = Calendar.objects.get(id=row['keep_id'])
+        for other in others.order_by('id'):
+            keep.walkfinished = keep.walkfinished or other.walkfinished
+            for field in ('question', 'sentence', 'emotion_large', 'emotion_small'):
+                if not getattr(keep, field) and getattr(other, field):
+                    setattr(keep, field, getattr(other, field))
+            WalkHistory.objects.filter(calendar_id=other.id).update(calendar_id=keep.id)
+            other.delete()
+        keep.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0002_calendar_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_calendar_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0003_backfill_calendar_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='calendar',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='calendar',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_calendar_user_date'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0004_calendar_date_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyWalkRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('total_distance', models.BigIntegerField(default=0)),
+                ('total_walk_seconds', models.BigIntegerField(default=0)),
+                ('walk_count', models.IntegerField(default=0)),
+                ('walked_day_count', models.IntegerField(default=0)),
+                ('total_walk_score', models.FloatField(default=0)),
+                ('scored_walk_count', models.IntegerField(default=0)),
+                ('emotion_counts', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='monthlywalkrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'year', 'month'), name='unique_rollup_user_year_month'),
+        ),
+    ]
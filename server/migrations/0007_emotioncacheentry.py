@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0006_emotionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmotionCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_version', models.CharField(max_length=50)),
+                ('emotion_large', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
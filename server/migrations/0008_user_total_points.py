@@ -0,0 +1,26 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:21
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_total_points(apps, schema_editor):
+    # 기존 레벨 규칙(레벨마다 100점)으로 누적 포인트 계산
+    User = apps.get_model('server', 'User')
+    User.objects.update(total_points=(F('level') - 1) * 100 + F('points'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0007_emotioncacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='total_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_total_points, migrations.RunPython.noop),
+    ]
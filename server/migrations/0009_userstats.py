@@ -0,0 +1,24 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0008_user_total_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('walk_count', models.IntegerField(default=0)),
+                ('finished_walk_count', models.IntegerField(default=0)),
+                ('last_sri_date', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
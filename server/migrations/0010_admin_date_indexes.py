@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0009_userstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sri',
+            name='sri_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='walkhistory',
+            name='start_time',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0010_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KinectStream',
+            fields=[
+                ('walk', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='kinect_stream', serialize=False, to='server.walkhistory')),
+                ('chunk_count', models.IntegerField(default=0)),
+                ('sample_count', models.BigIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('histogram', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='KinectChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.IntegerField()),
+                ('sample_count', models.IntegerField()),
+                ('samples', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('walk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kinect_chunks', to='server.walkhistory')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='kinectchunk',
+            constraint=models.UniqueConstraint(fields=('walk', 'seq'), name='unique_kinect_chunk_walk_seq'),
+        ),
+    ]
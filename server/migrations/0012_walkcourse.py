@@ -0,0 +1,30 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0011_kinect_stream'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalkCourse',
+            fields=[
+                ('walk', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='walk_course', serialize=False, to='server.walkhistory')),
+                ('point_count', models.IntegerField()),
+                ('encoded', models.BinaryField()),
+                ('distance', models.FloatField()),
+                ('duration_seconds', models.IntegerField(blank=True, null=True)),
+                ('pace', models.FloatField(blank=True, null=True)),
+                ('min_lat', models.FloatField()),
+                ('min_lng', models.FloatField()),
+                ('max_lat', models.FloatField()),
+                ('max_lng', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0012_walkcourse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sri',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='walkhistory',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='sri',
+            constraint=models.UniqueConstraint(fields=('user', 'client_id'), name='unique_sri_user_client_id'),
+        ),
+        migrations.AddConstraint(
+            model_name='walkhistory',
+            constraint=models.UniqueConstraint(fields=('calendar', 'client_id'), name='unique_walkhistory_calendar_client_id'),
+        ),
+    ]
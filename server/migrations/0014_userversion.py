@@ -0,0 +1,38 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_user_versions(apps, schema_editor):
+    # 기존 사용자마다 버전 행 생성 (이후 생성되는 사용자는 post_save signal에서 생성)
+    User = apps.get_model('server', 'User')
+    UserVersion = apps.get_model('server', 'UserVersion')
+    user_ids = User.objects.values_list('pk', flat=True).iterator(chunk_size=1000)
+    UserVersion.objects.bulk_create((UserVersion(user_id=user_id) for user_id in user_ids), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0013_sync_client_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='versions', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('walk_version', models.IntegerField(default=0)),
+                ('walk_modified', models.DateTimeField(blank=True, null=True)),
+                ('calendar_version', models.IntegerField(default=0)),
+                ('calendar_modified', models.DateTimeField(blank=True, null=True)),
+                ('sri_version', models.IntegerField(default=0)),
+                ('sri_modified', models.DateTimeField(blank=True, null=True)),
+                ('profile_version', models.IntegerField(default=0)),
+                ('profile_modified', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_user_versions, migrations.RunPython.noop),
+    ]
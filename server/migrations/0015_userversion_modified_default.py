@@ -0,0 +1,44 @@
+# Generated by Django 4.2.13 on 2026-10-19 04:41
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.utils.timezone
+
+
+def fill_modified(apps, schema_editor):
+    # 변경 시각이 없는 기존 행은 지금 시각으로 채움 (응답 캐시 key 구분용)
+    UserVersion = apps.get_model('server', 'UserVersion')
+    now = timezone.now()
+    for resource in ['walk', 'calendar', 'sri', 'profile']:
+        UserVersion.objects.filter(**{f'{resource}_modified__isnull': True}).update(**{f'{resource}_modified': now})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0014_userversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userversion',
+            name='calendar_modified',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userversion',
+            name='profile_modified',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userversion',
+            name='sri_modified',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userversion',
+            name='walk_modified',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.RunPython(fill_modified, migrations.RunPython.noop),
+    ]
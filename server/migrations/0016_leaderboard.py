@@ -0,0 +1,40 @@
+# Generated by Django 4.2.13 on 2026-10-19 05:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_buckets(apps, schema_editor):
+    # 기존 사용자로 첫 순위 스냅샷 생성 (server.leaderboard.rebuild_leaderboard와 같은 계산)
+    User = apps.get_model('server', 'User')
+    LeaderboardBucket = apps.get_model('server', 'LeaderboardBucket')
+    buckets = []
+    above = 0
+    for row in User.objects.values('total_points').annotate(user_count=Count('id')).order_by('-total_points'):
+        buckets.append(LeaderboardBucket(total_points=row['total_points'], user_count=row['user_count'],
+                                         users_above=above))
+        above += row['user_count']
+    LeaderboardBucket.objects.bulk_create(buckets, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0015_userversion_modified_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('total_points', models.IntegerField(primary_key=True, serialize=False)),
+                ('user_count', models.IntegerField(default=0)),
+                ('users_above', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-total_points', 'id'], name='user_leaderboard_idx'),
+        ),
+        migrations.RunPython(build_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.13 on 2026-10-19 07:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_calendar_user(apps, schema_editor):
+    # 기존 산책 기록의 user를 calendar.user로 채움
+    WalkHistory = apps.get_model('server', 'WalkHistory')
+    Calendar = apps.get_model('server', 'Calendar')
+    WalkHistory.objects.filter(user__isnull=True).update(
+        user_id=Subquery(Calendar.objects.filter(pk=OuterRef('calendar_id')).values('user_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0016_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='walkhistory',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copy_calendar_user, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='walkhistory',
+            index=models.Index(fields=['user', 'start_time', 'id'], name='walkhistory_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sri',
+            index=models.Index(fields=['user', 'sri_date', 'id'], name='sri_user_date_idx'),
+        ),
+    ]
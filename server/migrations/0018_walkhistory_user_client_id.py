@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_duplicate_client_ids(apps, schema_editor):
+    # 이전 제약(calendar, client_id)에서는 같은 사용자가 다른 날짜로 같은 client_id를 올릴 수 있었음
+    # 중복된 (user, client_id)는 가장 오래된 기록만 client_id를 유지
+    WalkHistory = apps.get_model('server', 'WalkHistory')
+    duplicates = (
+        WalkHistory.objects.filter(client_id__isnull=False)
+        .values('user_id', 'client_id')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        WalkHistory.objects.filter(user_id=row['user_id'], client_id=row['client_id']).exclude(
+            id=row['keep_id']).update(client_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0017_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_client_ids, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='walkhistory',
+            name='unique_walkhistory_calendar_client_id',
+        ),
+        migrations.AddConstraint(
+            model_name='walkhistory',
+            constraint=models.UniqueConstraint(fields=('user', 'client_id'), name='unique_walkhistory_user_client_id'),
+        ),
+    ]
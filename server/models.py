@@ -1,5 +1,13 @@
+import calendar as pycalendar
+from datetime import date
+
 from django.db import models
+from django.db.models import Case, F, Value, When
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.utils import timezone
+
+from .leveling import grant_update_kwargs
+from .signals import points_granted
 
 
 class UserManager(BaseUserManager):
@@ -27,13 +35,33 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def grant_points(self, user_ids, points):
+        # 여러 사용자에게 같은 포인트를 지급 (조건부 UPDATE 한 번, 읽고 다시 쓰지 않으므로 동시 요청에도 안전)
+        user_ids = list(user_ids)
+        total = F('total_points') + Value(points)
+        updated = self.filter(pk__in=user_ids).update(**grant_update_kwargs(total))
+        points_granted.send(sender=self.model, user_ids=user_ids, points=dict.fromkeys(user_ids, points))
+        return updated
+
+    def grant_points_bulk(self, points_by_user):
+        # 사용자마다 다른 포인트를 지급 {user_id: points} (UPDATE 한 번)
+        if not points_by_user:
+            return 0
+        delta = Case(*[When(pk=user_id, then=Value(points)) for user_id, points in points_by_user.items()],
+                     default=Value(0), output_field=models.IntegerField())
+        total = F('total_points') + delta
+        updated = self.filter(pk__in=list(points_by_user)).update(**grant_update_kwargs(total))
+        points_granted.send(sender=self.model, user_ids=list(points_by_user), points=dict(points_by_user))
+        return updated
+
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.AutoField(primary_key=True)
     username = models.CharField(max_length=10, unique=True)
     nickname = models.CharField(max_length=10, blank=True)
 
     level = models.IntegerField(default=1)
-    points = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)  # 현재 레벨에서 모은 포인트
+    total_points = models.IntegerField(default=0)  # 누적 포인트 (level, points는 이 값과 LEVEL_THRESHOLDS로 결정)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -44,6 +72,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['nickname']
 
+    class Meta:
+        indexes = [
+            # 리더보드 순서(누적 포인트 높은 순, 같으면 먼저 가입한 순) 그대로의 인덱스: 상위 N명, keyset 페이지, 이웃 조회
+            # 누적 포인트가 레벨과 현재 포인트를 모두 결정하므로 (level, points) 대신 total_points 하나로 정렬
+            models.Index(fields=['-total_points', 'id'], name='user_leaderboard_idx'),
+        ]
+
     def __str__(self):
         return self.nickname
 
@@ -54,37 +89,70 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.is_superuser
 
     def add_points(self, points):
-        self.points += points
-        self.check_level_up()
-        self.save()
-
-    def check_level_up(self):
-        level_thresholds = {
-            1: 100,
-            # 2: 200,
-            # 3: 300,
-            # 4: 400,
-            # 5: 500,
-            # Add more levels and their thresholds as needed
-        }
-        # 현재 레벨이 임계값에 도달할 때마다 레벨을 올리고 포인트를 0으로 초기화
-        while self.points >= 100:
-            self.level += 1
-            self.points -= 100  # 레벨업 후 포인트를 0으로 초기화
+        # 포인트 지급은 UPDATE 한 번으로 처리하고 최신 값만 다시 읽어옴
+        User.objects.grant_points([self.pk], points)
+        self.refresh_from_db(fields=['level', 'points', 'total_points'])
 
 class SRI(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     sri_score = models.IntegerField()
-    sri_date = models.DateTimeField()
+    sri_date = models.DateTimeField(db_index=True)
+    # 오프라인 동기화(sync)로 올라온 기록의 클라이언트 측 ID (재전송 시 중복 생성 방지)
+    client_id = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='unique_sri_user_client_id'),
+        ]
+        indexes = [
+            # 사용자별 SRI 기록 목록 (sri_date, id keyset 페이지, 날짜 범위)
+            models.Index(fields=['user', 'sri_date', 'id'], name='sri_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"SRI Score: {self.sri_score} for {self.user.username}"
 
+def month_bounds(year, month):
+    # 해당 월의 첫날과 마지막 날 (date 범위 조회용)
+    last_day = pycalendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+class CalendarManager(models.Manager):
+    def get_or_create_for_date(self, user, day):
+        # (user, date) 유니크 인덱스로 하루치 Calendar를 조회하거나 생성
+        return self.get_or_create(
+            user=user,
+            date=day,
+            defaults={'year': day.year, 'month': day.month, 'day': day.day},
+        )
+
+    def get_or_create_for_dates(self, user, days):
+        # 여러 날짜의 Calendar를 한 번에 조회하고 없는 날짜는 bulk_create로 생성, {date: Calendar} 반환
+        days = set(days)
+        calendars = {calendar.date: calendar for calendar in self.filter(user=user, date__in=days)}
+        missing = days - calendars.keys()
+        if missing:
+            # bulk_create는 save()를 거치지 않으므로 year/month/day를 직접 채움
+            self.bulk_create([self.model(user=user, date=day, year=day.year, month=day.month, day=day.day)
+                              for day in missing], ignore_conflicts=True)
+            # MySQL은 bulk_create 후 pk를 돌려주지 않으므로 다시 조회
+            calendars.update((calendar.date, calendar) for calendar in self.filter(user=user, date__in=missing))
+        return calendars
+
+    def in_month(self, user, year, month):
+        # 해당 월의 Calendar를 (user, date) 인덱스 범위 조회로 가져옴
+        first_day, last_day = month_bounds(year, month)
+        return self.filter(user=user, date__range=(first_day, last_day))
+
+
 class Calendar(models.Model):
 
     user = models.ForeignKey(User, null=True, on_delete=models.CASCADE)
     # user 부분 주석 풀 때 null=True 임시로 해 주고 데이터 채운 뒤 변경해야 함
 
+    # 조회는 date 컬럼으로, year/month/day는 기존 응답 형식 유지를 위해 함께 저장
+    date = models.DateField(db_index=True)
     year = models.IntegerField()
     month = models.IntegerField()
     day = models.IntegerField()
@@ -95,6 +163,21 @@ class Calendar(models.Model):
     emotion_large = models.CharField(max_length=255, blank=True, null=True)
     emotion_small = models.CharField(max_length=255, blank=True, null=True)
 
+    objects = CalendarManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_calendar_user_date'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # date와 year/month/day 값을 항상 일치시킴
+        if self.date is None:
+            self.date = date(self.year, self.month, self.day)
+        else:
+            self.year, self.month, self.day = self.date.year, self.date.month, self.date.day
+        super().save(*args, **kwargs)
+
     def __str__(self):
         if self.user:
             return f"Calendar[{self.pk}]: {self.year}-{self.month}-{self.day} for {self.user.username}"
@@ -103,13 +186,206 @@ class Calendar(models.Model):
 
 class WalkHistory(models.Model):
     calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE)
-    start_time = models.DateTimeField(null=True, blank=True)
+    start_time = models.DateTimeField(null=True, blank=True, db_index=True)
     end_time = models.DateTimeField(null=True, blank=True)
     stable_score = models.FloatField(null=True, blank=True)
     stable_loc = models.CharField(max_length=255,null=True, blank=True)
     walk_score = models.FloatField(null=True, blank=True)
     distance = models.IntegerField(null=True, blank=True)
     course = models.CharField(max_length=255, null=True, blank=True)
+    # 오프라인 동기화(sync)로 올라온 기록의 클라이언트 측 ID (재전송 시 중복 생성 방지)
+    client_id = models.CharField(max_length=64, null=True, blank=True)
+    # calendar.user 복사본: 사용자별 산책 기록 목록을 Calendar join 없이 인덱스 하나로 조회
+    # save()가 calendar에서 채우며, bulk_create 하는 곳(sync, loadgen)은 직접 채움
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # 같은 client_id가 다른 날짜(Calendar)로 다시 올라와도 사용자 단위로 중복 방지
+            models.UniqueConstraint(fields=['user', 'client_id'], name='unique_walkhistory_user_client_id'),
+        ]
+        indexes = [
+            # 사용자별 산책 기록 목록 (start_time, id keyset 페이지, 날짜 범위)
+            models.Index(fields=['user', 'start_time', 'id'], name='walkhistory_user_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"Walk History Id: {self.pk} / {self.start_time} ~ {self.end_time}"
+
+    def save(self, *args, **kwargs):
+        if self.user_id is None and self.calendar_id is not None:
+            self.user_id = self.calendar.user_id
+        super().save(*args, **kwargs)
+
+class MonthlyWalkRollup(models.Model):
+    # 사용자별 월간 산책 집계 (walk_end, walk_satisfy_update, 감정 분석 시 증분 갱신)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    total_distance = models.BigIntegerField(default=0)  # meter
+    total_walk_seconds = models.BigIntegerField(default=0)
+    walk_count = models.IntegerField(default=0)
+    walked_day_count = models.IntegerField(default=0)
+    total_walk_score = models.FloatField(default=0)
+    scored_walk_count = models.IntegerField(default=0)
+    # 산책한 날의 대분류 감정별 일수 ex) {"joy": 3, "sadness": 1}
+    emotion_counts = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month'], name='unique_rollup_user_year_month'),
+        ]
+
+    def add_emotion(self, emotion, count):
+        if not emotion:
+            return
+        total = self.emotion_counts.get(emotion, 0) + count
+        if total:
+            self.emotion_counts[emotion] = total
+        else:
+            self.emotion_counts.pop(emotion, None)
+
+    def __str__(self):
+        return f"Walk Rollup {self.year}-{self.month:02d} for {self.user.username}"
+
+
+class EmotionJob(models.Model):
+    # 비동기 감정 분석 작업 (run_emotion_worker 명령이 처리)
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE)
+    sentence = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    emotion_large = models.CharField(max_length=255, blank=True, null=True)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='emotionjob_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Emotion Job[{self.pk}]: {self.status} for {self.user.username}"
+
+
+class EmotionCacheEntry(models.Model):
+    # 감정 분석 결과 캐시의 영구 저장소 (key = sha256(정규화된 문장 + 모델 버전))
+    key = models.CharField(max_length=64, unique=True)
+    model_version = models.CharField(max_length=50)
+    emotion_large = models.CharField(max_length=255)
+    created_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Emotion Cache[{self.key[:12]}]: {self.emotion_large} ({self.model_version})"
+
+
+class UserStats(models.Model):
+    # 사용자별 산책 횟수와 마지막 SRI 검사 시각 (SRI 검사 필요 여부를 한 행 조회로 판단)
+    user = models.OneToOneField(User, primary_key=True, related_name='stats', on_delete=models.CASCADE)
+    walk_count = models.IntegerField(default=0)  # 시작한 산책 수
+    finished_walk_count = models.IntegerField(default=0)  # 종료한 산책 수
+    last_sri_date = models.DateTimeField(null=True, blank=True)
+
+    def sri_needed(self, today):
+        # 산책을 한 번도 안 했거나 5회마다 SRI 검사, 오늘 이미 검사했으면 제외
+        if self.last_sri_date and self.last_sri_date.date() == today:
+            return False
+        return self.walk_count == 0 or self.walk_count % 5 == 0
+
+    def __str__(self):
+        return f"Stats for {self.user.username}: {self.walk_count} walks"
+
+
+class KinectStream(models.Model):
+    # 산책 중 키넥트로 받은 프레임별 안정도 값의 누적 통계 (청크가 들어올 때마다 증분 갱신)
+    walk = models.OneToOneField(WalkHistory, primary_key=True, related_name='kinect_stream', on_delete=models.CASCADE)
+    chunk_count = models.IntegerField(default=0)
+    sample_count = models.BigIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)  # 편차 제곱합 (분산 = m2 / sample_count)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    histogram = models.BinaryField(default=bytes)  # 백분위수 계산용 uint32 구간별 개수
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Kinect Stream for walk {self.walk_id}: {self.sample_count} samples"
+
+
+class KinectChunk(models.Model):
+    # 키넥트 안정도 샘플 블록 (float32 little-endian 배열, 샘플마다 행을 만들지 않음)
+    walk = models.ForeignKey(WalkHistory, related_name='kinect_chunks', on_delete=models.CASCADE)
+    seq = models.IntegerField()
+    sample_count = models.IntegerField()
+    samples = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['walk', 'seq'], name='unique_kinect_chunk_walk_seq'),
+        ]
+
+    def __str__(self):
+        return f"Kinect Chunk {self.seq} for walk {self.walk_id}: {self.sample_count} samples"
+
+
+class WalkCourse(models.Model):
+    # 산책 경로 전체 GPS 좌표 (델타 + zigzag varint로 압축, course 문자열 필드에는 담을 수 없음)
+    # 거리/페이스/경로 범위는 업로드 시 서버에서 계산
+    walk = models.OneToOneField(WalkHistory, primary_key=True, related_name='walk_course', on_delete=models.CASCADE)
+    point_count = models.IntegerField()
+    encoded = models.BinaryField()
+    distance = models.FloatField()  # meter
+    duration_seconds = models.IntegerField(null=True, blank=True)  # 좌표에 시각이 있을 때만
+    pace = models.FloatField(null=True, blank=True)  # 1km당 초
+    min_lat = models.FloatField()
+    min_lng = models.FloatField()
+    max_lat = models.FloatField()
+    max_lng = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Walk Course for walk {self.walk_id}: {self.point_count} points / {round(self.distance)}m"
+
+
+class LeaderboardBucket(models.Model):
+    # 리더보드 순위 스냅샷: 누적 포인트 값마다 그 점수의 사용자 수와 더 높은 점수의 사용자 수
+    # 순위 = users_above + 1 (같은 점수는 같은 순위), 기본 키 조회 한 번으로 계산 (server.leaderboard)
+    # 포인트 지급 시 바로 갱신하고, python manage.py rebuild_leaderboard로 주기적으로 다시 만듦
+    total_points = models.IntegerField(primary_key=True)
+    user_count = models.IntegerField(default=0)
+    users_above = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.total_points} points: {self.user_count} users, rank {self.users_above + 1}"
+
+
+class UserVersion(models.Model):
+    # 사용자별 리소스 버전 (보고서 응답의 ETag/Last-Modified, 응답 캐시 key 계산용, 해당 리소스가 바뀔 때마다 1씩 증가)
+    # 변경 시각은 행을 만들 때도 기록해서 같은 사용자 ID가 다시 쓰여도 예전 캐시 항목과 구분됨
+    user = models.OneToOneField(User, primary_key=True, related_name='versions', on_delete=models.CASCADE)
+    walk_version = models.IntegerField(default=0)
+    walk_modified = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    calendar_version = models.IntegerField(default=0)
+    calendar_modified = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    sri_version = models.IntegerField(default=0)
+    sri_modified = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    profile_version = models.IntegerField(default=0)  # 포인트, 레벨, 닉네임
+    profile_modified = models.DateTimeField(null=True, blank=True, default=timezone.now)
 
     def __str__(self):
-        return f"Walk History Id: {self.pk} / {self.start_time} ~ {self.end_time}"
\ No newline at end of file
+        return f"Versions for {self.user.username}"
@@ -0,0 +1,155 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedTokenAuthentication
+
+# 요청 단위 프로파일 (server.middleware.ProfilingMiddleware)
+# 관리자가 X-Profile: 1 헤더를 보낸 요청, 또는 settings.PROFILE_SAMPLE_RATE 비율로 고른 요청의 뷰를 cProfile로 실행
+# settings.PROFILE_DIR에 <name>.prof(pstats)와 <name>.json(뷰, 경로, 사용자, 상태 코드, 시간) 저장
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+SORT_KEYS = {'tottime': 'tottime_ms', 'cumtime': 'cumtime_ms', 'calls': 'calls'}
+
+
+def _is_staff(request):
+    # 세션 로그인(admin) 또는 토큰 인증 사용자가 관리자인지 확인
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+def profile_requested(request):
+    if request.META.get(PROFILE_HEADER) == '1':
+        return _is_staff(request)
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def _view_name(view):
+    view = getattr(view, 'cls', view)  # @api_view로 감싼 뷰는 원래 함수 이름
+    return f'{view.__module__}.{view.__name__}'
+
+
+def profile_view(request, view, args, kwargs):
+    # view를 cProfile로 실행하고 저장, 응답 render(JSON 변환)까지 포함
+    # 응답 헤더 X-Profile-Id: 저장한 프로파일 이름
+    profiler = cProfile.Profile()
+    response = None
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+    finally:
+        profiler.disable()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        user = getattr(request, 'user', None)  # DRF 뷰가 인증한 사용자
+        name = save_profile(profiler, {
+            'view': _view_name(view),
+            'method': request.method,
+            'path': request.path,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'status': response.status_code if response is not None else 500,
+            'elapsed_ms': round(elapsed_ms, 3),
+        })
+    response['X-Profile-Id'] = name
+    return response
+
+
+def _profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+def save_profile(profiler, meta):
+    directory = _profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # 이름 순서 = 저장 순서
+    name = f'{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}'
+    profiler.dump_stats(directory / f'{name}.prof')
+    meta = {'name': name, 'created': timezone.now().isoformat(timespec='seconds'), **meta}
+    (directory / f'{name}.json').write_text(json.dumps(meta, ensure_ascii=False))
+    _prune(directory)
+    return name
+
+
+def _prune(directory):
+    # 오래된 프로파일부터 삭제해서 settings.PROFILE_MAX_FILES개만 유지
+    names = sorted(path.stem for path in directory.glob('*.json'))
+    for name in names[:max(len(names) - settings.PROFILE_MAX_FILES, 0)]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(directory / f'{name}{suffix}')
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(view=None, user_id=None):
+    # 저장된 프로파일 메타데이터 (최신순), view는 뷰 이름 끝부분으로 비교 ex) 'walk_monthly_report'
+    directory = _profile_dir()
+    profiles = []
+    for path in sorted(directory.glob('*.json'), reverse=True) if directory.exists() else []:
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue  # 저장 중이거나 삭제된 파일
+        if view and not (meta['view'] == view or meta['view'].endswith(f'.{view}')):
+            continue
+        if user_id is not None and meta['user_id'] != user_id:
+            continue
+        profiles.append(meta)
+    return profiles
+
+
+def _location(filename, line):
+    if filename == '~':
+        return 'built-in'
+    for root in (str(settings.BASE_DIR), 'site-packages'):
+        index = filename.find(root)
+        if index >= 0:
+            filename = filename[index + len(root):].lstrip(os.sep)
+            break
+    return f'{filename}:{line}'
+
+
+def hot_functions(profiles, limit=20, sort='tottime'):
+    # 여러 프로파일을 합쳐서 시간이 많이 걸린 함수 limit개
+    # tottime: 함수 자체 실행 시간, cumtime: 호출한 함수 포함 시간 (ms, 프로파일 전체 합)
+    paths = [str(_profile_dir() / f'{meta["name"]}.prof') for meta in profiles]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return []
+    stats = pstats.Stats(*paths)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': function,
+            'location': _location(filename, line),
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row[SORT_KEYS[sort]], reverse=True)
+    return rows[:limit]
+
+
+def render_hot_functions(rows):
+    lines = [f'{"tottime(ms)":>12} {"cumtime(ms)":>12} {"calls":>9}  function']
+    for row in rows:
+        lines.append(f'{row["tottime_ms"]:12.2f} {row["cumtime_ms"]:12.2f} {row["calls"]:9d}  '
+                     f'{row["function"]} ({row["location"]})')
+    return '\n'.join(lines)
@@ -0,0 +1,33 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 DRF JSONRenderer와 똑같이 동작
+    orjson = None
+
+# 날짜/시간은 DRF encoder가 변환 (UTC를 Z로 쓰는 등 DRF 응답 형식을 그대로 유지)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    # DRF JSONRenderer와 같은 결과를 orjson으로 빠르게 만드는 renderer (settings.REST_FRAMEWORK 기본 renderer)
+    # 들여쓰기 요청(browsable API 등), 비 compact/ASCII 설정, orjson이 처리하지 못하는 값은 기존 방식으로 처리
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or not api_settings.COMPACT_JSON or not api_settings.UNICODE_JSON
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # 64bit를 넘는 정수 등
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer처럼 U+2028, U+2029는 escape (JavaScript 문자열 안에서 줄바꿈으로 처리되는 문자)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
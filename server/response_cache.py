@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+
+from .versions import load_versions
+
+
+class ResponseCacheStats:
+    # 응답 캐시 카운터 (워커 프로세스 기준)
+    # coalesced: 같은 key를 다른 요청이 계산 중이라 기다렸다가 그 결과를 받은 횟수
+    # lock_timeouts: 기다려도 결과가 없어서 직접 계산한 횟수, evictions: 용량 초과로 backend가 지운 항목 수
+    FIELDS = ['hits', 'misses', 'stores', 'coalesced', 'lock_timeouts', 'evictions']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field, count=1):
+        with self._lock:
+            self._counts[field] += count
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['hits'] + counts['coalesced'] + counts['misses']
+        counts['hit_rate'] = (counts['hits'] + counts['coalesced']) / lookups if lookups else None
+        return counts
+
+
+cache_stats = ResponseCacheStats()
+
+
+class LocMemResponseCache(LocMemCache):
+    # 프로세스 메모리 backend (용량 초과로 지운 항목 수를 센다)
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        cache_stats.incr('evictions', before - len(self._cache))
+
+
+class FileResponseCache(FileBasedCache):
+    # 파일 backend (같은 서버의 워커들이 함께 사용, 용량 초과로 지운 항목 수를 센다)
+    _culling = False
+
+    def _cull(self):
+        self._culling = True
+        try:
+            super()._cull()
+        finally:
+            self._culling = False
+
+    def _delete(self, fname):
+        deleted = super()._delete(fname)
+        if deleted and self._culling:
+            cache_stats.incr('evictions')
+        return deleted
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def response_cache_key(view, row, view_kwargs, query_params):
+    # 데이터 주인의 리소스 버전(+변경 시각)이 key에 들어가므로 signal로 버전이 바뀌면 이전 항목은 더 이상 조회되지 않음
+    # 변경 시각을 함께 넣어서 DB를 새로 만들어 버전 번호가 겹쳐도 예전 항목과 구분됨
+    parts = [
+        sorted((field, str(value)) for field, value in row.items()),
+        sorted((name, str(value)) for name, value in view_kwargs.items()),
+        sorted((name, query_params.getlist(name)) for name in query_params),
+    ]
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'response:{view.__module__}.{view.__name__}:{row["user_id"]}:{digest}'
+
+
+def _wait_for(cache, key):
+    # 다른 요청이 같은 key를 계산하는 동안 결과가 저장되기를 잠깐 기다림
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.02)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    return None
+
+
+def cached_response(*resources, owner=None, timeout=None):
+    # 읽기 전용 GET 뷰의 200 응답 데이터를 캐시
+    # resources/owner: 응답이 의존하는 리소스와 데이터 주인 (conditional_report와 같은 의미)
+    # 같은 key의 캐시가 비어 있을 때 동시에 들어온 요청은 하나만 계산하고 나머지는 그 결과를 기다림
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not settings.RESPONSE_CACHE_ENABLED:
+                return view(request, *args, **kwargs)
+            row = load_versions(request, resources, owner, kwargs)
+            if row is None:
+                return view(request, *args, **kwargs)
+
+            cache = get_response_cache()
+            key = response_cache_key(view, row, kwargs, request.query_params)
+            cached = cache.get(key)
+            if cached is not None:
+                cache_stats.incr('hits')
+                return Response(cached[1], status=cached[0])
+
+            lock_key = f'{key}:lock'
+            token = uuid.uuid4().hex
+            if not cache.add(lock_key, token, settings.RESPONSE_CACHE_LOCK_SECONDS):
+                cached = _wait_for(cache, key)
+                if cached is not None:
+                    cache_stats.incr('coalesced')
+                    return Response(cached[1], status=cached[0])
+                cache_stats.incr('lock_timeouts')
+
+            cache_stats.incr('misses')
+            try:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, (response.status_code, response.data),
+                              timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT)
+                    cache_stats.incr('stores')
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+            return response
+
+        return wrapper
+
+    return decorator
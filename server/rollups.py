@@ -0,0 +1,227 @@
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+from .models import Calendar, MonthlyWalkRollup, WalkHistory, month_bounds
+from .versions import bump_versions
+
+# 산책 1건이 집계에 더하는 값들
+WALK_FIELDS = ['walk_count', 'total_distance', 'total_walk_seconds', 'total_walk_score', 'scored_walk_count']
+
+
+def walk_totals(walk):
+    # 종료된 산책만 집계에 포함
+    totals = dict.fromkeys(WALK_FIELDS, 0)
+    if not walk.end_time:
+        return totals
+    totals['walk_count'] = 1
+    totals['total_distance'] = walk.distance or 0
+    if walk.start_time:
+        totals['total_walk_seconds'] = int((walk.end_time - walk.start_time).total_seconds())
+    if walk.walk_score is not None:
+        totals['total_walk_score'] = walk.walk_score
+        totals['scored_walk_count'] = 1
+    return totals
+
+
+def _locked_rollup(calendar):
+    rollup, _ = MonthlyWalkRollup.objects.select_for_update().get_or_create(
+        user_id=calendar.user_id, year=calendar.date.year, month=calendar.date.month
+    )
+    return rollup
+
+
+def apply_walk_delta(calendar, before, after, day_walked=False):
+    # 산책 기록 변경 전후 값의 차이만큼 월간 집계를 갱신
+    # day_walked: 이번 변경으로 해당 날짜가 처음 산책 완료된 경우
+    with transaction.atomic():
+        rollup = _locked_rollup(calendar)
+        for field in WALK_FIELDS:
+            setattr(rollup, field, getattr(rollup, field) + after[field] - before[field])
+        if day_walked:
+            rollup.walked_day_count += 1
+            rollup.add_emotion(calendar.emotion_large, 1)
+        rollup.save()
+
+
+def apply_walk_deltas(changes):
+    # 여러 산책 기록 변경분을 월별로 모아서 반영 (오프라인 동기화 등 일괄 처리용)
+    # changes: [(calendar, before, after, day_walked)]
+    by_month = {}
+    for calendar, before, after, day_walked in changes:
+        key = (calendar.user_id, calendar.date.year, calendar.date.month)
+        by_month.setdefault(key, []).append((calendar, before, after, day_walked))
+    with transaction.atomic():
+        for month_changes in by_month.values():
+            rollup = _locked_rollup(month_changes[0][0])
+            for calendar, before, after, day_walked in month_changes:
+                for field in WALK_FIELDS:
+                    setattr(rollup, field, getattr(rollup, field) + after[field] - before[field])
+                if day_walked:
+                    rollup.walked_day_count += 1
+                    rollup.add_emotion(calendar.emotion_large, 1)
+            rollup.save()
+
+
+def apply_emotion_change(calendar, old_emotion):
+    # 산책한 날의 대분류 감정이 바뀐 경우 감정 히스토그램 갱신
+    if not calendar.walkfinished or old_emotion == calendar.emotion_large:
+        return
+    with transaction.atomic():
+        rollup = _locked_rollup(calendar)
+        rollup.add_emotion(old_emotion, -1)
+        rollup.add_emotion(calendar.emotion_large, 1)
+        rollup.save()
+
+
+def compute_monthly_rollups(user_ids=None):
+    # 원본 테이블(WalkHistory, Calendar)에서 월간 집계를 새로 계산
+    # 반환값: {(user_id, year, month): MonthlyWalkRollup(저장 안 됨)}
+    walks = WalkHistory.objects.filter(end_time__isnull=False, calendar__user__isnull=False)
+    calendars = Calendar.objects.filter(walkfinished=True, user__isnull=False)
+    if user_ids is not None:
+        walks = walks.filter(calendar__user_id__in=user_ids)
+        calendars = calendars.filter(user_id__in=user_ids)
+
+    rollups = {}
+
+    def rollup_for(user_id, year, month):
+        key = (user_id, year, month)
+        if key not in rollups:
+            rollups[key] = MonthlyWalkRollup(user_id=user_id, year=year, month=month, emotion_counts={})
+        return rollups[key]
+
+    walk_rows = walks.values('calendar__user_id', 'calendar__year', 'calendar__month').annotate(
+        walk_count=Count('id'),
+        total_distance=Sum('distance'),
+        total_walk_time=Sum(
+            ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()),
+            filter=Q(start_time__isnull=False),
+        ),
+        total_walk_score=Sum('walk_score'),
+        scored_walk_count=Count('walk_score'),
+    ).order_by()
+    for row in walk_rows:
+        rollup = rollup_for(row['calendar__user_id'], row['calendar__year'], row['calendar__month'])
+        rollup.walk_count = row['walk_count']
+        rollup.total_distance = row['total_distance'] or 0
+        rollup.total_walk_seconds = int(row['total_walk_time'].total_seconds()) if row['total_walk_time'] else 0
+        rollup.total_walk_score = row['total_walk_score'] or 0
+        rollup.scored_walk_count = row['scored_walk_count']
+
+    day_rows = calendars.values('user_id', 'year', 'month', 'emotion_large').annotate(days=Count('id')).order_by()
+    for row in day_rows:
+        rollup = rollup_for(row['user_id'], row['year'], row['month'])
+        rollup.walked_day_count += row['days']
+        rollup.add_emotion(row['emotion_large'], row['days'])
+
+    return rollups
+
+
+def months_between(start, end):
+    # [(year, month)] start, end: (year, month), 양쪽 포함
+    months = []
+    year, month = start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def range_walk_summaries(user, start, end):
+    # start~end 월별 산책 집계를 WalkHistory-Calendar 그룹 집계 쿼리 1개로 계산 (기간 보고서용)
+    # (연, 월, 대분류 감정)으로 묶은 행을 월별로 합침, 감정별 산책한 날 수도 같은 쿼리에서 계산
+    # 반환값: {(year, month): {'walk_count', 'total_distance'(m), 'total_walk_seconds', 'walked_day_count',
+    #                         'emotion_counts', 'stable_average', 'walk_score_average'}}
+    first_day = month_bounds(*start)[0]
+    last_day = month_bounds(*end)[1]
+    rows = WalkHistory.objects.filter(
+        calendar__user=user, calendar__date__range=(first_day, last_day), end_time__isnull=False,
+    ).values('calendar__year', 'calendar__month', 'calendar__emotion_large').annotate(
+        walk_count=Count('id'),
+        total_distance=Sum('distance'),
+        total_walk_time=Sum(
+            ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()),
+            filter=Q(start_time__isnull=False),
+        ),
+        walked_days=Count('calendar_id', distinct=True),
+        total_stable_score=Sum('stable_score'),
+        stable_count=Count('stable_score'),
+        total_walk_score=Sum('walk_score'),
+        scored_walk_count=Count('walk_score'),
+    ).order_by()
+
+    sums = {}
+    for row in rows:
+        month = sums.setdefault((row['calendar__year'], row['calendar__month']), {
+            'walk_count': 0, 'total_distance': 0, 'total_walk_seconds': 0, 'walked_day_count': 0,
+            'emotion_counts': {}, 'total_stable_score': 0, 'stable_count': 0,
+            'total_walk_score': 0, 'scored_walk_count': 0,
+        })
+        month['walk_count'] += row['walk_count']
+        month['total_distance'] += row['total_distance'] or 0
+        month['total_walk_seconds'] += int(row['total_walk_time'].total_seconds()) if row['total_walk_time'] else 0
+        month['walked_day_count'] += row['walked_days']
+        if row['calendar__emotion_large']:
+            month['emotion_counts'][row['calendar__emotion_large']] = row['walked_days']
+        month['total_stable_score'] += row['total_stable_score'] or 0
+        month['stable_count'] += row['stable_count']
+        month['total_walk_score'] += row['total_walk_score'] or 0
+        month['scored_walk_count'] += row['scored_walk_count']
+
+    summaries = {}
+    for key in months_between(start, end):
+        month = sums.get(key)
+        if month is None:
+            summaries[key] = {'walk_count': 0, 'total_distance': 0, 'total_walk_seconds': 0, 'walked_day_count': 0,
+                              'emotion_counts': {}, 'stable_average': None, 'walk_score_average': None}
+            continue
+        stable_count = month.pop('stable_count')
+        total_stable_score = month.pop('total_stable_score')
+        scored_walk_count = month.pop('scored_walk_count')
+        total_walk_score = month.pop('total_walk_score')
+        month['stable_average'] = total_stable_score / stable_count if stable_count else None
+        month['walk_score_average'] = total_walk_score / scored_walk_count if scored_walk_count else None
+        summaries[key] = month
+    return summaries
+
+
+@transaction.atomic
+def rebuild_monthly_rollups(user_ids=None):
+    # 월간 집계를 원본 테이블 기준으로 처음부터 다시 만듦
+    rollups = compute_monthly_rollups(user_ids)
+    existing = MonthlyWalkRollup.objects.all()
+    if user_ids is not None:
+        existing = existing.filter(user_id__in=user_ids)
+    existing.delete()
+    MonthlyWalkRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+    # 월별 보고서 값이 바뀌었을 수 있으므로 캐시된 응답(ETag) 무효화
+    bump_versions(['walk'], **({'user_id__in': user_ids} if user_ids is not None else {}))
+    return len(rollups)
+
+
+def find_rollup_mismatches(user_ids=None):
+    # 저장된 월간 집계와 원본 테이블에서 계산한 값을 비교
+    # 반환값: [(user_id, year, month, field, stored, expected)]
+    expected = compute_monthly_rollups(user_ids)
+    stored = MonthlyWalkRollup.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+    stored = {(r.user_id, r.year, r.month): r for r in stored}
+
+    fields = WALK_FIELDS + ['walked_day_count', 'emotion_counts']
+    empty = MonthlyWalkRollup(emotion_counts={})
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        stored_rollup = stored.get(key, empty)
+        expected_rollup = expected.get(key, empty)
+        for field in fields:
+            stored_value = getattr(stored_rollup, field)
+            expected_value = getattr(expected_rollup, field)
+            if field == 'total_walk_score':
+                equal = abs(stored_value - expected_value) < 1e-6
+            else:
+                equal = stored_value == expected_value
+            if not equal:
+                mismatches.append((*key, field, stored_value, expected_value))
+    return mismatches
+
@@ -1,3 +1,7 @@
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import WalkHistory, Calendar, User, SRI
 
@@ -14,6 +18,7 @@ class WalkHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = WalkHistory
         fields = '__all__'
+        read_only_fields = ['client_id', 'user']
 
 class WalkHistoryEndSerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,4 +70,88 @@ class SRISerializer(serializers.ModelSerializer):
 class EmotionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Calendar
-        fields = ['id', 'question', 'sentence', 'emotion_large', 'emotion_small']
\ No newline at end of file
+        fields = ['id', 'question', 'sentence', 'emotion_large', 'emotion_small']
+
+
+# 읽기 API용 가벼운 직렬화: values() 행(dict)을 응답 dict로 바로 변환
+# ModelSerializer처럼 요청마다 serializer/field 객체를 만들지 않음
+EMOTION_ROW_FIELDS = ('id', 'date', 'question', 'sentence', 'emotion_large', 'emotion_small')
+WALK_REPORT_ROW_FIELDS = ('id', 'start_time', 'end_time', 'distance', 'walk_score', 'stable_score')
+WALK_SUMMARY_ROW_FIELDS = ('start_time', 'end_time', 'distance', 'stable_score')
+
+
+def emotion_row(row):
+    # EmotionSerializer 값에서 id 대신 calendar_id, date(YYYY-MM-DD) (emotion_list_create, emotion_list_range)
+    return {
+        'question': row['question'],
+        'sentence': row['sentence'],
+        'emotion_large': row['emotion_large'],
+        'emotion_small': row['emotion_small'],
+        'calendar_id': row['id'],
+        'date': row['date'].strftime('%Y-%m-%d'),
+    }
+
+
+def walk_report_row(row):
+    # walk_once_report: 시작/종료 시각은 HH:MM (없으면 00:00), 실제 산책 시간은 분
+    start_time, end_time = row['start_time'], row['end_time']
+    actual_walk_time = round((end_time - start_time).total_seconds() / 60, 2) if start_time and end_time else 0
+    return {
+        'start_time': start_time.strftime('%H:%M') if start_time else '00:00',
+        'end_time': end_time.strftime('%H:%M') if end_time else '00:00',
+        'distance': row['distance'],
+        'actual_walk_time': int(actual_walk_time),
+        'walk_score': row['walk_score'],
+        'stable_score': row['stable_score'],
+        'walk_history_id': row['id'],
+    }
+
+
+def walk_summary_row(row):
+    # walk_simple_report: 총 산책 시간(분), 거리(meter), 안정도
+    start_time, end_time = row['start_time'], row['end_time']
+    return {
+        'total_time': int((end_time - start_time).total_seconds() / 60) if end_time and start_time else None,
+        'distance': int(row['distance']),
+        'stable_score': int(row['stable_score']),
+    }
+
+
+class SyncRecordSerializer(serializers.Serializer):
+    # 오프라인 동기화 기록 1건 (type별 필수 값은 validate에서 확인)
+    TYPES = ['walk_start', 'walk_end', 'sri', 'emotion_small']
+    REQUIRED_FIELDS = {
+        'walk_start': ['playtime'],
+        'walk_end': ['kinect_data'],
+        'sri': ['sri_score'],
+        'emotion_small': ['emotion_small'],
+    }
+
+    type = serializers.ChoiceField(choices=TYPES)
+    client_id = serializers.CharField(max_length=64)
+    # 시간대가 있는 값(+09:00, Z 등)도 서버 시간대(TIME_ZONE) 시각으로 바꿔 받음 (validate_timestamp)
+    timestamp = serializers.DateTimeField(default_timezone=ZoneInfo(settings.TIME_ZONE))
+    # walk_start
+    playtime = serializers.ChoiceField(choices=[5, 10, 15, 20, 25, 30], required=False)
+    # walk_end: 같은 요청(또는 이전 동기화)의 walk_start client_id(walk) 또는 서버 ID(walk_id)
+    walk = serializers.CharField(max_length=64, required=False)
+    walk_id = serializers.IntegerField(required=False)
+    kinect_data = serializers.FloatField(required=False)
+    distance = serializers.IntegerField(min_value=0, required=False)
+    stable_loc = serializers.CharField(max_length=255, required=False)
+    # sri
+    sri_score = serializers.IntegerField(required=False)
+    # emotion_small
+    emotion_small = serializers.CharField(max_length=255, required=False)
+
+    def validate_timestamp(self, value):
+        # USE_TZ=False: 온라인 API(timezone.now())처럼 서버 시간대 기준 naive 시각으로 저장
+        return value if settings.USE_TZ else timezone.make_naive(value)
+
+    def validate(self, attrs):
+        missing = [field for field in self.REQUIRED_FIELDS[attrs['type']] if field not in attrs]
+        if attrs['type'] == 'walk_end' and 'walk' not in attrs and 'walk_id' not in attrs:
+            missing.append('walk')
+        if missing:
+            raise serializers.ValidationError({field: 'This field is required.' for field in missing})
+        return attrs
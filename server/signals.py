@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# UserManager.grant_points 처럼 save() 없이 UPDATE로 포인트/레벨이 바뀐 뒤 전송
+# 인자: user_ids, points({user_id: 지급한 포인트})
+points_granted = Signal()
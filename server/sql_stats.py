@@ -0,0 +1,119 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    # 뷰의 쿼리 예산을 넘음 (settings.SQL_QUERY_BUDGET_ACTION = 'raise'일 때, 테스트 실행기에서 사용)
+    pass
+
+
+class QueryStats:
+    # 실행된 SQL 수, 전체 시간, 가장 느린 쿼리, 반복된 문장 기록 (connection.execute_wrapper로 등록)
+    # 반복 여부는 파라미터를 뺀 SQL 문장으로 판단 (같은 문장이 여러 번 실행되면 N+1 가능성)
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            self.statements[sql] += 1
+            if self.slowest_sql is None or elapsed > self.slowest_ms:
+                self.slowest_ms = elapsed
+                self.slowest_sql = sql
+
+    @property
+    def duplicates(self):
+        # [(SQL 문장, 실행 횟수)] 여러 번 실행된 문장만, 많이 실행된 순서
+        return [(sql, count) for sql, count in self.statements.most_common() if count > 1]
+
+    def as_dict(self, sql_length=200):
+        return {
+            'queries': self.count,
+            'time_ms': round(self.total_ms, 3),
+            'slowest_ms': round(self.slowest_ms, 3),
+            'slowest_sql': self.slowest_sql[:sql_length] if self.slowest_sql else None,
+            'duplicates': [{'sql': sql[:sql_length], 'count': count} for sql, count in self.duplicates],
+        }
+
+
+@contextmanager
+def track_queries(using=None):
+    # with track_queries() as stats: ... -> 블록 안에서 실행된 쿼리 통계 (using이 없으면 모든 DB)
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for connection in [connections[using]] if using else connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
+def query_budget(limit=None, **per_method):
+    # 뷰가 요청 하나에 실행해도 되는 최대 쿼리 수 (QueryStatsMiddleware가 확인)
+    # ex) @query_budget(7), @query_budget(GET=2, POST=6), @api_view보다 위에 둠
+    def decorator(view):
+        view.query_budget = {method.upper(): value for method, value in per_method.items()}
+        if limit is not None:
+            view.query_budget['*'] = limit
+        return view
+
+    return decorator
+
+
+def view_budget(request):
+    # (뷰 이름, 요청 method의 쿼리 예산) URL에 맞는 뷰가 없거나 예산이 없으면 budget은 None
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+    budget = getattr(match.func, 'query_budget', None) or {}
+    return match._func_path, budget.get(request.method, budget.get('*'))
+
+
+def record_request(request, response, stats):
+    # 요청 하나의 쿼리 통계를 응답 헤더(X-SQL-*)와 로그(server.sql_stats)에 기록 (server.middleware.query_stats_middleware)
+    # 예산 초과/느린 쿼리는 WARNING, 나머지는 INFO 로그 1줄(JSON)
+    view, budget = view_budget(request)
+    over_budget = budget is not None and stats.count > budget
+    if settings.SQL_STATS_HEADERS:
+        response['X-SQL-Queries'] = str(stats.count)
+        response['X-SQL-Time-ms'] = f'{stats.total_ms:.1f}'
+        response['X-SQL-Slowest-ms'] = f'{stats.slowest_ms:.1f}'
+        response['X-SQL-Duplicates'] = str(sum(count - 1 for _, count in stats.duplicates))
+        if budget is not None:
+            response['X-SQL-Budget'] = str(budget)
+
+    slow = stats.slowest_ms >= settings.SQL_STATS_SLOW_MS
+    level = logging.WARNING if over_budget or slow else logging.INFO
+    if logger.isEnabledFor(level):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'budget': budget,
+            'over_budget': over_budget,
+            **stats.as_dict(),
+        }
+        logger.log(level, json.dumps(record, ensure_ascii=False))
+
+    # 테스트 실행기(server.test_runner)는 'raise'로 바꿔서 예산을 넘은 테스트를 실패시킴
+    if over_budget and settings.SQL_QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(
+            f'{request.method} {request.path} ran {stats.count} queries (budget {budget})'
+            + ''.join(f'\n  {count}x {sql}' for sql, count in stats.duplicates[:3])
+        )
@@ -0,0 +1,180 @@
+from django.db import transaction
+from django.db.models import Q
+
+from .leveling import walk_end_points
+from .models import SRI, Calendar, User, WalkCourse, WalkHistory
+from .rollups import apply_walk_deltas, walk_totals
+from .serializers import SyncRecordSerializer
+from .user_stats import record_synced
+from .versions import bump_versions
+
+MAX_RECORDS = 500
+
+
+def _result(record, status, **extra):
+    return {'client_id': record.get('client_id'), 'type': record.get('type'), 'status': status, **extra}
+
+
+def sync_records(user, records):
+    # 오프라인 상태에서 쌓인 walk_start/walk_end/sri/emotion_small 기록을 한 트랜잭션에서 일괄 반영
+    # 반환값: 입력 순서대로 기록별 결과 {client_id, type, status(created/updated/duplicate/error), id 또는 errors}
+    results = [None] * len(records)
+    valid = []
+    for index, record in enumerate(records):
+        serializer = SyncRecordSerializer(data=record)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            record = record if isinstance(record, dict) else {}
+            results[index] = _result(record, 'error', errors=serializer.errors)
+
+    with transaction.atomic():
+        # 같은 사용자의 동기화 요청이 동시에 들어오면 순서대로 처리 (중복 생성 방지)
+        list(User.objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+        _apply(user, valid, results)
+    return results
+
+
+def _apply(user, valid, results):
+    records = dict(valid)
+    by_type = {record_type: [] for record_type in SyncRecordSerializer.TYPES}
+    for index, record in valid:
+        by_type[record['type']].append((index, record))
+
+    # 1. 이번 요청이 참조하는 기존 산책 기록 (이전 동기화로 만든 기록 포함)
+    walk_client_ids = {record['client_id'] for _, record in by_type['walk_start']}
+    walk_client_ids |= {record['walk'] for _, record in by_type['walk_end'] if 'walk' in record}
+    walk_ids = {record['walk_id'] for _, record in by_type['walk_end'] if 'walk_id' in record}
+    walks_by_client = {}
+    walks_by_id = {}
+    calendars_by_id = {}
+    if walk_client_ids or walk_ids:
+        walks = WalkHistory.objects.filter(Q(client_id__in=walk_client_ids) | Q(id__in=walk_ids),
+                                           user=user).select_related('calendar')
+        for walk in walks:
+            walk.calendar = calendars_by_id.setdefault(walk.calendar_id, walk.calendar)
+            walks_by_id[walk.id] = walk
+            if walk.client_id:
+                walks_by_client[walk.client_id] = walk
+
+    # 2. 새 산책/감정 기록이 들어갈 날짜의 Calendar 조회 또는 생성
+    new_starts = [(index, record) for index, record in by_type['walk_start']
+                  if record['client_id'] not in walks_by_client]
+    days = {record['timestamp'].date() for _, record in new_starts + by_type['emotion_small']}
+    calendars = Calendar.objects.get_or_create_for_dates(user, days) if days else {}
+    for day, calendar in calendars.items():
+        calendars[day] = calendars_by_id.setdefault(calendar.id, calendar)
+
+    # 3. walk_start: 새 산책 기록 (저장은 walk_end까지 반영한 뒤 한 번에)
+    created_walks = []
+    duplicates = []  # 재전송된 기록, 산책 ID는 저장 후 채움
+    for index, record in by_type['walk_start']:
+        walk = walks_by_client.get(record['client_id'])
+        if walk is None:
+            walk = WalkHistory(calendar=calendars[record['timestamp'].date()], user=user,
+                               start_time=record['timestamp'], client_id=record['client_id'])
+            walks_by_client[record['client_id']] = walk
+            created_walks.append((index, walk))
+        else:
+            duplicates.append((index, walk))
+
+    # 4. walk_end: 종료 정보 반영 (이미 종료된 산책은 재전송으로 보고 건너뜀)
+    finished = []
+    for index, record in by_type['walk_end']:
+        walk = walks_by_client.get(record['walk']) if 'walk' in record else walks_by_id.get(record['walk_id'])
+        if walk is None:
+            results[index] = _result(record, 'error', errors={'walk': 'WalkHistory does not exist.'})
+            continue
+        if walk.end_time:
+            duplicates.append((index, walk))
+            continue
+        if walk.start_time and record['timestamp'] < walk.start_time:
+            results[index] = _result(record, 'error', errors={'timestamp': 'Walk cannot end before it starts.'})
+            continue
+        before = walk_totals(walk)
+        walk.end_time = record['timestamp']
+        walk.stable_score = record['kinect_data']
+        walk.distance = record.get('distance', walk.distance)
+        walk.stable_loc = record.get('stable_loc', walk.stable_loc)
+        finished.append((index, walk, before))
+
+    # 경로를 올린 산책은 서버에서 계산한 거리 사용 (walk_end와 같음)
+    existing_finished = [walk.pk for _, walk, _ in finished if walk.pk]
+    if existing_finished:
+        course_distances = dict(WalkCourse.objects.filter(walk__in=existing_finished)
+                                .values_list('walk_id', 'distance'))
+        for _, walk, _ in finished:
+            if walk.pk in course_distances:
+                walk.distance = round(course_distances[walk.pk])
+
+    # 5. 산책 기록 저장 (MySQL은 bulk_create 후 pk를 돌려주지 않으므로 client_id로 다시 조회)
+    if created_walks:
+        WalkHistory.objects.bulk_create([walk for _, walk in created_walks])
+        saved_ids = dict(WalkHistory.objects.filter(
+            user=user, client_id__in=[walk.client_id for _, walk in created_walks]
+        ).values_list('client_id', 'id'))
+        for _, walk in created_walks:
+            walk.pk = saved_ids[walk.client_id]
+    created_ids = {walk.pk for _, walk in created_walks}
+    updated_walks = [walk for _, walk, _ in finished if walk.pk not in created_ids]
+    if updated_walks:
+        WalkHistory.objects.bulk_update(updated_walks, ['end_time', 'stable_score', 'distance', 'stable_loc'])
+
+    # 6. Calendar: 산책 완료 여부, 소분류 감정
+    changed_calendars = {}
+    rollup_changes = []
+    for _, walk, before in finished:
+        calendar = walk.calendar
+        day_walked = not calendar.walkfinished
+        calendar.walkfinished = True
+        changed_calendars[calendar.id] = calendar
+        rollup_changes.append((calendar, before, walk_totals(walk), day_walked))
+    for index, record in by_type['emotion_small']:
+        calendar = calendars[record['timestamp'].date()]
+        calendar.emotion_small = record['emotion_small']
+        changed_calendars[calendar.id] = calendar
+        results[index] = _result(record, 'updated', id=calendar.id)
+    if changed_calendars:
+        Calendar.objects.bulk_update(changed_calendars.values(), ['walkfinished', 'emotion_small'])
+    if rollup_changes:
+        apply_walk_deltas(rollup_changes)
+
+    # 7. SRI (재전송된 client_id는 건너뜀)
+    new_sris = []
+    if by_type['sri']:
+        client_ids = [record['client_id'] for _, record in by_type['sri']]
+        existing = set(SRI.objects.filter(user=user, client_id__in=client_ids).values_list('client_id', flat=True))
+        for index, record in by_type['sri']:
+            if record['client_id'] in existing:
+                results[index] = _result(record, 'duplicate')
+                continue
+            existing.add(record['client_id'])
+            new_sris.append(SRI(user=user, sri_score=record['sri_score'], sri_date=record['timestamp'],
+                                client_id=record['client_id']))
+            results[index] = _result(record, 'created')
+        SRI.objects.bulk_create(new_sris)
+
+    # 8. 사용자 통계, 보고서 버전(bulk 작업은 signal이 없으므로 직접 갱신), 포인트
+    if created_walks or finished or new_sris:
+        record_synced(user.id, walks_started=len(created_walks), walks_finished=len(finished),
+                      last_sri_date=max((sri.sri_date for sri in new_sris), default=None))
+    touched = []
+    if created_walks or finished:
+        touched.append('walk')
+    if changed_calendars or days:
+        touched.append('calendar')
+    if new_sris:
+        touched.append('sri')
+    if touched:
+        bump_versions(touched, user_id=user.id)
+    points = sum(walk_end_points(walk.stable_score, walk.distance) for _, walk, _ in finished)
+    if points:
+        User.objects.grant_points([user.pk], points)
+
+    # 저장 후에야 알 수 있는 산책 ID 채우기
+    for index, walk in created_walks:
+        results[index] = _result(records[index], 'created', id=walk.pk)
+    for index, walk, _ in finished:
+        results[index] = _result(records[index], 'updated', id=walk.pk)
+    for index, walk in duplicates:
+        results[index] = _result(records[index], 'duplicate', id=walk.pk)
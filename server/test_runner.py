@@ -0,0 +1,14 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    # 테스트 중에는 뷰의 쿼리 예산(@query_budget)을 넘으면 QueryBudgetExceeded로 테스트 실패
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budget_override = override_settings(SQL_QUERY_BUDGET_ACTION='raise')
+        self._budget_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._budget_override.disable()
+        super().teardown_test_environment(**kwargs)
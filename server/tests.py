@@ -1,3 +1,1111 @@
-from django.test import TestCase
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import requests
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from rest_framework.authtoken.models import Token
+from rest_framework.decorators import api_view
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from . import urls as server_urls, views
+from .authentication import TokenUserCache, token_user_cache
+from .emotion import predict_emotion
+from .emotion_batch import EmotionBatcher
+from .emotion_cache import EmotionResultCache, get_emotion_cache
+from .emotion_jobs import run_pending_jobs
+from .fake_inference import start_fake_server
+from .course import decode_course, encode_course, segment_distances
+from .kinect import encode_samples
+from .inference_client import CircuitBreaker, CircuitOpenError, InferenceClient
+from .loadgen import create_users, generate_history
+from .leaderboard import rank_for, rebuild_leaderboard
+from .leveling import level_for_total, total_for_level, walk_end_points
+from .models import (User, Calendar, WalkHistory, SRI, MonthlyWalkRollup, EmotionJob, UserStats, LeaderboardBucket,
+                     WalkCourse, KinectChunk)
+from .renderers import FastJSONRenderer
+from .response_cache import cache_stats, cached_response, get_response_cache
+from .rollups import find_rollup_mismatches, rebuild_monthly_rollups
+from .sql_stats import QueryBudgetExceeded, track_queries
+from .user_stats import get_user_stats, reconcile_user_stats
+from .versions import bump_versions
+
+
+class WalkMonthlyReportQueryTest(TestCase):
+    # 활동량이 많은 사용자도 월별 보고서 쿼리 수가 고정되어야 함
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('heavy', 'heavy', 'password')
+        walks = []
+        for day in range(1, 32):
+            calendar = Calendar.objects.create(user=cls.user, date=date(2024, 1, day), walkfinished=True,
+                                               emotion_large='joy')
+            for hour in range(4):
+                start_time = datetime(2024, 1, day, 8 + hour)
+                walks.append(WalkHistory(calendar=calendar, start_time=start_time,
+                                         end_time=start_time + timedelta(minutes=30),
+                                         distance=1000, stable_score=80))
+        WalkHistory.objects.bulk_create(walks)
+        SRI.objects.bulk_create(
+            SRI(user=cls.user, sri_score=20 + i, sri_date=datetime(2024, 1, 1 + i)) for i in range(30)
+        )
+        rebuild_monthly_rollups()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_query_budget(self):
+        # 보고서 버전 조회 1개 + 보고서 쿼리 6개
+        with self.assertNumQueries(7):
+            response = self.client.get('/server/walk-monthly-report/2024/1/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_distance'], 124.0)
+        self.assertEqual(response.data['total_time'], 62.0)
+        self.assertEqual(response.data['sri_score'], 49)
+        self.assertEqual(len(response.data['emotion_analysis']), 31)
+        self.assertEqual(len(response.data['emotion_analysis'][0]['walkhistory_id']), 4)
+
+    def test_emotion_list_range(self):
+        # 한 달 감정 기록을 요청 1개로: 버전 조회 1개 + 감정 기록 범위 조회 1개 + 산책 기록 ID 1개
+        Calendar.objects.create(user=self.user, date=date(2024, 2, 1))  # 감정 기록이 없는 날은 제외
+        with self.assertNumQueries(3):
+            response = self.client.get('/server/emotion-list-range/', {'start': '2024-01-01', 'end': '2024-02-29'})
+        self.assertEqual(response.status_code, 200)
+        emotions = response.data['emotions']
+        self.assertEqual(len(emotions), 31)
+        first = emotions[0]
+        self.assertEqual((first['date'], first['emotion_large'], first['emotion_small']), ('2024-01-01', 'joy', None))
+        walk_ids = list(WalkHistory.objects.filter(calendar_id=first['calendar_id']).order_by(
+            '-start_time').values_list('id', flat=True))
+        self.assertEqual(first['walkhistory_id'], walk_ids)
+
+        single = self.client.get('/server/emotion-list-create/', {'todayDate': '2024-01-01'}).data['emotions']
+        self.assertEqual({key: first[key] for key in single}, single)
+        self.assertEqual(self.client.get('/server/emotion-list-range/', {'start': '2024-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get('/server/emotion-list-range/',
+                                         {'start': '2024-01-01', 'end': '2024-12-31'}).status_code, 400)
+
+    def test_range_report(self):
+        # 12개월도 버전 조회 1개 + 월별 그룹 집계 1개 + 사용자/SRI/안정도 3개, 월별 값은 월간 집계와 같음
+        calendar = Calendar.objects.create(user=self.user, date=date(2024, 3, 2), walkfinished=True)
+        WalkHistory.objects.create(calendar=calendar, start_time=datetime(2024, 3, 2, 9),
+                                   end_time=datetime(2024, 3, 2, 10), distance=3000, stable_score=60, walk_score=4)
+        WalkHistory.objects.create(calendar=calendar, start_time=datetime(2024, 3, 2, 18))  # 끝나지 않은 산책
+        for month in (8, 9):
+            # 월별로는 0.1 단위로 내림되는 거리/시간 (1.05km, 0.05시간)
+            short = Calendar.objects.create(user=self.user, date=date(2023, month, 1), walkfinished=True)
+            WalkHistory.objects.create(calendar=short, start_time=datetime(2023, month, 1, 9),
+                                       end_time=datetime(2023, month, 1, 9, 3), distance=1050)
+        with self.assertNumQueries(5):
+            response = self.client.get('/server/walk-range-report/2023/7/2024/6/')
+
+        self.assertEqual(response.status_code, 200)
+        months = response.data['months']
+        self.assertEqual([(month['year'], month['month']) for month in months][:8],
+                         [(2023, 7), (2023, 8), (2023, 9), (2023, 10), (2023, 11), (2023, 12), (2024, 1), (2024, 2)])
+        self.assertEqual(len(months), 12)
+        january, march = months[6], months[8]
+        self.assertEqual((january['total_distance'], january['total_time'], january['walk_count']), (124.0, 62.0, 124))
+        self.assertEqual((january['walked_days'], january['emotion_counts']), (31, {'joy': 31}))
+        self.assertEqual((january['stable_average'], january['walk_score_average']), (80, None))
+        self.assertEqual((march['walk_count'], march['walked_days'], march['emotion_counts']), (1, 1, {}))
+        self.assertEqual((march['total_distance'], march['walk_score_average']), (3.0, 4))
+        self.assertEqual(months[0]['walk_count'], 0)
+        self.assertEqual((months[1]['total_distance'], months[1]['total_time']), (1.0, 0.0))
+        # 전체 합계는 월별로 내림한 값이 아니라 meter, 초 합계에서 한 번만 내림
+        self.assertEqual((response.data['total_distance'], response.data['total_time']), (129.1, 63.1))
+        self.assertEqual(response.data['walk_count'], 127)
+        self.assertEqual(response.data['sri_score'], 49)
+
+        rebuild_monthly_rollups()
+        monthly = self.client.get('/server/walk-monthly-report/2024/3/').data
+        self.assertEqual((monthly['total_distance'], monthly['total_time']),
+                         (march['total_distance'], march['total_time']))
+        self.assertEqual(self.client.get('/server/walk-range-report/2024/6/2023/7/').status_code, 400)
+        self.assertEqual(self.client.get('/server/walk-range-report/2020/1/2024/6/').status_code, 400)
+        self.assertEqual(self.client.get('/server/walk-range-report/0/1/0/2/').status_code, 400)
+        self.assertEqual(self.client.get('/server/walk-range-report/9999/12/10000/1/').status_code, 400)
+
+
+class MonthlyWalkRollupTest(TestCase):
+    # API로 증분 갱신한 월간 집계가 원본 테이블로 다시 계산한 값과 같아야 함
+    def setUp(self):
+        self.user = User.objects.create_user('walker', 'walker', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_incremental_updates_match_rebuild(self):
+        for distance in [800, 1200]:
+            walk_id = self.client.post('/server/walk-start/', {'playtime': 10}, format='json').data['walk_history_id']
+            self.client.post(f'/server/walk-end/{walk_id}/', {'kinect_data': 85, 'distance': distance}, format='json')
+            self.client.put(f'/server/walk-satisfy-update/{walk_id}/', {'walk_score': 4}, format='json')
+
+        self.assertEqual(find_rollup_mismatches(), [])
+        rollup = MonthlyWalkRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.walk_count, 2)
+        self.assertEqual(rollup.total_distance, 2000)
+        self.assertEqual(rollup.walked_day_count, 1)
+        self.assertEqual(rollup.total_walk_score, 8)
+
+    def test_rebuild_fixes_drift(self):
+        walk_id = self.client.post('/server/walk-start/', {'playtime': 10}, format='json').data['walk_history_id']
+        self.client.post(f'/server/walk-end/{walk_id}/', {'kinect_data': 85, 'distance': 800}, format='json')
+        # 집계 갱신 없이 원본 테이블만 바뀐 경우
+        Calendar.objects.filter(user=self.user).update(emotion_large='joy')
+        self.assertNotEqual(find_rollup_mismatches(), [])
+
+        rebuild_monthly_rollups()
+        self.assertEqual(find_rollup_mismatches(), [])
+        self.assertEqual(MonthlyWalkRollup.objects.get(user=self.user).emotion_counts, {'joy': 1})
+
+
+class EmotionJobTest(TestCase):
+    # job 모드는 즉시 202를 반환하고, 워커가 모델 결과를 Calendar에 저장
+    def setUp(self):
+        self.user = User.objects.create_user('feeler', 'feeler', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.client.post('/server/get-calendar/')
+        get_emotion_cache().clear_memory()
+
+    def analyze(self):
+        response = self.client.post('/server/emotion-analyze-large/', {'sentence': '좋은 하루', 'mode': 'job'},
+                                    format='json')
+        self.assertEqual(response.status_code, 202)
+        return response.data['job_id']
+
+    @mock.patch('server.inference_client.InferenceClient.post', return_value={'emotion': 'neutral'})
+    def test_job_saves_emotion(self, post):
+        job_id = self.analyze()
+        self.assertEqual(Calendar.objects.get(user=self.user).sentence, '좋은 하루')
+
+        self.assertEqual(run_pending_jobs(), 1)
+        response = self.client.get(f'/server/emotion-job/{job_id}/')
+        self.assertEqual(response.data['status'], EmotionJob.DONE)
+        self.assertEqual(response.data['emotion_large'], 'joy')
+        self.assertEqual(Calendar.objects.get(user=self.user).emotion_large, 'joy')
+
+    @mock.patch('server.inference_client.InferenceClient.post', side_effect=requests.exceptions.Timeout('timeout'))
+    def test_failed_job_is_retried_later(self, post):
+        job_id = self.analyze()
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job = EmotionJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, EmotionJob.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.next_attempt_at, job.updated_at)
+        # 백오프 시간이 지나기 전에는 다시 가져가지 않음
+        self.assertEqual(run_pending_jobs(), 0)
+
+
+class EmotionBatcherTest(TestCase):
+    # 동시에 들어온 문장을 묶어서 보내도 각 요청은 자기 문장의 결과를 받아야 함
+    def test_batched_results_match_single_requests(self):
+        server, url = start_fake_server(latency_ms=20, max_concurrency=4)
+        self.addCleanup(server.shutdown)
+        sentences = [f'문장 {i}' for i in range(16)]
+        expected = [requests.post(url, json={'text': sentence}).json()['emotion'] for sentence in sentences]
+
+        batcher = EmotionBatcher(url, window_ms=20, max_size=8)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            self.assertEqual(list(executor.map(batcher.predict, sentences)), expected)
+
+
+class EmotionResultCacheTest(TestCase):
+    # 공백만 다른 문장은 다시 모델 서버에 요청하지 않고, 메모리 캐시가 비어도 DB 캐시에서 찾아야 함
+    def setUp(self):
+        get_emotion_cache().clear_memory()
+
+    @mock.patch('server.inference_client.InferenceClient.post', return_value={'emotion': 'sadness'})
+    def test_repeat_sentence_is_served_from_cache(self, post):
+        self.assertEqual(predict_emotion('비가 와서  우울해 '), 'sadness')
+        self.assertEqual(predict_emotion(' 비가 와서 우울해'), 'sadness')
+        self.assertEqual(post.call_count, 1)
+
+        get_emotion_cache().clear_memory()
+        self.assertEqual(predict_emotion('비가 와서 우울해'), 'sadness')
+        self.assertEqual(post.call_count, 1)
+
+    def test_lru_eviction_and_model_version(self):
+        cache = EmotionResultCache('v1', max_size=2, persistent=False)
+        for sentence in ['a', 'b', 'c']:
+            cache.set(sentence, 'joy')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), 'joy')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertIsNone(EmotionResultCache('v2', persistent=False).get('c'))
+
+
+class InferenceClientTest(TestCase):
+    # keep-alive 연결을 재사용하고, 연속 실패 후에는 모델 서버를 호출하지 않고 바로 실패해야 함
+    def test_connections_are_reused(self):
+        server, url = start_fake_server(latency_ms=1, max_concurrency=4)
+        self.addCleanup(server.shutdown)
+        client = InferenceClient(url)
+        for i in range(10):
+            client.post({'text': f'문장 {i}'})
+        metrics = client.metrics()
+        self.assertEqual(metrics['new_connections'], 1)
+        self.assertEqual(metrics['connection_reuse_rate'], 0.9)
+
+    def test_breaker_fails_fast_while_open(self):
+        client = InferenceClient('http://127.0.0.1:9/predict', connect_timeout=0.5, max_retries=0,
+                                 breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.post({'text': '문장'})
+        with self.assertRaises(CircuitOpenError):
+            client.post({'text': '문장'})
+        metrics = client.metrics()
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['fast_failures'], 1)
+        self.assertEqual(metrics['breaker']['state'], CircuitBreaker.OPEN)
+
+    def test_failed_trial_reopens_for_full_timeout(self):
+        # 시험 요청이 실패하면 그 시각부터 다시 reset_timeout 동안 차단, 장애 시간은 처음 open부터 계산
+        now = [100.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with mock.patch('server.inference_client.time.monotonic', side_effect=lambda: now[0]):
+            breaker.record_failure()
+            self.assertFalse(breaker.allow_request())
+            now[0] = 110.0
+            self.assertTrue(breaker.allow_request())  # 시험 요청
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertFalse(breaker.allow_request())
+            now[0] = 119.9
+            self.assertFalse(breaker.allow_request())
+            now[0] = 120.0
+            self.assertTrue(breaker.allow_request())
+            self.assertEqual(breaker.stats()['open_seconds_current'], 20.0)
+            breaker.record_success()
+            self.assertEqual(breaker.stats()['open_seconds_total'], 20.0)
+
+    def test_unexpected_trial_error_releases_trial(self):
+        # 시험 요청이 예상하지 못한 오류로 끝나도 실패로 기록하고 다음 시험 요청을 허용해야 함
+        now = [100.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        client = InferenceClient('http://127.0.0.1:9/predict', max_retries=0, breaker=breaker)
+        with mock.patch('server.inference_client.time.monotonic', side_effect=lambda: now[0]):
+            breaker.record_failure()
+            now[0] = 110.0
+            with mock.patch.object(client.session, 'post', side_effect=RuntimeError('bug')):
+                with self.assertRaises(RuntimeError):
+                    client.post({'text': '문장'})
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertEqual(client.metrics()['failures'], 1)
+            now[0] = 120.0
+            with mock.patch.object(client.session, 'post', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    client.post({'text': '문장'})
+            self.assertTrue(breaker.allow_request())
+
+
+@override_settings(LEVEL_THRESHOLDS=[100, 150, 200])
+class LevelingTest(TestCase):
+    # DB에서 계산한 레벨/포인트가 파이썬 계산과 같아야 하고, 동시 지급에도 포인트가 사라지지 않아야 함
+    def test_level_for_total(self):
+        self.assertEqual(level_for_total(0), (1, 0))
+        self.assertEqual(level_for_total(249), (2, 149))
+        self.assertEqual(level_for_total(250), (3, 0))
+        self.assertEqual(level_for_total(1049), (6, 199))
+        self.assertEqual(total_for_level(6, 199), 1049)
+
+    def test_grant_points_in_single_update(self):
+        users = [User.objects.create_user(f'user{i}', f'user{i}', 'password') for i in range(3)]
+        ids = [user.pk for user in users]
+        # 포인트 UPDATE 1개 + 보고서 버전(profile) 갱신 1개
+        with self.assertNumQueries(2):
+            User.objects.grant_points(ids, 120)
+        with self.assertNumQueries(2):
+            User.objects.grant_points_bulk({ids[0]: 5, ids[1]: 130, ids[2]: 900})
+
+        for user, total in zip(users, [125, 250, 1020]):
+            user.refresh_from_db()
+            self.assertEqual((user.level, user.points), level_for_total(total))
+            self.assertEqual(user.total_points, total)
+
+    def test_add_points_does_not_overwrite_concurrent_grant(self):
+        user = User.objects.create_user('walker', 'walker', 'password')
+        stale = User.objects.get(pk=user.pk)
+        user.add_points(90)
+        stale.add_points(20)
+        self.assertEqual((stale.level, stale.points, stale.total_points), (2, 10, 110))
+
+
+class LeaderboardTest(TestCase):
+    # 순위 스냅샷은 포인트 지급/가입/탈퇴 후에도 COUNT로 계산한 순위와 같아야 하고, 목록은 keyset으로 이어져야 함
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users = [User.objects.create_user(f'rank{i}', f'rank{i}', 'password') for i in range(6)]
+            User.objects.grant_points_bulk({self.users[0].pk: 300, self.users[1].pk: 120, self.users[2].pk: 120,
+                                            self.users[3].pk: 40})
+        self.client = APIClient()
+        # 토큰 캐시처럼 포인트 지급 전의 사용자 객체로 인증해도 순위는 DB 값으로 계산
+        self.client.force_authenticate(self.users[2])
+
+    def assert_snapshot_matches(self):
+        for user in User.objects.all():
+            self.assertEqual(rank_for(user.total_points), User.objects.filter(total_points__gt=user.total_points).count() + 1)
+
+    def test_pushed_updates_match_rebuild(self):
+        self.assert_snapshot_matches()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.grant_points([self.users[4].pk], 500)  # 처음 나온 점수
+            self.users[1].add_points(15)
+            self.users[0].delete()
+            User.objects.create_user('late', 'late', 'password')
+        self.assert_snapshot_matches()
+        pushed = list(LeaderboardBucket.objects.filter(user_count__gt=0).order_by('pk').values_list(
+            'total_points', 'user_count', 'users_above'))
+        rebuild_leaderboard()
+        self.assertEqual(list(LeaderboardBucket.objects.order_by('pk').values_list(
+            'total_points', 'user_count', 'users_above')), pushed)
+
+    def test_failed_push_does_not_fail_grant(self):
+        # commit 뒤 스냅샷 갱신이 실패해도 포인트 지급은 그대로 성공하고 로그만 남음
+        with mock.patch('server.leaderboard.move_scores', side_effect=RuntimeError('deadlock')):
+            with self.assertLogs('server.leaderboard', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    User.objects.grant_points([self.users[5].pk], 10)
+        self.assertEqual(User.objects.get(pk=self.users[5].pk).total_points, 10)
+
+    def test_top_pages_and_neighbours(self):
+        with self.assertNumQueries(2):
+            first = self.client.get('/server/leaderboard/', {'limit': 3}).data
+        self.assertEqual([(row['rank'], row['total_points']) for row in first['leaders']], [(1, 300), (2, 120), (2, 120)])
+        second = self.client.get('/server/leaderboard/', {'limit': 3, 'cursor': first['next_cursor']}).data
+        self.assertEqual([(row['rank'], row['total_points']) for row in second['leaders']], [(4, 40), (5, 0), (5, 0)])
+        ordered = [row['id'] for row in first['leaders'] + second['leaders']]
+        self.assertEqual(ordered, list(User.objects.order_by('-total_points', 'pk').values_list('pk', flat=True)))
+
+        with self.assertNumQueries(4):
+            data = self.client.get('/server/leaderboard/me/', {'neighbours': 2}).data
+        self.assertEqual((data['rank'], data['me']['id']), (2, self.users[2].pk))
+        self.assertEqual([row['id'] for row in data['above']], ordered[:2])
+        self.assertEqual([row['id'] for row in data['below']], ordered[3:5])
+        self.assertEqual(self.client.get('/server/leaderboard/', {'cursor': 'x'}).status_code, 400)
+
+        # commit 전이라 스냅샷에 아직 없는 점수도 바로 위 칸으로 순위 계산
+        User.objects.grant_points([self.users[5].pk], 200)
+        with self.assertNumQueries(2):
+            leaders = self.client.get('/server/leaderboard/', {'limit': 2}).data['leaders']
+        self.assertEqual([(row['rank'], row['total_points']) for row in leaders], [(1, 300), (2, 200)])
+
+
+class HistoryPaginationTest(TestCase):
+    # 산책/SRI 기록 목록: keyset 페이지를 끝까지 넘기면 전체 기록이 최근 순으로 빠짐없이 한 번씩 나와야 함
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('history', 'history', 'password')
+        other = User.objects.create_user('other', 'other', 'password')
+        for day in range(1, 11):
+            calendar = Calendar.objects.create(user=cls.user, date=date(2024, 1, day))
+            for hour in (9, 9, 18):  # 같은 시각의 산책은 id로 순서 결정
+                WalkHistory.objects.create(calendar=calendar, start_time=datetime(2024, 1, day, hour))
+            SRI.objects.create(user=cls.user, sri_score=20 + day, sri_date=datetime(2024, 1, day, 20))
+        WalkHistory.objects.create(calendar=calendar, start_time=None)  # 시작 시각이 없는 기록은 제외
+        other_calendar = Calendar.objects.create(user=other, date=date(2024, 1, 5))
+        WalkHistory.objects.create(calendar=other_calendar, start_time=datetime(2024, 1, 5, 10))
+        SRI.objects.create(user=other, sri_score=50, sri_date=datetime(2024, 1, 5, 10))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pages(self, path, key, **params):
+        ids, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                response = self.client.get(path, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data[key]]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_walk_history(self):
+        expected = list(WalkHistory.objects.filter(calendar__user=self.user, start_time__isnull=False).order_by(
+            '-start_time', '-id').values_list('id', flat=True))
+        self.assertEqual(self.pages('/server/walk-history/', 'walks', limit=4), expected)
+        self.assertEqual(len(self.pages('/server/walk-history/', 'walks', limit=3, start='2024-01-03',
+                                        end='2024-01-04')), 6)
+        self.assertEqual(len(self.pages('/server/walk-history/', 'walks', limit=30)), 30)
+
+        # walk_start로 만든 산책도 목록에 나옴 (calendar.user에서 user를 채움)
+        walk_id = self.client.post('/server/walk-start/', {'playtime': 10}, format='json').data['walk_history_id']
+        self.assertEqual(self.client.get('/server/walk-history/', {'limit': 1}).data['walks'][0]['id'], walk_id)
+        for params in [{'limit': 0}, {'cursor': 'x'}, {'start': '2024/01/01'}]:
+            self.assertEqual(self.client.get('/server/walk-history/', params).status_code, 400)
+
+    def test_sri_history(self):
+        ids = self.pages('/server/sri-history/', 'sris', limit=4, end='2024-01-08')
+        self.assertEqual(ids, list(SRI.objects.filter(user=self.user, sri_date__lt=datetime(2024, 1, 9)).order_by(
+            '-sri_date').values_list('id', flat=True)))
+        first = json.loads(self.client.get('/server/sri-history/', {'limit': 1}).content)['sris'][0]
+        self.assertEqual((first['sri_score'], first['sri_date']), (30, '2024-01-10T20:00:00'))
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    # 같은 토큰으로 다시 요청하면 토큰 조회 쿼리가 없어야 하고, 로그아웃/포인트 지급은 바로 반영되어야 함
+    def setUp(self):
+        token_user_cache.clear()
+        self.client = APIClient()
+        response = self.client.post('/server/user-signup/', {'username': 'tok', 'nickname': 'tok', 'password': 'pw'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        self.user = User.objects.get(username='tok')
+
+    def test_repeat_requests_skip_token_query(self):
+        # 산책 기록이 없는 달의 보고서는 버전 조회 포함 6개 쿼리 (+ 첫 요청의 토큰 조회 1개)
+        with self.assertNumQueries(7):
+            self.client.get('/server/walk-monthly-report/2024/1/')
+        # 다시 요청하면 토큰 조회 없이 버전 조회 1개 (보고서는 응답 캐시에서)
+        with self.assertNumQueries(1):
+            response = self.client.get('/server/walk-monthly-report/2024/1/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_report_reads_fresh_profile(self):
+        # 다른 worker에서 지급한 포인트: 이 worker의 토큰 캐시 사용자는 예전 값이지만 보고서는 DB 값으로 만듦
+        self.client.get('/server/walk-monthly-report/2024/1/')
+        User.objects.filter(pk=self.user.pk).update(level=2, points=50, total_points=150)  # 캐시 무효화 신호 없음
+        bump_versions(['profile'], user_id=self.user.pk)
+        response = self.client.get('/server/walk-monthly-report/2024/1/')
+        self.assertEqual((response.data['cactus_level'], response.data['cactus_score']), (2, 50))
+        response = self.client.get('/server/walk-range-report/2024/1/2024/2/')
+        self.assertEqual((response.data['cactus_level'], response.data['cactus_score']), (2, 50))
+
+    def test_points_and_logout_invalidate_cache(self):
+        self.client.get('/server/walk-monthly-report/2024/1/')
+        User.objects.grant_points([self.user.pk], 150)
+        response = self.client.get('/server/walk-monthly-report/2024/1/')
+        self.assertEqual((response.data['cactus_level'], response.data['cactus_score']), (2, 50))
+
+        self.assertEqual(self.client.post('/server/user-logout/').status_code, 200)
+        self.assertEqual(self.client.get('/server/walk-monthly-report/2024/1/').status_code, 401)
+
+    def test_shared_cache_invalidation_reaches_other_workers(self):
+        # 워커 A에서 로그아웃/탈퇴로 지운 항목은 같은 공유 캐시를 쓰는 워커 B에서도 바로 사라져야 함
+        caches['default'].clear()
+        worker_a, worker_b = (TokenUserCache(shared_alias='default') for _ in range(2))
+        token = Token.objects.get(user=self.user)
+        worker_a.set(token.key, self.user, token)
+        self.assertEqual(worker_b.get(token.key)[0].pk, self.user.pk)
+        worker_a.invalidate_token(token.key)
+        self.assertIsNone(worker_b.get(token.key))
+
+        worker_b.set(token.key, self.user, token)
+        worker_b.get(token.key)
+        worker_a.invalidate_user(self.user.pk)
+        self.assertIsNone(worker_b.get(token.key))
+
+
+class UserStatsTest(TestCase):
+    # SRI 검사 필요 여부는 통계 1행으로 판단하고, 산책/SRI/삭제에 맞춰 갱신되어야 함
+    def setUp(self):
+        self.user = User.objects.create_user('sri', 'sri', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sri_needed(self):
+        return self.client.get('/server/sri/').data['sri_needed']
+
+    def test_sri_needed_every_five_walks(self):
+        self.assertTrue(self.sri_needed())
+        for _ in range(4):
+            self.client.post('/server/walk-start/', {'playtime': 10}, format='json')
+        self.assertFalse(self.sri_needed())
+        self.client.post('/server/walk-start/', {'playtime': 10}, format='json')
+        with self.assertNumQueries(1):
+            self.assertTrue(self.sri_needed())
+
+        self.client.post('/server/sri/', {'sri_score': 30}, format='json')
+        self.assertFalse(self.sri_needed())
+
+    def test_walk_delete_and_reconcile(self):
+        for _ in range(2):
+            self.client.post('/server/walk-start/', {'playtime': 10}, format='json')
+        WalkHistory.objects.first().delete()
+        self.assertEqual(UserStats.objects.get(pk=self.user.pk).walk_count, 1)
+
+        UserStats.objects.filter(pk=self.user.pk).update(walk_count=7)
+        self.assertEqual(reconcile_user_stats([self.user.pk]), 1)
+        self.assertEqual(UserStats.objects.get(pk=self.user.pk).walk_count, 1)
+
+    def test_calendar_delete_updates_stats_once(self):
+        other = User.objects.create_user('sri2', 'sri2', 'password')
+        for _ in range(3):
+            self.client.post('/server/walk-start/', {'playtime': 10}, format='json')
+        walk = WalkHistory.objects.filter(calendar__user=self.user).first()
+        self.client.post(f'/server/walk-end/{walk.pk}/', {'distance': 100}, format='json')
+        self.client.force_authenticate(other)
+        for _ in range(2):
+            self.client.post('/server/walk-start/', {'playtime': 10}, format='json')
+
+        # 사용자 1명의 Calendar 삭제: 기록 수와 관계없이 통계 UPDATE 1번
+        with CaptureQueriesContext(connection) as queries:
+            Calendar.objects.get(user=self.user).delete()
+        stats_updates = [query for query in queries
+                         if query['sql'].startswith('UPDATE') and 'server_userstats' in query['sql']]
+        self.assertEqual(len(stats_updates), 1)
+        self.assertEqual(UserStats.objects.get(pk=self.user.pk).walk_count, 0)
+        self.assertEqual(UserStats.objects.get(pk=self.user.pk).finished_walk_count, 0)
+
+        WalkHistory.objects.filter(calendar__user=other).delete()
+        self.assertEqual(UserStats.objects.get(pk=other.pk).walk_count, 0)
+        self.assertEqual(reconcile_user_stats([self.user.pk, other.pk]), 0)
+
+
+class AdminChangelistQueryTest(TestCase):
+    # admin 목록 쿼리 수는 표시하는 행 수와 관계없이 일정해야 함
+    def setUp(self):
+        admin_user = User.objects.create_superuser('admin', 'admin', 'password')
+        self.client.force_login(admin_user)
+
+    def add_rows(self, count):
+        for i in range(count):
+            user = User.objects.create_user(f'u{User.objects.count()}', 'nick', 'password')
+            calendar = Calendar.objects.create(user=user, date=date(2024, 1, 1 + i % 28))
+            WalkHistory.objects.create(calendar=calendar, start_time=datetime(2024, 1, 1 + i % 28, 9))
+            SRI.objects.create(user=user, sri_score=30, sri_date=datetime(2024, 1, 1 + i % 28))
+            reconcile_user_stats([user.pk])
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = ['/admin/server/sri/', '/admin/server/calendar/', '/admin/server/walkhistory/']
+        self.add_rows(3)
+        small = [self.changelist_queries(url) for url in urls]
+        self.add_rows(20)
+        self.assertEqual([self.changelist_queries(url) for url in urls], small)
+
+    def test_changelist_get_does_not_write(self):
+        # 통계 행이 없는 사용자도 목록 조회에서 통계 행을 만들지 않고, 날짜 필터는 범위 조건으로만 거름
+        user = User.objects.create_user('nostats', 'nick', 'password')
+        SRI.objects.create(user=user, sri_score=30, sri_date=timezone.now())
+        UserStats.objects.filter(pk=user.pk).delete()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/admin/server/sri/', {'sri_date__gte': timezone.now().date().isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'icon-unknown.svg')
+        self.assertFalse(UserStats.objects.filter(pk=user.pk).exists())
+        self.assertFalse([query for query in context if not query['sql'].startswith('SELECT')])
+
+
+class KinectStreamTest(TestCase):
+    # 청크로 나눠 보낸 샘플의 누적 통계가 전체 샘플로 계산한 값과 같아야 함
+    def setUp(self):
+        self.user = User.objects.create_user('kinect', 'kinect', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.walk_id = self.client.post('/server/walk-start/', {'playtime': 10},
+                                        format='json').data['walk_history_id']
+
+    def upload(self, values, seq):
+        return self.client.generic('POST', f'/server/walk-kinect/{self.walk_id}/?seq={seq}', encode_samples(values),
+                                   content_type='application/octet-stream')
+
+    def test_running_stats_and_walk_end(self):
+        chunks = [[70 + (i * 7 + j) % 25 for j in range(30)] for i in range(4)]
+        for seq, chunk in enumerate(chunks, start=1):
+            self.assertEqual(self.upload(chunk, seq).status_code, 201)
+        # 같은 청크를 재전송해도 통계는 그대로
+        response = self.upload(chunks[-1], 4)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['duplicate'])
+
+        values = sorted(value for chunk in chunks for value in chunk)
+        self.assertEqual(response.data['sample_count'], 120)
+        self.assertAlmostEqual(response.data['mean'], sum(values) / 120, places=2)
+        self.assertAlmostEqual(response.data['variance'], statistics.pvariance(values), places=2)
+        self.assertAlmostEqual(response.data['p50'], values[59], delta=0.1)
+
+        self.client.post(f'/server/walk-end/{self.walk_id}/', {'distance': 500}, format='json')
+        walk = WalkHistory.objects.get(pk=self.walk_id)
+        self.assertAlmostEqual(walk.stable_score, sum(values) / 120, places=2)
+
+    def test_implicit_seq_after_gap(self):
+        # seq 1, 3 다음에 seq 없이 보내면 4번 (청크 개수 + 1 = 3이 아님), 새 샘플이 중복으로 버려지지 않아야 함
+        self.assertEqual(self.upload([70.0], 1).status_code, 201)
+        self.assertEqual(self.upload([80.0], 3).status_code, 201)
+        response = self.client.generic('POST', f'/server/walk-kinect/{self.walk_id}/', encode_samples([90.0]),
+                                       content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['sample_count'], 3)
+        self.assertEqual(sorted(KinectChunk.objects.filter(walk_id=self.walk_id).values_list('seq', flat=True)),
+                         [1, 3, 4])
+
+    def test_invalid_block_is_rejected(self):
+        for seq in ['0', '-1', 'x', '²', str(2 ** 31)]:
+            self.assertEqual(self.upload([70.0], seq).status_code, 400)
+        response = self.client.generic('POST', f'/server/walk-kinect/{self.walk_id}/', b'abc',
+                                       content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+
+
+class WalkCourseTest(TestCase):
+    # 압축 저장한 경로에서 서버가 거리를 계산하고, walk_end는 클라이언트 거리 대신 그 값을 사용
+    def setUp(self):
+        self.user = User.objects.create_user('course', 'course', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.walk_id = self.client.post('/server/walk-start/', {'playtime': 10},
+                                        format='json').data['walk_history_id']
+        rng = np.random.default_rng(0)
+        steps = rng.normal(0, 1, (3000, 2)) * 1e-5 + [0.8e-5, 0.5e-5]
+        self.lat = 37.55 + np.cumsum(steps[:, 0])
+        self.lng = 126.97 + np.cumsum(steps[:, 1])
+        self.times = np.arange(3000)
+
+    def test_encoding_round_trip_and_size(self):
+        encoded = encode_course(self.lat, self.lng, self.times)
+        lat, lng, times = decode_course(encoded)
+        self.assertTrue(np.allclose(lat, self.lat, atol=5e-6))
+        self.assertTrue(np.allclose(lng, self.lng, atol=5e-6))
+        self.assertTrue((times == self.times).all())
+        as_json = json.dumps([[round(a, 6), round(b, 6), int(t)] for a, b, t in zip(self.lat, self.lng, self.times)])
+        self.assertLess(len(encoded) * 10, len(as_json))
+        with self.assertRaises(ValueError):
+            decode_course(encoded[:-1])
+
+    def test_upload_sets_server_distance(self):
+        points = [[a, b, int(t)] for a, b, t in zip(self.lat, self.lng, self.times)]
+        response = self.client.post(f'/server/walk-course/{self.walk_id}/', {'points': points}, format='json')
+        self.assertEqual(response.status_code, 201)
+        lat, lng, _ = decode_course(encode_course(self.lat, self.lng))
+        expected = segment_distances(lat, lng).sum()
+        self.assertAlmostEqual(response.data['distance'], expected, delta=0.1)
+        self.assertEqual(response.data['duration_seconds'], 2999)
+        self.assertAlmostEqual(response.data['pace'], 2999 / expected * 1000, delta=0.1)
+
+        # 압축 형식으로 다시 올리면 덮어씀
+        response = self.client.generic('POST', f'/server/walk-course/{self.walk_id}/',
+                                       encode_course(self.lat[:100], self.lng[:100]),
+                                       content_type='application/octet-stream')
+        self.assertEqual(response.data['point_count'], 100)
+        self.assertIsNone(response.data['pace'])
+        short = response.data['distance']
+
+        self.client.post(f'/server/walk-end/{self.walk_id}/', {'distance': 99999, 'kinect_data': 80},
+                         format='json')
+        self.assertEqual(WalkHistory.objects.get(pk=self.walk_id).distance, round(short))
+        response = self.client.get(f'/server/walk-course/{self.walk_id}/')
+        self.assertEqual(len(response.data['points']), 100)
+
+    def test_invalid_points_are_rejected(self):
+        response = self.client.post(f'/server/walk-course/{self.walk_id}/', {'points': [[91, 0], [0, 0]]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        for body in [[[37.5, 127.0]], 'points']:
+            response = self.client.post(f'/server/walk-course/{self.walk_id}/', body, format='json')
+            self.assertEqual(response.status_code, 400)
+        for times in [[0, 0], [0, 24 * 3600 + 1], [0, 1e15]]:
+            response = self.client.post(f'/server/walk-course/{self.walk_id}/',
+                                        {'points': [[37.5, 127.0, times[0]], [37.5, 127.0, times[1]]]}, format='json')
+            self.assertEqual(response.status_code, 400)
+        # 압축 형식도 같은 검사 (범위를 벗어난 좌표, 거꾸로 가는 시각)
+        for lat, lng, times in [([95.0, 0.0], [0.0, 0.0], None), ([37.5, 37.5], [127.0, 127.0], [10, 5])]:
+            response = self.client.generic('POST', f'/server/walk-course/{self.walk_id}/',
+                                           encode_course(lat, lng, times), content_type='application/octet-stream')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(WalkCourse.objects.filter(walk_id=self.walk_id).exists())
+
+
+class SyncTest(TestCase):
+    # 오프라인에서 쌓인 기록 200건을 한 번에 반영 (기록 수와 관계없이 쿼리 수 일정)
+    def setUp(self):
+        self.user = User.objects.create_user('sync', 'sync', 'password')
+        get_user_stats(self.user.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def queued_records(self):
+        records = []
+        base = datetime(2024, 5, 27, 9, 0)
+        for i in range(50):
+            start = base + timedelta(days=i // 10, hours=i % 10)
+            records.append({'type': 'walk_start', 'client_id': f'w{i}', 'timestamp': start.isoformat(),
+                            'playtime': 10})
+            records.append({'type': 'walk_end', 'client_id': f'we{i}', 'walk': f'w{i}',
+                            'timestamp': (start + timedelta(minutes=20)).isoformat(),
+                            'distance': 400 * (i % 5), 'kinect_data': 75 + i % 20})
+            records.append({'type': 'sri', 'client_id': f's{i}', 'timestamp': start.isoformat(), 'sri_score': 30 + i})
+            records.append({'type': 'emotion_small', 'client_id': f'e{i}', 'timestamp': start.isoformat(),
+                            'emotion_small': f'feeling {i}'})
+        return records
+
+    def test_bulk_sync(self):
+        records = self.queued_records()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/server/sync/', {'records': records}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # 건별로 다시 보내면 약 1000개 쿼리, 일괄 반영은 savepoint 포함 20여 개
+        self.assertLessEqual(len(queries), 25)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'updated', 'created', 'updated'] * 50)
+
+        self.assertEqual(WalkHistory.objects.filter(calendar__user=self.user, end_time__isnull=False).count(), 50)
+        self.assertEqual(SRI.objects.filter(user=self.user).count(), 50)
+        self.assertEqual(Calendar.objects.filter(user=self.user, walkfinished=True).count(), 5)
+        self.assertEqual(Calendar.objects.get(user=self.user, date=date(2024, 5, 27)).emotion_small, 'feeling 9')
+        self.assertEqual(find_rollup_mismatches([self.user.id]), [])
+        self.assertEqual(reconcile_user_stats([self.user.id]), 0)
+        self.user.refresh_from_db()
+        expected_points = sum(walk_end_points(75 + i % 20, 400 * (i % 5)) for i in range(50))
+        self.assertEqual(self.user.total_points, expected_points)
+
+        # 응답을 받지 못해 같은 기록을 다시 보내도 중복 반영하지 않음
+        response = self.client.post('/server/sync/', {'records': records}, format='json')
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['duplicate', 'duplicate', 'duplicate', 'updated'] * 50)
+        self.assertEqual(SRI.objects.filter(user=self.user).count(), 50)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_points, expected_points)
+
+    def test_offset_timestamps_use_local_date(self):
+        # 시간대가 있는 시각은 서버 시간대(Asia/Seoul) 날짜/시각으로 저장 (UTC로 바뀌어 전날로 들어가지 않음)
+        records = [
+            {'type': 'walk_start', 'client_id': 'w', 'timestamp': '2024-01-02T08:30:00+09:00', 'playtime': 10},
+            {'type': 'sri', 'client_id': 's', 'timestamp': '2024-01-01T23:30:00Z', 'sri_score': 30},
+            {'type': 'emotion_small', 'client_id': 'e', 'timestamp': '2024-01-02T08:40:00', 'emotion_small': 'calm'},
+        ]
+        results = self.client.post('/server/sync/', {'records': records}, format='json').data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'created', 'updated'])
+        walk = WalkHistory.objects.get(calendar__user=self.user, client_id='w')
+        self.assertEqual((walk.calendar.date, walk.start_time), (date(2024, 1, 2), datetime(2024, 1, 2, 8, 30)))
+        self.assertEqual(SRI.objects.get(user=self.user).sri_date, datetime(2024, 1, 2, 8, 30))
+        self.assertEqual(Calendar.objects.get(user=self.user, date=date(2024, 1, 2)).emotion_small, 'calm')
+
+    def test_client_id_is_unique_per_user(self):
+        # 같은 client_id를 다른 날짜로 다시 보내도(동시 요청 포함) 산책 기록은 사용자당 하나
+        record = {'type': 'walk_start', 'client_id': 'w', 'timestamp': '2024-01-02T08:30:00', 'playtime': 10}
+        self.client.post('/server/sync/', {'records': [record]}, format='json')
+        results = self.client.post('/server/sync/', {'records': [{**record, 'timestamp': '2024-01-03T08:30:00'}]},
+                                   format='json').data['results']
+        self.assertEqual(results[0]['status'], 'duplicate')
+        calendar = Calendar.objects.create(user=self.user, date=date(2024, 1, 4))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            WalkHistory.objects.create(calendar=calendar, client_id='w')
+        other = User.objects.create_user('sync2', 'sync2', 'password')
+        WalkHistory.objects.create(calendar=Calendar.objects.create(user=other, date=date(2024, 1, 2)), client_id='w')
+
+    def test_invalid_records_are_reported(self):
+        walk_id = self.client.post('/server/walk-start/', {'playtime': 10}, format='json').data['walk_history_id']
+        records = [
+            {'type': 'walk_end', 'client_id': 'a', 'walk_id': walk_id, 'timestamp': datetime.now().isoformat(),
+             'kinect_data': 85, 'distance': 1000},
+            {'type': 'walk_end', 'client_id': 'b', 'walk': 'missing', 'timestamp': '2024-05-01T10:00:00',
+             'kinect_data': 85},
+            {'type': 'sri', 'client_id': 'c', 'timestamp': '2024-05-01T10:00:00'},
+        ]
+        results = self.client.post('/server/sync/', {'records': records}, format='json').data['results']
+        self.assertEqual([result['status'] for result in results], ['updated', 'error', 'error'])
+        self.assertIn('sri_score', results[2]['errors'])
+        self.assertEqual(WalkHistory.objects.get(pk=walk_id).distance, 1000)
+        self.assertEqual(find_rollup_mismatches([self.user.id]), [])
+
+
+class ConditionalReportTest(TestCase):
+    # 바뀐 것이 없으면 보고서 쿼리 없이 버전 조회 1개로 304 응답, 쓰기 후에는 새 ETag
+    def setUp(self):
+        self.user = User.objects.create_user('etag', 'etag', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.walk_id = self.client.post('/server/walk-start/', {'playtime': 10},
+                                        format='json').data['walk_history_id']
+        self.client.post(f'/server/walk-end/{self.walk_id}/', {'distance': 500, 'kinect_data': 85}, format='json')
+
+    def assert_revalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def test_monthly_report(self):
+        today = timezone.now().date()
+        url = f'/server/walk-monthly-report/{today.year}/{today.month}/'
+        etag = self.assert_revalidates(url)
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        # naive 서울 시각을 UTC로 바꿔 보냄 (9시간 뒤의 시각이 아님)
+        self.assertLess(abs(parse_http_date(last_modified) - time.time()), 60)
+
+        self.client.post('/server/sri/', {'sri_score': 40}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_walk_reports_follow_walk_owner(self):
+        url = f'/server/walk-once-report/{self.walk_id}/'
+        etag = self.assert_revalidates(url)
+        self.assert_revalidates(f'/server/walk-simple-report/{self.walk_id}/')
+
+        self.client.put(f'/server/walk-satisfy-update/{self.walk_id}/', {'walk_score': 4}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        # 없는 산책은 ETag 없이 평소처럼 404
+        response = self.client.get('/server/walk-once-report/999999/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_emotion_list(self):
+        url = f'/server/emotion-list-create/?todayDate={timezone.now().date()}'
+        etag = self.assert_revalidates(url)
+        self.client.post('/server/emotion-save-small/', {'emotion_small': 'calm'}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ResponseCacheTest(TestCase):
+    # 읽기 API 응답 캐시: 같은 요청은 버전 조회 1개, 쓰기(signal) 후에는 새로 계산, 동시 miss는 한 번만 계산
+    def setUp(self):
+        cache_stats.reset()
+        self.user = User.objects.create_user('cache', 'cache', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_hit_and_signal_invalidation(self):
+        url = '/server/walk-monthly-report/2024/1/'
+        first = self.client.get(url).data
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data, first)
+        self.client.post('/server/sri/', {'sri_score': 40}, format='json')
+        self.assertEqual(self.client.get(url).data['sri_score'], 40)
+        stats = cache_stats.snapshot()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 2, 2))
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        @api_view(['GET'])
+        @cached_response('walk')
+        def slow_view(request):
+            calls.append(1)
+            time.sleep(0.2)
+            return Response({'value': 42})
+
+        row = {'user_id': self.user.pk, 'walk_version': 0, 'walk_modified': datetime.now()}
+        factory = APIRequestFactory()
+
+        def fetch(_):
+            request = factory.get('/slow/')
+            force_authenticate(request, user=self.user)
+            return slow_view(request).data
+
+        with mock.patch('server.response_cache.load_versions', return_value=row):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(fetch, range(8)))
+        self.assertEqual(results, [{'value': 42}] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_stats.snapshot()['coalesced'], 7)
+
+    def test_backends_count_evictions(self):
+        for backend, location in [('server.response_cache.LocMemResponseCache', 'eviction-test'),
+                                  ('server.response_cache.FileResponseCache', tempfile.mkdtemp())]:
+            caches_setting = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'responses': {'BACKEND': backend, 'LOCATION': location,
+                              'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 2}},
+            }
+            with override_settings(CACHES=caches_setting):
+                cache_stats.reset()
+                cache = get_response_cache()
+                for i in range(10):
+                    cache.set(f'key{i}', i)
+                self.assertGreater(cache_stats.snapshot()['evictions'], 0, backend)
+                cache.clear()
+            if backend.endswith('FileResponseCache'):
+                shutil.rmtree(location, ignore_errors=True)
+
+
+class FastSerializationTest(TestCase):
+    # FastJSONRenderer는 JSONRenderer와 같은 bytes, values() 행 직렬화는 기존 응답과 같은 값
+    def test_renderer_matches_drf(self):
+        data = {
+            'message': 'successfully', 'nickname': '산책\u2028러', 1: None, 'score': 1.5, 'big': 2 ** 70,
+            'start_time': datetime(2024, 1, 2, 3, 4, 5, 123456), 'date': date(2024, 1, 1),
+            'actual_walk_time': timedelta(minutes=30), 'items': [{'id': 1, 'walkhistory_id': [3, 2]}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        with mock.patch('server.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_row_responses(self):
+        user = User.objects.create_user('rows', 'rows', 'password')
+        calendar = Calendar.objects.create(user=user, date=date(2024, 1, 5), sentence='좋은 날', emotion_large='joy')
+        walk = WalkHistory.objects.create(calendar=calendar, start_time=datetime(2024, 1, 5, 8, 0),
+                                          end_time=datetime(2024, 1, 5, 8, 45, 30), distance=2500,
+                                          stable_score=71.5, walk_score=4)
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get(f'/server/walk-once-report/{walk.pk}/').json(), {
+            'message': 'successfully', 'start_time': '08:00', 'end_time': '08:45', 'distance': 2500,
+            'actual_walk_time': 45, 'walk_score': 4.0, 'stable_score': 71.5, 'walk_history_id': walk.pk,
+        })
+        self.assertEqual(client.get(f'/server/walk-simple-report/{walk.pk}/').json(),
+                         {'message': 'successfully', 'total_time': 45, 'distance': 2500, 'stable_score': 71})
+        self.assertEqual(client.get('/server/emotion-list-create/', {'todayDate': '2024-01-05'}).json()['emotions'], {
+            'question': None, 'sentence': '좋은 날', 'emotion_large': 'joy', 'emotion_small': None,
+            'calendar_id': calendar.pk, 'date': '2024-01-05',
+        })
+        self.assertEqual(client.get('/server/walk-once-report/999999/').status_code, 404)
+
+
+class SqlStatsTest(TestCase):
+    # 요청별 SQL 통계: 반복된 문장(N+1) 검출, 응답 헤더, 뷰 쿼리 예산 초과 시 실패 (테스트 실행기는 'raise')
+    def setUp(self):
+        self.user = User.objects.create_user('sqlstats', 'sqlstats', 'password')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def test_track_queries_finds_duplicates(self):
+        for day in range(1, 4):
+            Calendar.objects.create(user=self.user, date=date(2024, 1, day))
+        with track_queries() as stats:
+            for calendar in Calendar.objects.filter(user=self.user):
+                calendar.user.nickname  # 캘린더마다 사용자 조회 (N+1)
+        self.assertEqual(stats.count, 4)
+        self.assertEqual([count for _, count in stats.duplicates], [3])
+        self.assertIn('server_user', stats.as_dict()['duplicates'][0]['sql'])
+
+    @override_settings(SQL_STATS_HEADERS=True)
+    def test_headers_and_budget(self):
+        url = '/server/walk-monthly-report/2024/1/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-SQL-Budget'], '8')
+        self.assertLessEqual(int(response['X-SQL-Queries']), 8)
+        self.assertEqual(response['X-SQL-Duplicates'], '0')
+
+        with mock.patch.dict(views.walk_monthly_report.query_budget, {'*': 0}), \
+                self.assertLogs('server.sql_stats', 'WARNING') as logs:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(url)
+            with override_settings(SQL_QUERY_BUDGET_ACTION='log'):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(logs.records), 2)
+        record = json.loads(logs.records[1].getMessage())
+        self.assertTrue(record['over_budget'])
+        self.assertEqual(record['view'], 'server.views.walk_monthly_report')
+
+
+class ProfilingTest(TestCase):
+    # 관리자의 X-Profile: 1 요청만 프로파일을 저장하고, 저장된 프로파일을 합쳐서 조회
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        overrides = override_settings(PROFILE_DIR=directory, PROFILE_SAMPLE_RATE=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user('profiled', 'profiled', 'password')
+        self.staff = User.objects.create_superuser('staff', 'staff', 'password')
+        self.client = APIClient()
+
+    def get_report(self, user, **headers):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}', **headers)
+        return self.client.get('/server/walk-monthly-report/2024/1/')
+
+    def test_staff_header_profiles_view(self):
+        self.assertNotIn('X-Profile-Id', self.get_report(self.user, HTTP_X_PROFILE='1'))
+        response = self.get_report(self.staff, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['message'], 'successfully')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.staff).key}')
+        data = self.client.get('/server/profiles/', {'view': 'walk_monthly_report', 'sort': 'cumtime'}).data
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['profiles'][0]['name'], response['X-Profile-Id'])
+        self.assertEqual(data['profiles'][0]['user_id'], self.staff.pk)
+        self.assertIn('walk_monthly_report', [row['function'] for row in data['hot_functions']])
+
+        out = StringIO()
+        call_command('profile_report', '--view', 'walk_monthly_report', '--list', stdout=out)
+        self.assertIn(response['X-Profile-Id'], out.getvalue())
+        self.assertEqual(self.client.get('/server/profiles/', {'sort': 'name'}).status_code, 400)
+
+
+class AsyncViewTest(TestCase):
+    # ASGI로 들어온 요청은 비동기 뷰가 처리: 모델 서버는 비동기 클라이언트로, 304/캐시 적중은 DRF 뷰 없이 응답
+    def setUp(self):
+        cache_stats.reset()
+        token_user_cache.clear()
+        get_emotion_cache().clear_memory()
+        self.user = User.objects.create_user('async', 'async', 'password')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.user).key}'}
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post('/server/get-calendar/')
+
+    @mock.patch('server.inference_client.InferenceClient.post', side_effect=AssertionError('sync client used'))
+    @mock.patch('server.async_inference.AsyncInferenceClient.post', new_callable=mock.AsyncMock,
+                return_value={'emotion': 'neutral'})
+    async def test_emotion_analyze_large(self, apost, post):
+        url = '/server/emotion-analyze-large/'
+        response = await self.async_client.post(url, {'sentence': '좋은 하루'}, content_type='application/json',
+                                                headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['emotion_large'], 'joy')
+        self.assertEqual(apost.call_count, 1)
+        calendar = await Calendar.objects.aget(user=self.user)
+        self.assertEqual((calendar.emotion_large, calendar.sentence), ('joy', '좋은 하루'))
+
+        # 인증 실패는 기존 DRF 뷰가 응답
+        response = await self.async_client.post(url, {'sentence': '좋은 하루'}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_report_revalidation_and_cache_hit(self):
+        url = '/server/walk-monthly-report/2024/1/'
+        first = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(first.status_code, 200)
+        with mock.patch('server.async_views._delegate', side_effect=AssertionError('DRF view called')):
+            cached = await self.async_client.get(url, headers=self.headers)
+            self.assertEqual(cached.json(), first.json())
+            self.assertEqual(cached['ETag'], first['ETag'])
+            revalidated = await self.async_client.get(url, headers={**self.headers, 'If-None-Match': first['ETag']})
+            self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(cache_stats.snapshot()['hits'], 1)
+
+
+class LoadDataTest(TestCase):
+    # 부하 테스트 데이터는 집계/통계와 맞아야 하고, 벤치마크는 server/urls.py의 모든 경로를 오류 없이 호출해야 함
+    def test_generated_history_and_benchmark(self):
+        users = create_users('lt', 3, 'password')
+        counts = generate_history(users, date(2024, 1, 1), date(2024, 6, 30), random.Random(1))
+        self.assertGreater(counts['walks'], 0)
+        self.assertEqual(find_rollup_mismatches([user.pk for user in users]), [])
+        self.assertEqual(reconcile_user_stats([user.pk for user in users]), 0)
+        self.assertEqual(Token.objects.filter(user__in=users).count(), 3)
+
+        output = tempfile.NamedTemporaryFile(suffix='.json', delete=False).name
+        call_command('bench_endpoints', prefix='lt', iterations=2, warmup=0, output=output, stdout=StringIO())
+        with open(output) as f:
+            endpoints = json.load(f)['endpoints']
+        self.assertEqual({result['url_name'] for result in endpoints.values()},
+                         {pattern.name for pattern in server_urls.urlpatterns})
+        self.assertEqual({label: result['errors'] for label, result in endpoints.items() if result['errors']}, {})
+        # 벤치마크 요청으로 바뀐 데이터는 되돌림
+        self.assertEqual(WalkHistory.objects.filter(calendar__user__in=users).count(), counts['walks'])
@@ -17,20 +17,48 @@ urlpatterns = [
     
     # 사용자의 text에 대하여 감정 분석, 대분류 감정 저장
     path('emotion-analyze-large/', views.emotion_analyze_large, name='emotion-analyze-large'),
+    # 비동기 감정 분석 작업 상태 조회
+    path('emotion-job/<int:job_id>/', views.emotion_job_status, name='emotion-job-status'),
+    # 감정 분석 결과 캐시 통계 (관리자 전용)
+    path('emotion-cache-stats/', views.emotion_cache_stats, name='emotion-cache-stats'),
+    # 읽기 API 응답 캐시 통계 (관리자 전용)
+    path('response-cache-stats/', views.response_cache_stats, name='response-cache-stats'),
+    # 감정 분석 모델 서버 클라이언트 통계 (관리자 전용)
+    path('emotion-client-stats/', views.emotion_client_stats, name='emotion-client-stats'),
+    # 저장된 요청 프로파일 목록, 시간이 많이 걸린 함수 (관리자 전용)
+    path('profiles/', views.profile_list, name='profile-list'),
     # 소분류 감정 입력 저장
     path('emotion-save-small/', views.emotion_save_small, name='emotion-save-small'),
     # 감정 기록 결과 저장 및 불러오기, 오늘 감정 분석 여부 판단
     path('emotion-list-create/', views.emotion_list_create, name='emotion-list-create'),
+    # 기간 감정 기록 조회 (?start=YYYY-MM-DD&end=YYYY-MM-DD, 달력 화면)
+    path('emotion-list-range/', views.emotion_list_range, name='emotion-list-range'),
     
     # 산책 과정(시작 및 종료, 간편보고서, 만족도 저장)
     path('walk-start/', views.walk_start, name='walk-start'),
+    # 산책 중 키넥트 안정도 샘플 업로드
+    path('walk-kinect/<int:walk_id>/', views.walk_kinect_upload, name='walk-kinect-upload'),
+    # 산책 경로(GPS 좌표) 업로드 및 조회
+    path('walk-course/<int:walk_id>/', views.walk_course, name='walk-course'),
     path('walk-end/<int:walk_id>/', views.walk_end, name='walk-end'),
     path('walk-simple-report/<int:pk>/', views.walk_simple_report, name='walk-simple-report'),
     path('walk-satisfy-update/<int:pk>/', views.walk_satisfy_update, name='walk-satisfy-update'),
     
+    # 오프라인 동기화 (쌓아 둔 산책/SRI/감정 기록 일괄 반영)
+    path('sync/', views.sync, name='sync'),
+
+    # 리더보드(상위 N명, 내 순위와 이웃)
+    path('leaderboard/', views.leaderboard_top, name='leaderboard-top'),
+    path('leaderboard/me/', views.leaderboard_me, name='leaderboard-me'),
+    path('walk-history/', views.walk_history_list, name='walk-history'),
+    path('sri-history/', views.sri_history_list, name='sri-history'),
+
     # 산책 보고서(1개 조회, 월별 조회 )
     path('walk-once-report/<int:pk>/', views.walk_once_report, name='walk-once-report'),
     path('walk-monthly-report/<int:year>/<int:month>/', views.walk_monthly_report, name='walk-monthly-report'),
+    # 기간 보고서(시작 연/월 ~ 끝 연/월의 월별 산책 집계)
+    path('walk-range-report/<int:start_year>/<int:start_month>/<int:end_year>/<int:end_month>/',
+         views.walk_range_report, name='walk-range-report'),
     
 
 
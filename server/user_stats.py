@@ -0,0 +1,160 @@
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Case, Count, F, Max, Q, QuerySet, Value, When
+from django.db.models.functions import Mod
+from django.db.models.lookups import Exact
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import SRI, Calendar, User, UserStats, WalkHistory
+
+
+def compute_user_stats(user_ids):
+    # 원본 테이블(WalkHistory, SRI)에서 사용자별 통계 계산
+    # 반환값: {user_id: UserStats(저장 안 됨)}
+    user_ids = User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)
+    stats = {user_id: UserStats(user_id=user_id) for user_id in user_ids}
+
+    walks = WalkHistory.objects.filter(calendar__user_id__in=stats.keys())
+    walk_rows = walks.values('calendar__user_id').annotate(
+        walk_count=Count('id'),
+        finished_walk_count=Count('id', filter=Q(end_time__isnull=False)),
+    ).order_by()
+    for row in walk_rows:
+        stats[row['calendar__user_id']].walk_count = row['walk_count']
+        stats[row['calendar__user_id']].finished_walk_count = row['finished_walk_count']
+
+    sri_rows = SRI.objects.filter(user_id__in=stats.keys()).values('user_id').annotate(
+        last_sri_date=Max('sri_date')).order_by()
+    for row in sri_rows:
+        stats[row['user_id']].last_sri_date = row['last_sri_date']
+    return stats
+
+
+def build_user_stats(user_id):
+    # 통계 행이 없는 사용자는 원본 테이블로 계산해서 생성
+    stats = compute_user_stats([user_id]).get(user_id)
+    if stats is None:
+        return None
+    try:
+        with transaction.atomic():
+            stats.save(force_insert=True)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 만든 경우
+        stats = UserStats.objects.get(pk=user_id)
+    return stats
+
+
+def get_user_stats(user_id):
+    try:
+        return UserStats.objects.get(pk=user_id)
+    except UserStats.DoesNotExist:
+        return build_user_stats(user_id)
+
+
+def is_sri_needed(user_id, today=None):
+    # API(sri_list_create)와 admin이 함께 쓰는 SRI 검사 필요 여부 판단 (통계 행 1개 조회)
+    stats = get_user_stats(user_id)
+    return stats.sri_needed(today or timezone.now().date())
+
+
+def sri_needed_expression(today, prefix=''):
+    # UserStats.sri_needed와 같은 규칙의 DB 식 (목록 조회 쿼리에서 함께 계산할 때 사용)
+    # prefix: 통계 행까지의 관계 경로 ex) 'user__stats__', 통계 행이 없으면 NULL
+    walk_count = F(f'{prefix}walk_count')
+    return Case(
+        When(**{f'{prefix}last_sri_date__date': today}, then=Value(False)),
+        When(Exact(walk_count, 0), then=Value(True)),
+        When(Exact(Mod(walk_count, Value(5)), 0), then=Value(True)),
+        When(**{f'{prefix}walk_count__isnull': False}, then=Value(False)),
+        default=Value(None),
+        output_field=BooleanField(null=True),
+    )
+
+
+def _bump(user_id, **deltas):
+    updated = UserStats.objects.filter(pk=user_id).update(**{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated:
+        # 통계 행이 아직 없으면 원본 테이블로 계산 (방금 저장한 변경도 포함됨)
+        build_user_stats(user_id)
+
+
+def record_walk_started(user_id):
+    _bump(user_id, walk_count=1)
+
+
+def record_walk_finished(user_id):
+    _bump(user_id, finished_walk_count=1)
+
+
+def record_sri(user_id, sri_date):
+    updated = UserStats.objects.filter(pk=user_id).update(last_sri_date=sri_date)
+    if not updated:
+        build_user_stats(user_id)
+
+
+def record_synced(user_id, walks_started=0, walks_finished=0, last_sri_date=None):
+    # 오프라인 동기화로 한꺼번에 들어온 기록 반영 (SRI 날짜는 더 최근일 때만 갱신)
+    stats = UserStats.objects.filter(pk=user_id)
+    updated = stats.update(walk_count=F('walk_count') + walks_started,
+                           finished_walk_count=F('finished_walk_count') + walks_finished)
+    if not updated:
+        build_user_stats(user_id)
+    elif last_sri_date is not None:
+        stats.filter(Q(last_sri_date__isnull=True) | Q(last_sri_date__lt=last_sri_date)).update(
+            last_sri_date=last_sri_date)
+
+
+@transaction.atomic
+def reconcile_user_stats(user_ids):
+    # 통계 테이블을 원본 테이블 기준으로 다시 계산, 값이 달랐던(또는 없던) 사용자 수 반환
+    computed = compute_user_stats(user_ids)
+    stored = {stats.pk: stats for stats in UserStats.objects.filter(pk__in=computed.keys())}
+    fields = ['walk_count', 'finished_walk_count', 'last_sri_date']
+    changed = []
+    created = []
+    for user_id, stats in computed.items():
+        current = stored.get(user_id)
+        if current is None:
+            created.append(stats)
+        elif any(getattr(current, field) != getattr(stats, field) for field in fields):
+            changed.append(stats)
+    UserStats.objects.bulk_create(created, batch_size=1000)
+    UserStats.objects.bulk_update(changed, fields, batch_size=1000)
+    return len(created) + len(changed)
+
+
+def _deleted_walks(origin):
+    # 삭제를 시작한 객체(origin)와 함께 지워지는 산책 기록, 사용자 삭제는 통계 행도 함께 지워지므로 None
+    if isinstance(origin, WalkHistory):
+        return WalkHistory.objects.filter(pk=origin.pk)
+    if isinstance(origin, Calendar):
+        return WalkHistory.objects.filter(calendar_id=origin.pk)
+    if isinstance(origin, QuerySet) and origin.model is WalkHistory:
+        return origin
+    if isinstance(origin, QuerySet) and origin.model is Calendar:
+        return WalkHistory.objects.filter(calendar__in=origin)
+    return None
+
+
+@receiver(pre_delete, sender=WalkHistory)
+@receiver(pre_delete, sender=Calendar)
+def forget_deleted_walks(sender, instance, origin=None, **kwargs):
+    # admin 삭제나 Calendar 삭제로 산책 기록이 지워지는 경우
+    # 삭제 1번(origin)마다 처음 한 번만 사용자별로 모아서 반영 (기록마다 UPDATE 하지 않음)
+    origin = instance if origin is None else origin
+    if getattr(origin, '_user_stats_forgotten', False):
+        return
+    origin._user_stats_forgotten = True
+    walks = _deleted_walks(origin)
+    if walks is None:
+        return
+    rows = walks.values('calendar__user_id').annotate(
+        walk_count=Count('id'),
+        finished_walk_count=Count('id', filter=Q(end_time__isnull=False)),
+    ).order_by()
+    for row in rows:
+        UserStats.objects.filter(pk=row['calendar__user_id']).update(
+            walk_count=F('walk_count') - row['walk_count'],
+            finished_walk_count=F('finished_walk_count') - row['finished_walk_count'],
+        )
@@ -0,0 +1,141 @@
+from calendar import timegm
+from functools import wraps
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import SRI, Calendar, User, UserVersion, WalkHistory
+from .signals import points_granted
+
+# walk: WalkHistory, calendar: Calendar(감정, 산책 완료 여부), sri: SRI, profile: 포인트/레벨/닉네임
+RESOURCES = ['walk', 'calendar', 'sri', 'profile']
+
+
+def bump_versions(resources, **filters):
+    # 조건에 맞는 사용자들의 리소스 버전을 1씩 올림 (UPDATE 한 번)
+    # ex) bump_versions(['walk'], user_id=1), bump_versions(['walk'], user__calendar=calendar_id)
+    # 버전 행이 없는 사용자는 건너뜀 (보고서에 ETag를 붙이지 않으므로 항상 새로 계산)
+    now = timezone.now()
+    changes = {}
+    for resource in resources:
+        changes[f'{resource}_version'] = F(f'{resource}_version') + 1
+        changes[f'{resource}_modified'] = now
+    return UserVersion.objects.filter(**filters).update(**changes)
+
+
+def _versions_query(user, resources, owner, view_kwargs):
+    # 반환값: (요청 안에서 memo에 쓰는 key, 버전 행 조회 QuerySet)
+    lookup = owner(**(view_kwargs or {})) if owner else {'user_id': user.pk}
+    fields = ['user_id']
+    for resource in resources:
+        fields += [f'{resource}_version', f'{resource}_modified']
+    memo_key = (tuple(resources), tuple(sorted(lookup.items())))
+    return memo_key, UserVersion.objects.filter(**lookup).values(*fields)
+
+
+def _versions_memo(request):
+    # DRF Request와 그 안의 HttpRequest(비동기 뷰에서 넘긴 요청)가 같은 memo를 쓰도록 HttpRequest에 저장
+    return getattr(request, '_request', request).__dict__.setdefault('_resource_versions', {})
+
+
+def load_versions(request, resources, owner=None, view_kwargs=None):
+    # 뷰가 의존하는 리소스 버전 조회 (요청마다 한 번만 조회해서 conditional_report, cached_response가 함께 사용)
+    # owner: 뷰 인자로 데이터 주인을 찾는 조건 (없으면 요청한 사용자), 반환값: 버전 행(dict) 또는 None
+    memo_key, query = _versions_query(request.user, resources, owner, view_kwargs)
+    memo = _versions_memo(request)
+    if memo_key not in memo:
+        memo[memo_key] = query.first()
+    return memo[memo_key]
+
+
+async def aload_versions(request, user, resources, owner=None, view_kwargs=None):
+    # load_versions의 비동기 버전 (ASGI 뷰는 request.user 대신 토큰으로 확인한 사용자를 넘김)
+    memo_key, query = _versions_query(user, resources, owner, view_kwargs)
+    memo = _versions_memo(request)
+    if memo_key not in memo:
+        memo[memo_key] = await query.afirst()
+    return memo[memo_key]
+
+
+def version_validators(row, resources):
+    # 버전 행 -> (ETag, Last-Modified timestamp 또는 None)
+    versions = '.'.join(str(row[f'{resource}_version']) for resource in resources)
+    etag = f'"{row["user_id"]}-{versions}"'
+    modified = [row[f'{resource}_modified'] for resource in resources if row[f'{resource}_modified']]
+    if not modified:
+        return etag, None
+    # USE_TZ=False이면 *_modified는 TIME_ZONE(Asia/Seoul) 기준 naive 시각이므로 UTC로 바꾼 뒤 timestamp 계산
+    latest = max(modified)
+    if timezone.is_naive(latest):
+        latest = timezone.make_aware(latest)
+    return etag, timegm(latest.utctimetuple())
+
+
+def set_version_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # 브라우저/프록시가 재검증 없이 재사용하지 않도록 함
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_report(*resources, owner=None):
+    # 보고서 GET 뷰에 ETag/Last-Modified를 붙이고, 클라이언트 캐시가 최신이면 보고서 쿼리 없이 304 반환
+    # resources: 응답 내용이 의존하는 리소스, owner: 뷰 인자로 데이터 주인을 찾는 조건 (없으면 요청한 사용자)
+    # ex) @conditional_report('walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            row = load_versions(request, resources, owner, kwargs)
+            if row is None:
+                # 버전 행이 없거나 대상 데이터가 없으면 평소처럼 처리 (뷰에서 404 등)
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = version_validators(row, resources)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return set_version_headers(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        UserVersion.objects.get_or_create(user=instance)
+    elif update_fields is None or set(update_fields) != {'last_login'}:
+        # 로그인 시각만 바뀐 경우는 보고서 내용과 무관
+        bump_versions(['profile'], user_id=instance.pk)
+
+
+@receiver(points_granted)
+def points_changed(sender, user_ids, **kwargs):
+    bump_versions(['profile'], user_id__in=user_ids)
+
+
+@receiver([post_save, post_delete], sender=WalkHistory)
+def walk_changed(sender, instance, **kwargs):
+    bump_versions(['walk'], user__calendar=instance.calendar_id)
+
+
+@receiver([post_save, post_delete], sender=Calendar)
+def calendar_changed(sender, instance, **kwargs):
+    if instance.user_id:
+        bump_versions(['calendar'], user_id=instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=SRI)
+def sri_changed(sender, instance, **kwargs):
+    bump_versions(['sri'], user_id=instance.user_id)
@@ -1,7 +1,9 @@
 import math
-from datetime import datetime
+from datetime import MAXYEAR, MINYEAR, datetime
 
-from django.db.models import Avg, Sum
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Prefetch, Sum
 from django.shortcuts import render
 from django.middleware.csrf import get_token
 from rest_framework import status
@@ -9,9 +11,27 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import authenticate, login, logout
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import IsAuthenticated
-from .serializers import WalkHistorySerializer, WalkHistoryEndSerializer, WalkReportSerializer, CalendarSerializer, UserSerializer, SRISerializer, EmotionSerializer
-from .models import WalkHistory, Calendar, User, SRI
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from .serializers import WalkHistorySerializer, WalkHistoryEndSerializer, CalendarSerializer, UserSerializer, SRISerializer
+from .serializers import EMOTION_ROW_FIELDS, WALK_REPORT_ROW_FIELDS, WALK_SUMMARY_ROW_FIELDS, emotion_row, walk_report_row, walk_summary_row
+from .models import WalkHistory, Calendar, User, SRI, MonthlyWalkRollup, EmotionJob, KinectStream, WalkCourse
+from .rollups import apply_walk_delta, range_walk_summaries, walk_totals
+from .emotion import predict_emotion, save_emotion_large
+from .emotion_cache import get_emotion_cache
+from .emotion_jobs import enqueue_emotion_job
+from .inference_client import CircuitOpenError, get_inference_client
+from .leveling import walk_end_points
+from .authentication import token_user_cache
+from .kinect import MAX_SEQ as KINECT_MAX_SEQ, append_chunk, summarize
+from .versions import conditional_report
+from .sql_stats import query_budget
+from .profiling import SORT_KEYS, hot_functions, list_profiles
+from .leaderboard import LEADERBOARD_FIELDS, neighbours, top_page, with_ranks
+from .history import parse_cursor, sri_history_page, walk_history_page
+from .response_cache import cache_stats, cached_response, get_response_cache
+from .sync import MAX_RECORDS as SYNC_MAX_RECORDS, sync_records
+from .course import decode_course, parse_course, parse_points, save_course, summarize_course
+from .user_stats import is_sri_needed, record_sri, record_walk_finished, record_walk_started
 from django.utils import timezone
 from statistics import mean
 from django.db.models import Count
@@ -49,6 +69,7 @@ def user_login(request):
 @permission_classes([IsAuthenticated])  # 인증된 사용자만 접근 가능
 def user_logout(request):
     if request.method == 'POST':
+        token_user_cache.invalidate_token(request.user.auth_token.key)
         request.user.auth_token.delete()
         return Response({"message": "successfully"}, status=status.HTTP_200_OK)
 
@@ -59,6 +80,7 @@ def user_delete(request):
     if request.method == 'DELETE':
         user = request.user
         if user.is_authenticated:
+            token_user_cache.invalidate_user(user.pk)
             user.auth_token.delete()
             user.delete()
             return Response({"message": "successfully"}, status=status.HTTP_200_OK)
@@ -70,22 +92,14 @@ def user_delete(request):
 @permission_classes([IsAuthenticated])
 def get_calendar(request):
     # 오늘 날짜를 자동으로 가져옴
-    today = timezone.now()
+    today = timezone.now().date()
     year = today.year
     month = today.month
     day = today.day
 
-    # 사용자의 ID를 가져옴
-    user_id = request.user.id
-
     try:
         # 오늘 날짜에 해당하는 Calendar 객체를 가져옴. 존재하지 않으면 새로 생성.
-        calendar, created = Calendar.objects.get_or_create(
-            year=year,
-            month=month,
-            day=day,
-            user_id=user_id,
-        )
+        calendar, created = Calendar.objects.get_or_create_for_date(request.user, today)
 
         # 캘린더가 새로 생성된 경우만 감정 데이터를 리셋
         if created:
@@ -114,26 +128,14 @@ def get_calendar(request):
 
 
 # SRI 점수 POST, GET
+# 쿼리 예산: 토큰 인증 1 + 통계 행이 없는 사용자의 첫 요청에서 통계 행 생성 6
+@query_budget(GET=8, POST=12)
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def sri_list_create(request):
     if request.method == 'GET':
-        sri_scores = SRI.objects.filter(user=request.user)
-        serializer = SRISerializer(sri_scores, many=True)
-        #return Response(serializer.data)
-        #지금까지의 산책 횟수 계산
-        walk_count = WalkHistory.objects.filter(calendar__user=request.user).count()
-
-        #SRI 검사를 해야 할지 여부 판단
-        sri_needed = (walk_count == 0) or (walk_count % 5 == 0)
-
-        #오늘 SRI 검사를 했는지 여부 확인
-        today = timezone.now().date()
-        #today_sri = SRI.objects.filter(user=request.user, sri_date__date=today).exists()
-        today_sri_done = SRI.objects.filter(user=request.user, sri_date__date=today).exists()
-
-        if today_sri_done:
-            sri_needed = False
+        # 산책 횟수(5회마다 검사)와 오늘 SRI 검사 여부로 판단 (사용자 통계 1행 조회)
+        sri_needed = is_sri_needed(request.user.id)
         response_data = {
             'message': 'successfully',
             'sri_needed': sri_needed,
@@ -145,7 +147,9 @@ def sri_list_create(request):
     elif request.method == 'POST':
         serializer = SRISerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user, sri_date=timezone.now())
+            with transaction.atomic():
+                sri = serializer.save(user=request.user, sri_date=timezone.now())
+                record_sri(request.user.id, sri.sri_date)
             #return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response({'message': 'successfully'}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -161,39 +165,197 @@ def emotion_analyze_large(request):
     if not sentence:
         return Response({"message": "Sentence is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Colab 모델을 사용하여 감정 분석 수행
-    colab_url = "https://newthangcolab.ngrok.app/predict"  # Colab 실행하면 Colab과 자동으로 연결되도록 하는 endpoint
-    try:
-        response = requests.post(colab_url, json={'text': sentence})
-        response_data = response.json()
-        emotion_large = response_data.get('emotion', 'Unknown')
-        
-        # 감정이 neutral일 경우 joy로 치환
-        if emotion_large == 'neutral':
-            emotion_large = 'joy'
-    except requests.exceptions.RequestException as e:
-        return Response({"message": f"Error contacting Colab server: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
     # 오늘 날짜의 Calendar ID 조회
     user = request.user
     today = timezone.now().date()
     try:
-        calendar = Calendar.objects.get(user=user, year=today.year, month=today.month, day=today.day)
+        calendar = Calendar.objects.get(user=user, date=today)
     except Calendar.DoesNotExist:
         return Response({"message": "Calendar entry does not exist for today."}, status=status.HTTP_404_NOT_FOUND)
 
+    # job 모드: 문장만 저장하고 감정 분석은 워커가 처리 (결과는 emotion-job/<job_id>/ 로 조회)
+    mode = request.data.get('mode', settings.EMOTION_ANALYZE_DEFAULT_MODE)
+    if mode == 'job':
+        job = enqueue_emotion_job(calendar, sentence)
+        return Response({'message': 'accepted', 'job_id': job.id, 'status': job.status},
+                        status=status.HTTP_202_ACCEPTED)
+
+    # Colab 모델을 사용하여 감정 분석 수행
+    try:
+        emotion_large = predict_emotion(sentence)
+    except CircuitOpenError:
+        # 모델 서버 장애 중에는 기다리지 않고 작업으로 넘겨서 나중에 분석
+        job = enqueue_emotion_job(calendar, sentence)
+        return Response({'message': 'accepted', 'job_id': job.id, 'status': job.status, 'degraded': True},
+                        status=status.HTTP_202_ACCEPTED)
+    except requests.exceptions.RequestException as e:
+        return Response({"message": f"Error contacting Colab server: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     # 감정 결과와 질문 저장
     #calendar.question = question
-    calendar.emotion_large = emotion_large
-    calendar.sentence = sentence
-    calendar.save()
+    save_emotion_large(calendar, emotion_large, sentence)
 
     #return Response({"calendar_id": calendar.id, "emotion_large": emotion_large}, status=status.HTTP_200_OK)
     # 성공 메시지뿐만 아니라 감정분석이 잘되어 대분류 감정을 저장했는지 확인
     return Response({'message': 'successfully', "emotion_large": emotion_large}, status=status.HTTP_200_OK)
 
 
+# 비동기 감정 분석 작업 상태 조회
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def emotion_job_status(request, job_id):
+    try:
+        job = EmotionJob.objects.get(pk=job_id, user=request.user)
+    except EmotionJob.DoesNotExist:
+        return Response({"message": f"EmotionJob with id {job_id} does not exist."}, status=status.HTTP_404_NOT_FOUND)
+
+    response_data = {
+        'message': 'successfully',
+        'job_id': job.id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'emotion_large': job.emotion_large,
+    }
+    if job.status == EmotionJob.FAILED:
+        response_data['error'] = job.error
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+# 감정 분석 결과 캐시 적중률 조회 (관리자 전용, 요청을 처리한 워커 프로세스 기준)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def emotion_cache_stats(request):
+    return Response({'message': 'successfully', **get_emotion_cache().stats()}, status=status.HTTP_200_OK)
+
+
+# 읽기 API 응답 캐시 카운터 조회 (관리자 전용, 요청을 처리한 워커 프로세스 기준)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    backend = type(get_response_cache()).__name__
+    return Response({'message': 'successfully', 'backend': backend, **cache_stats.snapshot()}, status=status.HTTP_200_OK)
+
+
+# 감정 분석 모델 서버 클라이언트 상태 조회 (관리자 전용, 요청을 처리한 워커 프로세스 기준)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def emotion_client_stats(request):
+    return Response({'message': 'successfully', **get_inference_client().metrics()}, status=status.HTTP_200_OK)
+
+
+# 리더보드 상위 N명 (누적 포인트 순, ?limit=20&cursor=<이전 페이지의 next_cursor>)
+@query_budget(4)  # 토큰 인증 1 + 목록 1 + 순위 1~2
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def leaderboard_top(request):
+    try:
+        limit = int(request.query_params.get('limit', 20))
+        cursor = request.query_params.get('cursor')
+        after = tuple(int(value) for value in cursor.split(':')) if cursor else None
+    except ValueError:
+        return Response({'message': 'Invalid limit or cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= settings.LEADERBOARD_PAGE_MAX_SIZE or (after is not None and len(after) != 2):
+        return Response({'message': 'Invalid limit or cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    leaders = top_page(limit, after)
+    last = leaders[-1] if len(leaders) == limit else None
+    return Response({
+        'message': 'successfully',
+        'leaders': leaders,
+        'next_cursor': f"{last['total_points']}:{last['id']}" if last else None,
+    }, status=status.HTTP_200_OK)
+
+
+# 내 리더보드 순위와 바로 위/아래 사용자 (?neighbours=5)
+@query_budget(6)  # 토큰 인증 1 + 내 행 1 + 위 1 + 아래 1 + 순위 1~2
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def leaderboard_me(request):
+    try:
+        count = int(request.query_params.get('neighbours', 5))
+    except ValueError:
+        count = -1
+    if not 0 <= count <= settings.LEADERBOARD_NEIGHBOURS_MAX:
+        return Response({'message': f'neighbours must be 0 to {settings.LEADERBOARD_NEIGHBOURS_MAX}.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # request.user는 worker별 토큰 캐시의 사용자라 다른 worker에서 지급한 포인트가 늦게 반영되므로 내 행은 DB에서 읽음
+    me = User.objects.filter(pk=request.user.pk).values(*LEADERBOARD_FIELDS).get()
+    above, below = neighbours(me['id'], me['total_points'], count) if count else ([], [])
+    ranked = with_ranks(above + [me] + below)  # 순위는 한 번에 조회
+    above, me, below = ranked[:len(above)], ranked[len(above)], ranked[len(above) + 1:]
+    return Response({
+        'message': 'successfully',
+        'rank': me['rank'],
+        'me': me,
+        'above': above,
+        'below': below,
+    }, status=status.HTTP_200_OK)
+
+
+def _history_params(request):
+    # 기록 목록 공통 파라미터 ?limit=20&cursor=<이전 페이지의 next_cursor>&start=YYYY-MM-DD&end=YYYY-MM-DD
+    # (limit, after, start, end) 또는 잘못된 값이면 ValueError
+    limit = int(request.query_params.get('limit', 20))
+    if not 1 <= limit <= settings.HISTORY_PAGE_MAX_SIZE:
+        raise ValueError
+    cursor = request.query_params.get('cursor')
+    after = parse_cursor(cursor) if cursor else None
+    start, end = (request.query_params.get(key) for key in ('start', 'end'))
+    start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+    end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    return limit, after, start, end
+
+
+def _history_response(request, key, page):
+    try:
+        params = _history_params(request)
+    except ValueError:
+        return Response({'message': f'Invalid limit(1 to {settings.HISTORY_PAGE_MAX_SIZE}), cursor, '
+                                    "or start/end ('YYYY-MM-DD')."}, status=status.HTTP_400_BAD_REQUEST)
+    rows, next_cursor = page(request.user, *params)
+    return Response({'message': 'successfully', key: rows, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+
+
+# 전체 산책 기록 목록 (최근 산책부터, keyset 페이지라 오래된 기록까지 넘겨도 페이지마다 비용이 같음)
+@query_budget(2)  # 토큰 인증 1 + 목록 1
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def walk_history_list(request):
+    return _history_response(request, 'walks', walk_history_page)
+
+
+# 전체 SRI 검사 기록 목록 (최근 검사부터, keyset 페이지)
+@query_budget(2)  # 토큰 인증 1 + 목록 1
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sri_history_list(request):
+    return _history_response(request, 'sris', sri_history_page)
+
+
+# 저장된 요청 프로파일 목록과 시간이 많이 걸린 함수 (관리자 전용, 이 서버에 저장된 프로파일 기준)
+# ?view=walk_monthly_report&user=<id>&sort=tottime|cumtime|calls&limit=20
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    sort = request.query_params.get('sort', 'tottime')
+    if sort not in SORT_KEYS:
+        return Response({'message': f'sort must be one of {", ".join(SORT_KEYS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        user_id = int(request.query_params['user']) if 'user' in request.query_params else None
+        limit = min(int(request.query_params.get('limit', 20)), 200)
+    except ValueError:
+        return Response({'message': 'user and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    profiles = list_profiles(request.query_params.get('view'), user_id)
+    return Response({
+        'message': 'successfully',
+        'count': len(profiles),
+        'profiles': profiles[:limit],
+        'hot_functions': hot_functions(profiles, limit=limit, sort=sort),
+    }, status=status.HTTP_200_OK)
+
+
 # 소분류 감정 저장(사용자가 대분류 감정을 토대로 세부 감정 직접 선택)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -201,7 +363,7 @@ def emotion_save_small(request):
     user = request.user
     today = timezone.now().date()
     try:
-        calendar = Calendar.objects.get(user=user, year=today.year, month=today.month, day=today.day)
+        calendar = Calendar.objects.get(user=user, date=today)
     except Calendar.DoesNotExist:
         return Response({"message": "Calendar entry does not exist for today."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -217,6 +379,8 @@ def emotion_save_small(request):
 # 감정 기록 결과 저장 및 불러오기, 오늘 감정 분석 여부 판단
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_report('calendar')
+@cached_response('calendar')
 def emotion_list_create(request):
     user = request.user
 
@@ -226,19 +390,16 @@ def emotion_list_create(request):
     if not today_date_str:
         return Response({"message": "todayDate parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-    # 날짜 문자열을 파싱하여 년도, 월, 일로 변환
+    # 날짜 문자열을 파싱
     try:
         date_obj = datetime.strptime(today_date_str, '%Y-%m-%d').date()
-        year = date_obj.year
-        month = date_obj.month
-        day = date_obj.day
     except ValueError:
         return Response({"message": "Invalid todayDate format. Expected 'YYYY-MM-DD'."}, status=status.HTTP_400_BAD_REQUEST)
 
     # 해당 날짜에 해당하는 감정 분석 기록을 가져옴
     try:
-        calendar_record = Calendar.objects.filter(user=user, year=year, month=month, day=day).first()
-        if not calendar_record or not calendar_record.emotion_large:
+        calendar_record = Calendar.objects.filter(user=user, date=date_obj).values(*EMOTION_ROW_FIELDS).first()
+        if not calendar_record or not calendar_record['emotion_large']:
             return Response({
                 'message': 'No emotion data found for the specified date.',
                 'today_emotion_done': False,
@@ -253,22 +414,8 @@ def emotion_list_create(request):
         # 추가적인 예외를 잡아내기 위한 블록
         return Response({"message": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    # 감정 데이터가 존재할 경우, 직렬화
-    serializer = EmotionSerializer(calendar_record)
-    emotions_data = serializer.data
-
-    print(f"Serialized emotions data: {emotions_data}")
-
-    # 감정 데이터가 딕셔너리인지 확인
-    if isinstance(emotions_data, dict):
-        # 감정 데이터에 날짜 정보 추가
-        emotions_data['calendar_id'] = emotions_data.get('id')  # 'id'를 'calendar_id'로 복사
-        emotions_data['date'] = f"{year}-{month:02d}-{day:02d}"  # 날짜를 'YYYY-MM-DD' 형식으로 추가
-        del emotions_data['id']  # 'id' 키를 제거
-    else:
-        return Response({"message": "Invalid data format from serializer."},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+    # 감정 데이터가 존재할 경우, 조회한 행을 바로 응답 형식으로 변환 (calendar_id, date 포함)
+    emotions_data = emotion_row(calendar_record)
 
     response_data = {
         'message': 'successfully',
@@ -278,6 +425,44 @@ def emotion_list_create(request):
 
     return Response(response_data, status=status.HTTP_200_OK)
 
+
+EMOTION_RANGE_MAX_DAYS = 62  # 기간 감정 기록 조회로 한 번에 조회할 수 있는 최대 일수
+
+
+# 기간(start~end, YYYY-MM-DD) 감정 기록 조회 (달력 화면: emotion_list_create를 날짜마다 호출하지 않음)
+# Calendar (user, date) 인덱스 범위 조회 1개 + 그 날들의 산책 기록 ID 조회 1개, 행에서 바로 응답 구성
+@query_budget(4)  # 토큰 인증 1 + 버전 1 + 감정 기록 1 + 산책 기록 ID 1
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_report('calendar', 'walk')
+@cached_response('calendar', 'walk')
+def emotion_list_range(request):
+    try:
+        start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return Response({"message": "start and end are required in 'YYYY-MM-DD' format."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not 0 <= (end - start).days < EMOTION_RANGE_MAX_DAYS:
+        return Response({"message": f"The range must be 1 to {EMOTION_RANGE_MAX_DAYS} days."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    records = list(Calendar.objects.filter(
+        user=request.user, date__range=(start, end), emotion_large__isnull=False,
+    ).order_by('date').values(*EMOTION_ROW_FIELDS))
+
+    # 날짜별 산책 기록 ID (월별 보고서와 같은 순서: 최근 산책부터)
+    walk_ids = {}
+    if records:
+        walks = WalkHistory.objects.filter(calendar_id__in=[record['id'] for record in records]).order_by(
+            '-start_time').values_list('calendar_id', 'id')
+        for calendar_id, walk_id in walks:
+            walk_ids.setdefault(calendar_id, []).append(walk_id)
+
+    emotions = [{**emotion_row(record), 'walkhistory_id': walk_ids.get(record['id'], [])} for record in records]
+
+    return Response({'message': 'successfully', 'emotions': emotions}, status=status.HTTP_200_OK)
+
 #산책 시작
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -286,9 +471,7 @@ def walk_start(request):
     user = request.user
     # 오늘 날짜 기준으로 Calendar객체 가져오거나 생성
     today = timezone.now().date()
-    calendar, created = Calendar.objects.get_or_create(
-        year=today.year, month=today.month, day=today.day, user=user
-    )
+    calendar, created = Calendar.objects.get_or_create_for_date(user, today)
     data = request.data.copy()
 
     # Playtime 값을 받아옴
@@ -305,7 +488,9 @@ def walk_start(request):
     #새 산책기록 생성
     serializer = WalkHistorySerializer(data=data)
     if serializer.is_valid():
-        walk_history = serializer.save()
+        with transaction.atomic():
+            walk_history = serializer.save()
+            record_walk_started(user.id)
         #응답 데이터에 새로 생성된 산책 기록ID 포함
         response_data = serializer.data
         response_data['id'] = walk_history.id
@@ -325,71 +510,139 @@ def walk_end(request, walk_id):
     data = request.data.copy()
     data['end_time'] = timezone.now()
 
-    # 키넥트 데이터 처리
+    # 키넥트 데이터 처리 (값을 직접 보내지 않았으면 산책 중 업로드된 샘플의 평균 사용)
     kinect_data = request.data.get('kinect_data')
     if not kinect_data:
-        return Response({"message": "No Kinect data provided."}, status=status.HTTP_400_BAD_REQUEST)
-
-    # WalkHistory의 stable_score 업데이트
-    walk_history.stable_score = kinect_data
-
-    # WalkHistory 객체 업데이트 - 시리얼라이저 설정
-    serializer = WalkHistorySerializer(walk_history, data=data, partial=True)
-    if serializer.is_valid():
+        stream = KinectStream.objects.filter(walk=walk_history, sample_count__gt=0).first()
+        if stream is None:
+            return Response({"message": "No Kinect data provided."}, status=status.HTTP_400_BAD_REQUEST)
+        kinect_data = round(stream.mean, 2)
+
+    # 경로를 올렸으면 클라이언트가 보낸 거리 대신 서버에서 계산한 거리 사용
+    course_distance = WalkCourse.objects.filter(walk=walk_history).values_list('distance', flat=True).first()
+    if course_distance is not None:
+        data['distance'] = round(course_distance)
+
+    with transaction.atomic():
+        # 같은 산책/같은 날의 다른 요청(walk_end, walk_satisfy_update)과 동시에 이전 값을 읽지 않도록
+        # 산책 기록과 Calendar 행을 잠그고 다시 읽은 값으로 변경 전 집계와 첫 산책 완료 여부를 계산
+        walk_history = WalkHistory.objects.select_for_update().select_related('calendar').get(pk=walk_history.pk)
+        before = walk_totals(walk_history)
+
+        # WalkHistory의 stable_score 업데이트
+        walk_history.stable_score = kinect_data
+
+        # WalkHistory 객체 업데이트 - 시리얼라이저 설정
+        serializer = WalkHistorySerializer(walk_history, data=data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         walk_history = serializer.save() #유효성 검사 후 업데이트된 객체 저장
         calendar = walk_history.calendar
+        day_walked = not calendar.walkfinished
         calendar.walkfinished = True #산책 완료
         calendar.save()
+        # 월간 산책 집계에 변경분 반영
+        apply_walk_delta(calendar, before, walk_totals(walk_history), day_walked=day_walked)
+        if not before['walk_count']:
+            record_walk_finished(calendar.user_id)
 
-        #사용자에게 점수 추가, 레벨 관리 로직
-        user = request.user
-        additional_points = 7  #산책 종료시 기본 점수
-
-        # stable_score에 따라 추가 점수 계산 (안정도가 80이상일시 3점추가, 90이상일시 5점 추가)
-        stable_score = walk_history.stable_score
-        if stable_score is not None:
-            if stable_score >= 90:
-                additional_points += 5
-            elif stable_score >= 80:
-                additional_points += 3
-
-        # distance에 따라 추가 점수 계산
-        distance = walk_history.distance
-        if distance is not None:
-            if distance >= 1500:
-                additional_points += 13 #1500미터 이상일 시 13점 추가 (기본점수 포함하면 15점)
-            elif distance >= 1000:
-                additional_points += 8 #1000미터 이상일 시 8점 추가
-            elif distance >= 500:
-                additional_points += 3 #500미터 이상일 시 3점 추가
-        # 추가 점수 추가, 레벨업 확인
-        user.add_points(additional_points)
-        #return Response({"message": "successfully", "walk_history_id": walk_history.id}, status=status.HTTP_200_OK)
-        return Response({'message': 'successfully'}, status=status.HTTP_200_OK)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    #사용자에게 점수 추가, 레벨 관리 로직 (안정도, 거리에 따라 추가 점수)
+    user = request.user
+    additional_points = walk_end_points(walk_history.stable_score, walk_history.distance)
+    # 추가 점수 추가, 레벨업 확인
+    user.add_points(additional_points)
+    #return Response({"message": "successfully", "walk_history_id": walk_history.id}, status=status.HTTP_200_OK)
+    return Response({'message': 'successfully'}, status=status.HTTP_200_OK)
+
+# 산책 중 키넥트 안정도 샘플 블록 업로드 (본문: float32 little-endian 배열, 쿼리 파라미터 seq: 청크 번호)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def walk_kinect_upload(request, walk_id):
+    try:
+        walk_history = WalkHistory.objects.get(id=walk_id, calendar__user=request.user)
+    except WalkHistory.DoesNotExist:
+        return Response({"message": f"WalkHistory with id {walk_id} does not exist."}, status=status.HTTP_404_NOT_FOUND)
+    if walk_history.end_time:
+        return Response({"message": "Walk has already ended."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 청크 번호는 1부터 (생략하면 마지막 청크 다음 번호)
+    seq = request.query_params.get('seq')
+    if seq is not None and not (seq.isascii() and seq.isdigit() and 1 <= int(seq) <= KINECT_MAX_SEQ):
+        return Response({"message": f"seq must be an integer from 1 to {KINECT_MAX_SEQ}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        stream, appended = append_chunk(walk_history, request.body, int(seq) if seq else None)
+    except ValueError as e:
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'message': 'successfully', 'duplicate': not appended, **summarize(stream)},
+                    status=status.HTTP_201_CREATED if appended else status.HTTP_200_OK)
+
+# 산책 경로(GPS 좌표 전체) 업로드/조회
+# POST 본문: {"points": [[위도, 경도, (시각 초)], ...]} 또는 압축 형식 바이트(application/octet-stream)
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def walk_course(request, walk_id):
+    try:
+        walk_history = WalkHistory.objects.get(id=walk_id, calendar__user=request.user)
+    except WalkHistory.DoesNotExist:
+        return Response({"message": f"WalkHistory with id {walk_id} does not exist."}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        try:
+            course = walk_history.walk_course
+        except WalkCourse.DoesNotExist:
+            return Response({"message": "No course uploaded for this walk."}, status=status.HTTP_404_NOT_FOUND)
+        lat, lng, times = decode_course(course.encoded)
+        columns = (lat, lng) if times is None else (lat, lng, times)
+        points = [list(point) for point in zip(*(column.tolist() for column in columns))]
+        return Response({'message': 'successfully', **summarize_course(course), 'points': points},
+                        status=status.HTTP_200_OK)
+
+    if walk_history.end_time:
+        return Response({"message": "Walk has already ended."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        if request.content_type == 'application/octet-stream':
+            lat, lng, times = parse_course(request.body)
+        elif isinstance(request.data, dict):
+            lat, lng, times = parse_points(request.data.get('points'))
+        else:
+            raise ValueError('Body must be a JSON object with points.')
+    except ValueError as e:
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    course = save_course(walk_history, lat, lng, times)
+    return Response({'message': 'successfully', **summarize_course(course)}, status=status.HTTP_201_CREATED)
+
+# 오프라인 동기화: 연결이 없을 때 쌓아 둔 walk_start/walk_end/sri/emotion_small 기록을 한 번에 반영
+# 본문: {"records": [{"type", "client_id", "timestamp", ...}, ...]}, 기록별 결과를 같은 순서로 반환
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    records = request.data.get('records')
+    if not isinstance(records, list) or not records:
+        return Response({"message": "records must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(records) > SYNC_MAX_RECORDS:
+        return Response({"message": f"At most {SYNC_MAX_RECORDS} records can be synced at once."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = sync_records(request.user, records)
+    return Response({'message': 'successfully', 'results': results}, status=status.HTTP_200_OK)
 
 #산책 종료 후 즉시 뜨는 간편 보고서 조회
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_report('walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
+@cached_response('walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
 def walk_simple_report(request, pk):
     #user = request.user
-    try:
-        walk = WalkHistory.objects.get(pk=pk)
-    except WalkHistory.DoesNotExist:
+    walk = WalkHistory.objects.filter(pk=pk).values(*WALK_SUMMARY_ROW_FIELDS).first()
+    if walk is None:
         return Response(status=status.HTTP_404_NOT_FOUND)
-    #요청 보낸 사용자 정보 가져오기
-    user = User.objects.get(pk=request.user.id)
 
-    summary_data = {
-        'message': 'successfully',
-        # 총 산책 시간 분 단위로 계산
-        'total_time': int(
-            (walk.end_time - walk.start_time).total_seconds() / 60) if walk.end_time and walk.start_time else None,
-        'distance': int(walk.distance),  #산책 거리 단위:meter
-        'stable_score': int(walk.stable_score),
-        #'points': user.points if user else None,
-        #'level': user.level if user else None,
-    }
+    # 총 산책 시간(분), 산책 거리(meter), 안정도
+    summary_data = {'message': 'successfully', **walk_summary_row(walk)}
     return Response(summary_data,  status=status.HTTP_200_OK)
     #return Response({'message': 'successfully'}, status=status.HTTP_200_OK)
 
@@ -405,9 +658,19 @@ def walk_satisfy_update(request, pk):
     # walk_score 값 가져오기
     walk_score = request.data.get('walk_score')
     if walk_score is not None:
+        try:
+            walk_score = float(walk_score)
+        except (TypeError, ValueError):
+            return Response({"message": "Walk score must be a number."}, status=status.HTTP_400_BAD_REQUEST)
         # walk_score 존재할 경우 업데이트
-        walk.walk_score = walk_score
-        walk.save()
+        with transaction.atomic():
+            # 동시에 들어온 walk_end/만족도 변경과 같은 이전 값을 쓰지 않도록 잠근 행에서 변경 전 집계 계산
+            walk = WalkHistory.objects.select_for_update().select_related('calendar').get(pk=walk.pk)
+            before = walk_totals(walk)
+            walk.walk_score = walk_score
+            walk.save()
+            # 월간 산책 집계에 만족도 변경분 반영
+            apply_walk_delta(walk.calendar, before, walk_totals(walk))
         return Response({'message': 'successfully'}, status=status.HTTP_200_OK)
     
     return Response({"message": "Walk score is required."}, status=status.HTTP_400_BAD_REQUEST)
@@ -415,134 +678,176 @@ def walk_satisfy_update(request, pk):
 # 1개의 산책 기록 조회
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_report('walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
+@cached_response('walk', owner=lambda pk: {'user__calendar__walkhistory': pk})
 def walk_once_report(request, pk):
-    user = request.user
-    try:
-        walk = WalkHistory.objects.get(pk=pk)
-    except WalkHistory.DoesNotExist:
+    walk = WalkHistory.objects.filter(pk=pk).values(*WALK_REPORT_ROW_FIELDS).first()
+    if walk is None:
         return Response(status=status.HTTP_404_NOT_FOUND)
-    # WalkHistory 객체 직렬화
-    serializer = WalkReportSerializer(walk)
-    # 실제 산책 시간 계산 (start_time과 end_time이 존재할 때만 계산)
-    if walk.start_time and walk.end_time:
-        actual_walk_time_delta = walk.end_time - walk.start_time
-        actual_walk_time_seconds = actual_walk_time_delta.total_seconds()
-        actual_walk_time = round(actual_walk_time_seconds / 60, 2)  # 분 단위로 변환
-    else:
-        actual_walk_time = 0  # 시작 시간 또는 종료 시간이 없으면 0분으로 설정
-
-    # 시작 시간과 종료 시간을 HH:MM 형식으로 변환 (start_time 또는 end_time이 None일 경우 처리)
-    start_time = walk.start_time.strftime('%H:%M') if walk.start_time else '00:00'
-    end_time = walk.end_time.strftime('%H:%M') if walk.end_time else '00:00'
-
-    # Calendar 모델에 있는 emotion_large 필드를 가져옴
-    #emotion_large = walk.calendar.emotion_large  # 해당 산책 기록의 대분류 감정
-    #emotion_small = walk.calendar.emotion_small
-    # response_data에 id를 walk_history_id로 변경하고 감정 분석 결과 추가
-    response_data = {
-        'message': 'successfully',
-        'start_time': start_time,
-        'end_time': end_time,
-        'distance': walk.distance,
-        'actual_walk_time': int(actual_walk_time),
-        'walk_score': walk.walk_score,
-        'stable_score': walk.stable_score,
-        'walk_history_id': serializer.data['id'],
-        #'emotion_large': emotion_large,
-        #'emotion_small': emotion_small,
-    }
+    # 시작/종료 시각(HH:MM), 실제 산책 시간(분), 거리, 만족도, 안정도, walk_history_id
+    response_data = {'message': 'successfully', **walk_report_row(walk)}
 
     #기존 id 제거
     #del response_data['data']['id']
     return Response(response_data, status=status.HTTP_200_OK)
 
 
-# 월별 산책 기록 조회(record 화면 구성)
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def walk_monthly_report(request, year, month):
-    user = request.user
-    year = int(year)  # URL 경로 파라미터로 받은 연도를 정수로 변환
-    month = int(month)  # URL 경로 파라미터로 받은 월을 정수로 변환
-
+def _report_user_fields(user):
+    # 월별/기간 보고서가 함께 쓰는 사용자 정보 (선인장 레벨, 최근 SRI 7개, 최근 안정도 7개)
+    # 레벨/포인트/닉네임은 DB에서 다시 읽음: request.user는 worker별 토큰 캐시의 사용자라 다른 worker에서 지급한
+    # 포인트가 늦게 반영되는데, 보고서는 최신 profile 버전으로 캐시되므로 예전 값이 다음 변경 때까지 남게 됨
+    profile = User.objects.filter(pk=user.pk).values('level', 'points', 'nickname').get()
     # 선인장 레벨 및 점수
-    cactus_level = user.level
-    score = user.points
+    cactus_level = profile['level']
+    score = profile['points']
 
     # 회원의 닉네임
-    nickname = user.nickname
+    nickname = profile['nickname']
 
-    # 가장 최근의 SRI 검사 결과
-    latest_sri = SRI.objects.filter(user=user).order_by('-sri_date').first()
-    sri_score = latest_sri.sri_score if latest_sri else None
-    sri_date = latest_sri.sri_date.strftime('%Y-%m-%d') if latest_sri else None
+    # 최근 7개의 SRI 검사 결과 (첫 번째 값이 가장 최근의 SRI 검사 결과)
+    recent_sri_scores = list(SRI.objects.filter(user=user).order_by('-sri_date')[:7].values('sri_date', 'sri_score'))
+    latest_sri = recent_sri_scores[0] if recent_sri_scores else None
+    sri_score = latest_sri['sri_score'] if latest_sri else None
+    sri_date = latest_sri['sri_date'].strftime('%Y-%m-%d') if latest_sri else None
 
-    # 최근 7개의 SRI 검사 결과
-    recent_sri_scores = SRI.objects.filter(user=user).order_by('-sri_date')[:7].values('sri_date', 'sri_score')
     sri_scores = [{'date': score['sri_date'].strftime('%m/%d'), 'sri_score': score['sri_score']} for score in
                 recent_sri_scores]
     sri_score_values = [score['sri_score'] for score in sri_scores if score['sri_score'] is not None]
     sri_average = mean(sri_score_values) if sri_score_values else None
 
-    # 해당 월 동안의 누적 산책 거리 및 시간
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1)
-    else:
-        end_date = datetime(year, month + 1, 1)
+    # 가장 최근 7개의 stable_score를 가져옴
+    recent_stable_scores = WalkHistory.objects.filter(calendar__user=user).order_by('-start_time')[:7].values(
+        'start_time', 'stable_score')
+    stable_scores = [{'date': score['start_time'].strftime('%m/%d'), 'stable_score': score['stable_score']} for score in
+                    recent_stable_scores]
+    stable_score_values = [score['stable_score'] for score in stable_scores if score['stable_score'] is not None]
+    stable_average = mean(stable_score_values) if stable_score_values else None
 
-    walks = WalkHistory.objects.filter(calendar__user=user, start_time__range=(start_date, end_date))
+    return {
+        "nickname": nickname,
+        "cactus_level": cactus_level,
+        "cactus_score": score,
+        "sri_score": sri_score,
+        "sri_date": sri_date,
+        "stable_scores": stable_scores,
+        "stable_average": stable_average,
+        "sri_scores": sri_scores,
+        "sri_average": sri_average,
+    }
+
+
+# 월별 산책 기록 조회(record 화면 구성)
+@query_budget(8)  # 토큰 인증 1 + 버전 1 + 보고서 6
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_report('walk', 'calendar', 'sri', 'profile')
+@cached_response('walk', 'calendar', 'sri', 'profile')
+def walk_monthly_report(request, year, month):
+    user = request.user
+    year = int(year)  # URL 경로 파라미터로 받은 연도를 정수로 변환
+    month = int(month)  # URL 경로 파라미터로 받은 월을 정수로 변환
+    if not 1 <= month <= 12:
+        return Response({"message": "Invalid month."}, status=status.HTTP_400_BAD_REQUEST)
 
-    total_distance = (walks.aggregate(Sum('distance'))['distance__sum'] or 0) / 1000  # meters to kilometers
+    # 해당 월 동안의 누적 산책 거리 및 시간 (월간 집계 테이블 1행 조회)
+    rollup = MonthlyWalkRollup.objects.filter(user=user, year=year, month=month).first()
+    total_distance = (rollup.total_distance if rollup else 0) / 1000  # meters to kilometers
 
-    total_time_seconds = sum(
-        [(walk.end_time - walk.start_time).total_seconds() for walk in walks if walk.end_time and walk.start_time]) or 0
-    total_time_minutes = total_time_seconds // 60
+    total_time_seconds = rollup.total_walk_seconds if rollup else 0
     total_time_hours = total_time_seconds / 3600  # seconds to hours
 
     # 해당 월 동안의 산책을 한 날의 감정 분석 결과 대분류 값 및 날짜
-    emotions = Calendar.objects.filter(user=user, year=year, month=month, walkfinished=True)
+    # 날짜별 산책 기록 ID는 prefetch 한 번으로 모두 가져옴
+    emotions = Calendar.objects.in_month(user, year, month).filter(walkfinished=True).order_by('date').only(
+        'id', 'date', 'emotion_large'
+    ).prefetch_related(
+        Prefetch('walkhistory_set', queryset=WalkHistory.objects.only('id', 'calendar_id').order_by('-start_time'))
+    )
 
     # 감정 분석 결과를 날짜와 함께 리스트로 구성
     emotion_analysis = []
     for emotion in emotions:
-        # 해당 날짜의 첫 번째 산책 기록 가져오기
-        #first_walk = WalkHistory.objects.filter(calendar=emotion).order_by('start_time').first()
-        #walkhistory_id = first_walk.id if first_walk else None
-
-        # 수정된 코드: 해당 날짜의 모든 산책 기록의 ID 가져오기
-        walks_on_day = WalkHistory.objects.filter(calendar=emotion).order_by('-start_time')  # 수정된 부분
-        walkhistory_id = [walk.id for walk in walks_on_day]  # 수정된 부분
-
         emotion_data = {
-            'date': f"{emotion.year:04d}-{emotion.month:02d}-{emotion.day:02d}",
+            'date': emotion.date.strftime('%Y-%m-%d'),
             'emotion': emotion.emotion_large,
-            'walkhistory_id': walkhistory_id
+            'walkhistory_id': [walk.id for walk in emotion.walkhistory_set.all()]
         }
         emotion_analysis.append(emotion_data)
 
-    # 가장 최근 7개의 stable_score를 가져옴
-    recent_stable_scores = WalkHistory.objects.filter(calendar__user=user).order_by('-start_time')[:7].values(
-        'start_time', 'stable_score')
-    stable_scores = [{'date': score['start_time'].strftime('%m/%d'), 'stable_score': score['stable_score']} for score in
-                    recent_stable_scores]
-    stable_score_values = [score['stable_score'] for score in stable_scores if score['stable_score'] is not None]
-    stable_average = mean(stable_score_values) if stable_score_values else None
-
+    user_fields = _report_user_fields(user)
     data = {
         'message': 'successfully',
-        "nickname": nickname,
-        "cactus_level": cactus_level,
-        "cactus_score": score,
-        "sri_score": sri_score,
-        "sri_date": sri_date,
+        "nickname": user_fields["nickname"],
+        "cactus_level": user_fields["cactus_level"],
+        "cactus_score": user_fields["cactus_score"],
+        "sri_score": user_fields["sri_score"],
+        "sri_date": user_fields["sri_date"],
         "total_distance": math.floor(total_distance * 10) / 10,  # kilometers
         "total_time": math.floor(total_time_hours * 10) / 10,  # hours
         "emotion_analysis": emotion_analysis,
-        "stable_scores": stable_scores,
-        "stable_average": stable_average,
-        "sri_scores": sri_scores,
-        "sri_average": sri_average
+        "stable_scores": user_fields["stable_scores"],
+        "stable_average": user_fields["stable_average"],
+        "sri_scores": user_fields["sri_scores"],
+        "sri_average": user_fields["sri_average"]
+    }
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+RANGE_REPORT_MAX_MONTHS = 24  # 기간 보고서로 한 번에 조회할 수 있는 최대 개월 수
+
+
+# 기간 보고서(연간 추이 등): start~end 월별 산책 집계를 한 번에 조회
+# 월별 값은 그룹 집계 쿼리 1개, 사용자 정보(레벨, SRI, 안정도)는 월별 보고서와 같고 한 번만 조회
+@query_budget(6)  # 토큰 인증 1 + 버전 1 + 월별 집계 1 + 사용자 1 + SRI 1 + 안정도 1
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_report('walk', 'calendar', 'sri', 'profile')
+@cached_response('walk', 'calendar', 'sri', 'profile')
+def walk_range_report(request, start_year, start_month, end_year, end_month):
+    start = (int(start_year), int(start_month))
+    end = (int(end_year), int(end_month))
+    if not (1 <= start[1] <= 12 and 1 <= end[1] <= 12):
+        return Response({"message": "Invalid month."}, status=status.HTTP_400_BAD_REQUEST)
+    if not (MINYEAR <= start[0] <= MAXYEAR and MINYEAR <= end[0] <= MAXYEAR):
+        return Response({"message": "Invalid year."}, status=status.HTTP_400_BAD_REQUEST)
+    month_count = (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+    if not 1 <= month_count <= RANGE_REPORT_MAX_MONTHS:
+        return Response({"message": f"The range must be 1 to {RANGE_REPORT_MAX_MONTHS} months."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    summaries = range_walk_summaries(request.user, start, end)
+    months = []
+    for (year, month), summary in summaries.items():
+        months.append({
+            "year": year,
+            "month": month,
+            "total_distance": math.floor(summary['total_distance'] / 1000 * 10) / 10,  # kilometers
+            "total_time": math.floor(summary['total_walk_seconds'] / 3600 * 10) / 10,  # hours
+            "walk_count": summary['walk_count'],
+            "walked_days": summary['walked_day_count'],
+            "emotion_counts": summary['emotion_counts'],
+            "stable_average": summary['stable_average'],
+            "walk_score_average": summary['walk_score_average'],
+        })
+
+    user_fields = _report_user_fields(request.user)
+    data = {
+        'message': 'successfully',
+        "nickname": user_fields["nickname"],
+        "cactus_level": user_fields["cactus_level"],
+        "cactus_score": user_fields["cactus_score"],
+        "sri_score": user_fields["sri_score"],
+        "sri_date": user_fields["sri_date"],
+        # 월별로 내림한 값을 더하면 개월 수만큼 작아지므로 meter, 초 단위 합계를 한 번만 내림
+        "total_distance": math.floor(sum(summary['total_distance'] for summary in summaries.values()) / 1000 * 10) / 10,
+        "total_time": math.floor(sum(summary['total_walk_seconds'] for summary in summaries.values()) / 3600 * 10) / 10,
+        "walk_count": sum(month["walk_count"] for month in months),
+        "months": months,
+        "stable_scores": user_fields["stable_scores"],
+        "stable_average": user_fields["stable_average"],
+        "sri_scores": user_fields["sri_scores"],
+        "sri_average": user_fields["sri_average"]
     }
 
     return Response(data, status=status.HTTP_200_OK)